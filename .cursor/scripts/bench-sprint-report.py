@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""bench-sprint-report.py — Scaling benchmarks for generate-sprint-report.py.
+
+Usage:
+    python3 bench-sprint-report.py
+    python3 bench-sprint-report.py --sizes 1000x10000,10000x100000
+    python3 bench-sprint-report.py --naive-limit 0
+    python3 bench-sprint-report.py --compare /tmp/generate-sprint-report.old.py
+    python3 bench-sprint-report.py --stages --save
+    python3 bench-sprint-report.py --stages --baseline
+
+Each size is <tickets>x<prs>. For every size the PR→ticket matcher in
+build_ticket_data is timed on seeded synthetic data; the old nested
+substring scan is timed too for sizes up to --naive-limit (tickets × PRs),
+since it is quadratic and becomes impractical beyond that.
+
+Output: one row per size with wall time and ns per PR, so linear scaling
+shows up as a flat ns/PR column.
+
+--compare OLD.py runs the whole report (build_ticket_data + markdown + CSV rows)
+through both OLD.py and the current generator on the same data, and prints wall
+time and tracemalloc peak for each, e.g. against `git show <rev>:` of the script.
+
+--stages runs the generator the way its CLI does, stage by stage, on seeded
+input files (raw Jira REST payloads, PRs, reviews, branches) from 100 to 100k
+tickets (default sizes: STAGE_SIZES):
+
+    ingest        stream tickets/PRs/reviews/branches → Ticket model
+    build         build_ticket_data
+    observations  generate_observations
+    markdown      build_report
+    rows          build_flat_rows
+    csv / json    output_csv / output_json
+
+and prints best-of---repeat wall time and tracemalloc peak per stage, plus per
+output format (markdown = ingest+build+markdown, csv/json = ingest+build+rows+
+writer). --save stores the results as a baseline (default BASELINE_FILE, under
+$HUMAND_CACHE_DIR); --baseline compares against one, printing the change per
+stage and exiting 1 when a stage is slower or larger than --tolerance allows.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import io
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+from hulib.cache import cache_dir  # noqa: E402
+from hulib.jsonio import iter_json, iter_json_object, write_json_array  # noqa: E402
+
+REPOS = ["humand-main-api", "humand-web", "humand-mobile", "humand-backoffice", "material-hu", "hu-translations"]
+PROJECTS = ["SQSH", "SQRN", "SQZB", "SQCY", "SQDP", "SQEG"]
+WORDS = ["feed", "groups", "image", "compression", "key", "updates", "preview", "notifications",
+         "article", "detail", "table", "fix", "view", "count", "migration", "translations"]
+
+DEFAULT_SIZES = "100x1000,1000x10000,10000x100000"
+STAGE_SIZES = "100x300,1000x3000,10000x30000,100000x300000"
+
+BASELINE_FILE = os.path.join(cache_dir(), "bench", "sprint-report-stages.json")
+
+STAGES = ("ingest", "build", "observations", "markdown", "rows", "csv", "json")
+FORMAT_STAGES = {
+    "markdown": ("ingest", "build", "markdown"),
+    "csv": ("ingest", "build", "rows", "csv"),
+    "json": ("ingest", "build", "rows", "json"),
+}
+# Time differences below this are noise at the small sizes and never count as regressions.
+MIN_TIME_DELTA = 0.005
+
+
+def load_generator(path=os.path.join(SCRIPT_DIR, "generate-sprint-report.py"), name="generate_sprint_report"):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+STATUSES = [("To Do", "To Do"), ("In Progress", "In Progress"), ("Code Review", "In Progress"), ("Done", "Done")]
+PRIORITIES = ["Highest", "High", "Medium", "Low"]
+TYPES = ["Dev Task", "Bug", "Story", "Task"]
+PR_STATES = ["OPEN", "OPEN", "MERGED", "CLOSED"]
+DEV_FIELD = ('{pullrequest={dataType=pullrequest, state=%s, stateCount=%d}, json={"cachedValue":{"errors":[],'
+             '"summary":{"pullrequest":{"overall":{"count":%d,"state":"%s","open":%s}}}}}}')
+
+
+def synth_tickets(rng, n):
+    """Seeded sprint issues covering every categorization branch (flags, Jira dev fields, branches)."""
+    tickets = []
+    for i in range(n):
+        key = f"{PROJECTS[i % len(PROJECTS)]}-{1000 + i}"
+        status, status_cat = rng.choice(STATUSES)
+        roll = rng.random()
+        dev, branch = "{}", None
+        if roll < 0.15:
+            count = rng.randint(1, 3)
+            state = rng.choice(["MERGED", "OPEN"])
+            dev = DEV_FIELD % (state, count, count, state, "true" if state == "OPEN" else "false")
+        if 0.1 < roll < 0.25:
+            branch = f"https://github.com/HumandDev/{rng.choice(REPOS)}/tree/{key.lower()}-x"
+        elif 0.25 <= roll < 0.3:
+            branch = f"https://github.com/HumandDev/{rng.choice(REPOS)}/pull/{rng.randint(1, 9999)}"
+        tickets.append({
+            "key": key,
+            "fields": {
+                "summary": f"{rng.choice(['Web', 'Backend', 'Mobile', 'Admin'])} | {rng.choice(WORDS).title()} | "
+                           f"{' '.join(rng.sample(WORDS, 3))}",
+                "issuetype": {"name": rng.choice(TYPES)},
+                "status": {"name": status, "statusCategory": {"name": status_cat}},
+                "priority": {"name": rng.choice(PRIORITIES)},
+                "assignee": {"displayName": f"Dev {i % 7}"} if rng.random() < 0.9 else None,
+                "customfield_10021": [{"value": "Impediment"}] if rng.random() < 0.03 else None,
+                "customfield_10028": rng.choice([None, 1, 2, 3, 5, 8]),
+                "customfield_10000": dev,
+                "customfield_10097": branch,
+            },
+        })
+    return tickets
+
+
+def synth_prs(rng, tickets, n):
+    keys = [t["key"] for t in tickets]
+    prs = []
+    for i in range(n):
+        # ~70% of PRs reference a sprint ticket, the rest belong to other work.
+        if rng.random() < 0.7:
+            key = rng.choice(keys)
+        else:
+            key = f"{rng.choice(PROJECTS)}-{rng.randint(100000, 999999)}"
+        slug = "-".join(rng.sample(WORDS, 3))
+        state = rng.choice(PR_STATES)
+        prs.append({
+            "repo": rng.choice(REPOS),
+            "number": i + 1,
+            "title": f"[{key}] {slug.replace('-', ' ')}" if rng.random() < 0.5 else f"Feature | {slug}",
+            "url": f"https://github.com/HumandDev/repo/pull/{i + 1}",
+            "headRefName": f"{key.lower()}-{slug}",
+            "state": state,
+            "isDraft": state != "MERGED" and rng.random() < 0.2,
+            "mergedAt": "2026-02-12T10:00:00Z" if state == "MERGED" else None,
+        })
+    return prs
+
+
+def synth_branches(rng, tickets):
+    return {t["key"]: [{"repo": rng.choice(REPOS), "ref": f"{t['key'].lower()}-wip"}]
+            for t in tickets if rng.random() < 0.05}
+
+
+def synth_reviews(rng, prs):
+    """reviews.json shape: "repo#number" → {review, checks} for most open PRs."""
+    reviews = {}
+    for pr in prs:
+        if pr["state"] == "OPEN" and rng.random() < 0.8:
+            reviews[f"{pr['repo']}#{pr['number']}"] = {
+                "review": rng.choice(["APPROVED", "CHANGES_REQUESTED", "REVIEW_REQUIRED"]),
+                "checks": rng.choice([[], ["SUCCESS"], ["SUCCESS", "SUCCESS"], ["FAILURE", "SUCCESS"], ["PENDING"]]),
+            }
+    return reviews
+
+
+def jira_payload(rng, ticket, index):
+    """A synth ticket as Jira REST returns it: ids, self links, avatar/icon URLs and a description."""
+    avatars = {size: f"https://avatar-management.services.atlassian.net/{index % 7}/{size}.png"
+               for size in ("16x16", "24x24", "32x32", "48x48")}
+    fields = dict(ticket["fields"])
+    status = fields["status"]
+    fields["status"] = {**status, "self": f"https://humand.atlassian.net/rest/api/3/status/{len(status['name'])}",
+                        "iconUrl": "https://humand.atlassian.net/images/icons/statuses/generic.png",
+                        "statusCategory": {**status["statusCategory"], "colorName": "blue-gray", "id": 2}}
+    if fields.get("assignee"):
+        fields["assignee"] = {**fields["assignee"], "accountId": f"5b10ac8d82e05b22cc7d{index % 7:04d}",
+                              "avatarUrls": avatars, "active": True, "timeZone": "America/Argentina/Buenos_Aires"}
+    fields["issuetype"] = {**fields["issuetype"], "iconUrl": "https://humand.atlassian.net/images/icons/task.svg",
+                           "subtask": False}
+    fields["sprint"] = {"id": 60, "name": "Bench 60", "state": "active",
+                        "startDate": "2026-02-10T03:00:00.000Z", "endDate": "2026-02-24T03:00:00.000Z"}
+    text = " ".join(rng.choices(WORDS, k=rng.randint(10, 120)))
+    fields["description"] = {"type": "doc", "version": 1,
+                             "content": [{"type": "paragraph", "content": [{"type": "text", "text": text}]}]}
+    return {"expand": "operations,versionedRepresentations,editmeta,changelog,renderedFields",
+            "id": str(10000 + index), "self": f"https://humand.atlassian.net/rest/api/3/issue/{10000 + index}",
+            "key": ticket["key"], "fields": fields}
+
+
+def match_indexed(gen, ticket_keys, prs):
+    hits = 0
+    for pr in prs:
+        for tk in gen.extract_ticket_keys(pr.get("title", ""), pr.get("headRefName", "")):
+            if tk in ticket_keys:
+                hits += 1
+    return hits
+
+
+def match_naive(ticket_keys, prs):
+    hits = 0
+    for pr in prs:
+        title_upper = pr.get("title", "").upper()
+        branch_upper = pr.get("headRefName", "").upper()
+        for tk in ticket_keys:
+            if tk in title_upper or tk in branch_upper:
+                hits += 1
+    return hits
+
+
+def run_report(gen, tickets, prs, branches):
+    """What one markdown run plus one CSV run of the generator CLI do."""
+    gen.build_report(tickets, prs, {}, branches, "Bench", "2026-02-10", "2026-02-24", "BENCH")
+    ticket_map, categories, _ = gen.build_ticket_data(tickets, prs, {}, branches)
+    gen.output_csv(gen.build_flat_rows(ticket_map, categories), io.StringIO())
+
+
+def measured(fn, *args, repeat=3):
+    """→ (best wall seconds of `repeat` runs, tracemalloc peak bytes of one extra traced run)."""
+    best = min(timed(fn, *args)[0] for _ in range(repeat))
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def compare(old_path, sizes, seed):
+    old = load_generator(old_path, "generate_sprint_report_old")
+    new = load_generator()
+    print(f"{'tickets':>8} {'prs':>8} | {'old s':>8} {'old MiB':>8} | {'new s':>8} {'new MiB':>8} | {'speedup':>7} {'mem':>6}")
+    for n_tickets, n_prs in sizes:
+        rng = random.Random(seed)
+        tickets = synth_tickets(rng, n_tickets)
+        prs = synth_prs(rng, tickets, n_prs)
+        branches = synth_branches(rng, tickets)
+        old_s, old_peak = measured(run_report, old, tickets, prs, branches)
+        new_s, new_peak = measured(run_report, new, tickets, prs, branches)
+        print(f"{n_tickets:>8} {n_prs:>8} | {old_s:>8.3f} {old_peak / 2**20:>8.1f} | {new_s:>8.3f} {new_peak / 2**20:>8.1f}"
+              f" | {old_s / new_s:>6.2f}x {new_peak / old_peak:>5.0%}", flush=True)
+
+
+def write_inputs(directory, seed, n_tickets, n_prs):
+    """Seeded tickets/prs/reviews/branches JSON files in directory → their paths."""
+    rng = random.Random(seed)
+    tickets = synth_tickets(rng, n_tickets)
+    prs = synth_prs(rng, tickets, n_prs)
+    inputs = {
+        "tickets": (jira_payload(rng, t, i) for i, t in enumerate(tickets)),
+        "prs": prs,
+        "reviews": synth_reviews(rng, prs),
+        "branches": synth_branches(rng, tickets),
+    }
+    paths = {}
+    for name, data in inputs.items():
+        paths[name] = os.path.join(directory, f"{name}.json")
+        with open(paths[name], "w") as f:
+            if name == "tickets":
+                write_json_array(data, f)
+            else:
+                json.dump(data, f)
+    return paths
+
+
+def ingest(gen, paths):
+    """What generate-sprint-report.py main() does with its input files."""
+    with open(paths["tickets"]) as f:
+        tickets = [gen.Ticket(issue) for issue in iter_json(f)]
+    with open(paths["prs"]) as f:
+        prs = [gen.compact_pr(pr) for pr in iter_json(f)]
+    with open(paths["reviews"]) as f:
+        reviews = dict(iter_json_object(f))
+    with open(paths["branches"]) as f:
+        branches = dict(iter_json_object(f))
+    return tickets, prs, reviews, branches
+
+
+def run_stages(gen, paths, traced=False):
+    """One pass through every stage → {stage: seconds}, or {stage: traced peak bytes} when traced."""
+    results = {}
+
+    def stage(name, fn, *args):
+        if traced:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        value = fn(*args)
+        results[name] = tracemalloc.get_traced_memory()[1] if traced else time.perf_counter() - start
+        return value
+
+    start_date, end_date = "2026-02-10", "2026-02-24"
+    tickets, prs, reviews, branches = stage("ingest", ingest, gen, paths)
+    data = stage("build", gen.build_ticket_data, tickets, prs, reviews, branches)
+    stage("observations", gen.generate_observations, data, gen.compute_elapsed_pct(start_date, end_date))
+    stage("markdown", gen.build_report, tickets, prs, reviews, branches, "Bench 60", start_date, end_date, "BENCH",
+          data)
+    rows = stage("rows", gen.build_flat_rows, data.ticket_map, data.categories)
+    stage("csv", gen.output_csv, rows, io.StringIO())
+    stage("json", gen.output_json, rows, "Bench 60", start_date, end_date, "BENCH", io.StringIO())
+    return results
+
+
+def measure_stages(gen, paths, repeat):
+    """→ {stage or "format:<fmt>": {seconds, peak_mib}}: best of `repeat` untraced runs + one traced run."""
+    runs = [run_stages(gen, paths) for _ in range(repeat)]
+    tracemalloc.start()
+    peaks = run_stages(gen, paths, traced=True)
+    tracemalloc.stop()
+    results = {name: {"seconds": min(r[name] for r in runs), "peak_mib": peaks[name] / 2**20} for name in STAGES}
+    for fmt, names in FORMAT_STAGES.items():
+        results[f"format:{fmt}"] = {"seconds": sum(results[n]["seconds"] for n in names),
+                                    "peak_mib": max(results[n]["peak_mib"] for n in names)}
+    return results
+
+
+def regressions(current, base, tolerance):
+    """Names whose time or peak grew past tolerance (time deltas under MIN_TIME_DELTA are ignored)."""
+    worse = []
+    for name, now in current.items():
+        before = base.get(name)
+        if before is None:
+            continue
+        slower = (now["seconds"] > before["seconds"] * (1 + tolerance)
+                  and now["seconds"] - before["seconds"] >= MIN_TIME_DELTA)
+        larger = now["peak_mib"] > before["peak_mib"] * (1 + tolerance)
+        if slower or larger:
+            worse.append(name)
+    return worse
+
+
+def change(now, before):
+    return f"{(now / before - 1) * 100:>+7.0f}%" if before else f"{'':>8}"
+
+
+def stages(sizes, seed, repeat, save_path, baseline_path, tolerance):
+    gen = load_generator()
+    baseline = None
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        print(f"Baseline: {baseline_path} ({baseline['created']}, Python {baseline['python']})")
+
+    header = f"{'tickets':>8} {'prs':>8} {'stage':<16} | {'s':>8} {'peak MiB':>9}"
+    if baseline:
+        header += f" | {'base s':>8} {'Δ s':>8} {'base MiB':>9} {'Δ MiB':>8}"
+    print(header)
+
+    results, failed = {}, []
+    for n_tickets, n_prs in sizes:
+        label = f"{n_tickets}x{n_prs}"
+        with tempfile.TemporaryDirectory() as directory:
+            results[label] = measure_stages(gen, write_inputs(directory, seed, n_tickets, n_prs), repeat)
+        base = (baseline or {}).get("results", {}).get(label, {})
+        worse = regressions(results[label], base, tolerance) if base else []
+        failed.extend(f"{label} {name}" for name in worse)
+        for name, now in results[label].items():
+            row = f"{n_tickets:>8} {n_prs:>8} {name:<16} | {now['seconds']:>8.3f} {now['peak_mib']:>9.1f}"
+            before = base.get(name)
+            if before:
+                row += (f" | {before['seconds']:>8.3f} {change(now['seconds'], before['seconds'])}"
+                        f" {before['peak_mib']:>9.1f} {change(now['peak_mib'], before['peak_mib'])}")
+                row += "  REGRESSION" if name in worse else ""
+            print(row, flush=True)
+
+    if save_path:
+        os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+        with open(save_path, "w") as f:
+            json.dump({"created": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                       "machine": platform.machine(), "seed": seed, "repeat": repeat, "results": results}, f, indent=2)
+        print(f"Baseline saved to {save_path}", file=sys.stderr)
+    if failed:
+        print(f"{len(failed)} regression(s) over {tolerance:.0%}: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def parse_sizes(raw):
+    sizes = []
+    for part in raw.split(","):
+        n_tickets, n_prs = part.lower().split("x")
+        sizes.append((int(n_tickets), int(n_prs)))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generate-sprint-report.py hot paths")
+    parser.add_argument("--sizes", default=None,
+                        help=f"Comma-separated <tickets>x<prs> (default: {DEFAULT_SIZES}; {STAGE_SIZES} with --stages)")
+    parser.add_argument("--seed", type=int, default=60, help="Random seed (default: 60)")
+    parser.add_argument("--naive-limit", type=int, default=10_000_000,
+                        help="Largest tickets×PRs product to run the old substring scan on (default: 1e7)")
+    parser.add_argument("--compare", metavar="OLD.py", default=None,
+                        help="Time and memory-profile the full report against another copy of the generator")
+    parser.add_argument("--stages", action="store_true", help="Per-stage/per-format time and peak memory suite")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="--stages: timed runs per size, best is kept (default: 3)")
+    parser.add_argument("--save", nargs="?", const=BASELINE_FILE, default=None, metavar="FILE",
+                        help=f"--stages: save results as a baseline (default: {BASELINE_FILE})")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_FILE, default=None, metavar="FILE",
+                        help="--stages: compare against a saved baseline, exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="--stages: allowed slowdown/growth vs the baseline (default: 0.25)")
+    args = parser.parse_args()
+
+    if args.stages:
+        sys.exit(stages(parse_sizes(args.sizes or STAGE_SIZES), args.seed, args.repeat,
+                        args.save, args.baseline, args.tolerance))
+    if args.save or args.baseline:
+        parser.error("--save/--baseline require --stages")
+
+    args.sizes = args.sizes or DEFAULT_SIZES
+    if args.compare:
+        compare(args.compare, parse_sizes(args.sizes), args.seed)
+        return
+
+    gen = load_generator()
+
+    print(f"{'tickets':>8} {'prs':>8} | {'indexed s':>10} {'ns/PR':>8} {'hits':>8} | {'naive s':>10} {'ns/PR':>8} {'hits':>8}")
+    for n_tickets, n_prs in parse_sizes(args.sizes):
+        rng = random.Random(args.seed)
+        tickets = synth_tickets(rng, n_tickets)
+        prs = synth_prs(rng, tickets, n_prs)
+        ticket_keys = {t["key"] for t in tickets}
+
+        idx_s, idx_hits = timed(match_indexed, gen, ticket_keys, prs)
+        row = f"{n_tickets:>8} {n_prs:>8} | {idx_s:>10.3f} {idx_s / n_prs * 1e9:>8.0f} {idx_hits:>8}"
+        if n_tickets * n_prs <= args.naive_limit:
+            naive_s, naive_hits = timed(match_naive, ticket_keys, prs)
+            row += f" | {naive_s:>10.3f} {naive_s / n_prs * 1e9:>8.0f} {naive_hits:>8}"
+        else:
+            row += f" | {'skipped':>10} {'':>8} {'':>8}"
+        print(row, flush=True)
+
+
+if __name__ == "__main__":
+    main()
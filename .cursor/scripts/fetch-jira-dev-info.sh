@@ -2,13 +2,14 @@
 # fetch-jira-dev-info.sh — Fetch linked PRs/branches from Jira's Development panel.
 #
 # Usage:
-#   ./fetch-jira-dev-info.sh <keys-file> [output-file]
+#   ./fetch-jira-dev-info.sh [--concurrency N] <keys-file> [output-file]
 #
 # <keys-file>  File with ticket keys (one per line), or "-" for stdin.
 # [output-file] Writes JSON to file. Defaults to stdout.
+# --concurrency Max dev-status requests in flight (default: $JIRA_CONCURRENCY or 10).
 #
 # Requires:
-#   JIRA_BASE_URL  — e.g. https://humand.atlassian.net
+#   JIRA_BASE_URL  — e.g. https://humand.atlassian.net (http://127.0.0.1:<port> for a local stand-in)
 #   JIRA_EMAIL     — Atlassian account email
 #   JIRA_API_TOKEN — API token from https://id.atlassian.com/manage-profile/security/api-tokens
 #
@@ -17,14 +18,28 @@
 #
 # This is more accurate than GitHub text search because Jira's GitHub integration
 # tracks exact PR↔ticket links regardless of title/branch naming conventions.
+#
+# Requests share a pool of keep-alive connections (hulib/client.py). 429/5xx
+# responses are retried with backoff, honoring Retry-After; a request that still
+# fails aborts the run (exit 3) instead of being reported as "no PRs".
+# --concurrency bounds the threads; the request rate is bounded by the Jira
+# budget shared with every other script (hulib/ratelimit.py).
 
 set -euo pipefail
 
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+
 : "${JIRA_BASE_URL:?Set JIRA_BASE_URL (e.g. https://humand.atlassian.net)}"
 : "${JIRA_EMAIL:?Set JIRA_EMAIL}"
 : "${JIRA_API_TOKEN:?Set JIRA_API_TOKEN}"
 
-keys_file="${1:?Usage: fetch-jira-dev-info.sh <keys-file> [output-file]}"
+CONCURRENCY="${JIRA_CONCURRENCY:-10}"
+if [[ "${1:-}" == "--concurrency" ]]; then
+  CONCURRENCY="${2:?--concurrency requires a value}"
+  shift 2
+fi
+
+keys_file="${1:?Usage: fetch-jira-dev-info.sh [--concurrency N] <keys-file> [output-file]}"
 output_file="${2:-}"
 
 if [[ "$keys_file" == "-" ]]; then
@@ -36,79 +51,48 @@ fi
 mapfile -t KEY_ARRAY < <(echo "$keys" | tr ',' ' ' | xargs -n1 | sort -u)
 
 if [[ ${#KEY_ARRAY[@]} -eq 0 ]]; then
-  echo "{}"
+  if [[ -n "$output_file" ]]; then echo "{}" > "$output_file"; else echo "{}"; fi
   exit 0
 fi
 
-tmpdir=$(mktemp -d)
-trap 'rm -rf "$tmpdir"' EXIT
-
-auth=$(printf '%s:%s' "$JIRA_EMAIL" "$JIRA_API_TOKEN" | base64)
-
-# Step 1: resolve ticket keys → numeric IDs (batched via JQL)
-jql_keys=$(printf ",%s" "${KEY_ARRAY[@]}")
-jql_keys="${jql_keys:1}"
-jql="key in (${jql_keys})"
-
-curl -s -H "Authorization: Basic $auth" \
-  -H "Content-Type: application/json" \
-  "${JIRA_BASE_URL}/rest/api/3/search?jql=$(python3 -c "import urllib.parse; print(urllib.parse.quote('$jql'))")&fields=key&maxResults=${#KEY_ARRAY[@]}" \
-  > "$tmpdir/issues.json"
-
-# Step 2: for each issue, fetch dev-status
-python3 - "$tmpdir" "$JIRA_BASE_URL" "$auth" <<'PYEOF'
-import json, sys, os, subprocess, concurrent.futures
-
-tmpdir = sys.argv[1]
-base_url = sys.argv[2]
-auth = sys.argv[3]
-
-with open(os.path.join(tmpdir, "issues.json")) as f:
-    data = json.load(f)
-
-issues = data.get("issues", [])
-key_to_id = {i["key"]: i["id"] for i in issues}
-
-def fetch_dev(key, issue_id):
-    url = f"{base_url}/rest/dev-status/latest/issue/detail?issueId={issue_id}&applicationType=GitHub&dataType=pullrequest"
-    result = subprocess.run(
-        ["curl", "-s", "-H", f"Authorization: Basic {auth}", url],
-        capture_output=True, text=True, timeout=15,
-    )
-    if result.returncode != 0:
-        return key, []
-    try:
-        data = json.loads(result.stdout)
-    except:
-        return key, []
-
-    items = []
-    for detail in data.get("detail", []):
-        for pr in detail.get("pullRequests", []):
-            items.append({
-                "type": "pullrequest",
-                "repo": pr.get("source", {}).get("url", "").split("/")[-1] if pr.get("source") else "",
-                "name": pr.get("name", ""),
-                "url": pr.get("url", ""),
-                "state": pr.get("status", ""),
-            })
-        for branch in detail.get("branches", []):
-            items.append({
-                "type": "branch",
-                "repo": branch.get("repository", {}).get("name", ""),
-                "name": branch.get("name", ""),
-                "url": branch.get("url", ""),
-                "state": "open",
-            })
-    return key, items
-
-result = {}
-with concurrent.futures.ThreadPoolExecutor(max_workers=10) as pool:
-    futures = {pool.submit(fetch_dev, k, v): k for k, v in key_to_id.items()}
-    for f in concurrent.futures.as_completed(futures):
-        key, items = f.result()
-        if items:
-            result[key] = items
-
-json.dump(result, sys.stdout, indent=2)
+# Step 1: resolve ticket keys → numeric IDs (chunked `key in (...)` JQL, paged)
+# Step 2: fetch dev-status for every issue with bounded concurrency
+PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}" \
+  python3 - "$CONCURRENCY" "$output_file" "${KEY_ARRAY[@]}" <<'PYEOF'
+import json, sys
+
+from hulib import trace
+from hulib.client import HttpError
+from hulib.jira import JiraClient, dev_items
+
+concurrency = int(sys.argv[1])
+output_file = sys.argv[2]
+keys = sys.argv[3:]
+
+try:
+    with JiraClient.from_env(concurrency=concurrency) as jira:
+        with trace.span("resolve issue ids", keys=len(keys)):
+            key_to_id = jira.issue_ids(keys)
+
+        def fetch_dev(item):
+            key, issue_id = item
+            return key, dev_items(jira.dev_status(issue_id))
+
+        with trace.span("dev-status fan-out", issues=len(key_to_id)):
+            fetched = jira.map(fetch_dev, sorted(key_to_id.items()))
+except HttpError as e:
+    print(f"Error: {e}", file=sys.stderr)
+    sys.exit(3)
+
+missing = sorted(set(keys) - set(key_to_id))
+if missing:
+    print(f"Warning: {len(missing)} keys not found in Jira: {', '.join(missing)}", file=sys.stderr)
+
+result = {key: items for key, items in fetched if items}
+
+if output_file:
+    with open(output_file, "w") as f:
+        json.dump(result, f, indent=2)
+else:
+    json.dump(result, sys.stdout, indent=2)
 PYEOF
@@ -7,6 +7,8 @@
 # Usage:
 #   ./fetch-jira-sprint-issues.sh --project SQSH
 #   ./fetch-jira-sprint-issues.sh --project SQSH --sprint "Shark 60"
+#   ./fetch-jira-sprint-issues.sh --project SQSH --ndjson > issues.ndjson
+#   ./fetch-jira-sprint-issues.sh --project SQSH,SQZB,SQMT   # open sprints of several projects, one query
 #
 # Requires:
 #   JIRA_EMAIL     (or ATLASSIAN_EMAIL, JIRA_USERNAME, JIRA_USER)
@@ -14,23 +16,44 @@
 #
 # Optional:
 #   JIRA_BASE_URL  (default: https://humand.atlassian.net)
+#   --concurrency N  Pages fetched in parallel after the first (default: $JIRA_CONCURRENCY or 6)
+#   --page-size N    Issues per page (default: 100, Jira's cap)
+#   --ndjson         Emit one issue per line instead of a JSON array
+#   --snapshot FILE  Incremental mode (hulib/snapshot.py): only fetch issues updated
+#                    since the snapshot's last sync, merge them in, and emit the same
+#                    list a full fetch would. Creates FILE on first use.
 #
-# Output: JSON array of issue objects to stdout.
+# Output: JSON array (or NDJSON) of issue objects to stdout.
+#
+# All pages are fetched: the first response reports `total`, the remaining
+# pages are requested concurrently over a shared keep-alive connection pool, and
+# issues are written out page by page as they arrive (in order). Requests take
+# their slots from the shared Jira rate-limit budget (hulib/ratelimit.py).
 
 set -euo pipefail
 
 usage() {
-  echo "Usage: $0 --project <KEY> [--sprint '<NAME>']" >&2
+  echo "Usage: $0 --project <KEY[,KEY...]> [--sprint '<NAME>'] [--concurrency N] [--page-size N] [--ndjson] [--snapshot FILE]" >&2
   exit 1
 }
 
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+
 PROJECT=""
 SPRINT=""
+CONCURRENCY="${JIRA_CONCURRENCY:-6}"
+PAGE_SIZE=100
+FORMAT="json"
+SNAPSHOT=""
 
 while [[ $# -gt 0 ]]; do
   case "$1" in
     --project) PROJECT="$2"; shift 2 ;;
     --sprint)  SPRINT="$2";  shift 2 ;;
+    --concurrency) CONCURRENCY="$2"; shift 2 ;;
+    --page-size)   PAGE_SIZE="$2";   shift 2 ;;
+    --ndjson)  FORMAT="ndjson"; shift ;;
+    --snapshot) SNAPSHOT="$2"; shift 2 ;;
     -h|--help) usage ;;
     *) echo "Unknown arg: $1" >&2; usage ;;
   esac
@@ -51,38 +74,34 @@ if [[ -z "$EMAIL" || -z "$TOKEN" ]]; then
   exit 2
 fi
 
-if [[ -n "$SPRINT" ]]; then
-  JQL="sprint = \"${SPRINT}\" AND project = ${PROJECT} ORDER BY status ASC, priority DESC"
-else
-  JQL="sprint in openSprints() AND project = ${PROJECT} ORDER BY status ASC, priority DESC"
-fi
-
-FIELDS="summary,issuetype,status,priority,assignee,flagged,customfield_10021,customfield_10028,customfield_10000,customfield_10097,sprint"
-
-response=$(curl -sS -w "\n%{http_code}" \
-  -u "${EMAIL}:${TOKEN}" \
-  -H "Accept: application/json" \
-  --get "${BASE}/rest/api/3/search" \
-  --data-urlencode "jql=${JQL}" \
-  --data-urlencode "maxResults=100" \
-  --data-urlencode "fields=${FIELDS}" \
-  2>/dev/null)
+# A comma-separated --project list becomes a single `project in (...)` query (hulib.jira.sprint_jql).
+JIRA_BASE_URL="$BASE" JIRA_EMAIL="$EMAIL" JIRA_API_TOKEN="$TOKEN" \
+PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}" \
+  python3 - "$PROJECT" "$SPRINT" "$CONCURRENCY" "$PAGE_SIZE" "$FORMAT" "$SNAPSHOT" <<'PYEOF'
+import sys
 
-http_code=$(echo "$response" | tail -1)
-body=$(echo "$response" | sed '$d')
+from hulib import snapshot, trace
+from hulib.client import HttpError
+from hulib.jira import SPRINT_FIELDS, SPRINT_ORDER, JiraClient, sprint_jql
+from hulib.jsonio import write_json_array, write_ndjson
 
-if [[ "$http_code" != "200" ]]; then
-  echo "Error: Jira API returned HTTP $http_code" >&2
-  echo "$body" >&2
-  exit 3
-fi
+project, sprint, concurrency, page_size, fmt, snapshot_file = sys.argv[1:7]
+jql_filter = sprint_jql(project, sprint)
+write = write_ndjson if fmt == "ndjson" else write_json_array
 
-echo "$body" | python3 -c "
-import json, sys
-data = json.load(sys.stdin)
-issues = data.get('issues', [])
-if not issues:
-    print('[]')
-    sys.exit(0)
-json.dump(issues, sys.stdout, indent=2)
-"
+try:
+    with trace.span("fetch Jira issues", snapshot=bool(snapshot_file)), \
+            JiraClient.from_env(concurrency=int(concurrency)) as jira:
+        if snapshot_file:
+            snap = snapshot.load(snapshot_file)
+            issues = snapshot.refresh_issues(jira, jql_filter, SPRINT_ORDER, SPRINT_FIELDS, snap)
+            write(issues, sys.stdout)
+            snapshot.save(snapshot_file, snap)
+        else:
+            jql = f"{jql_filter} ORDER BY {SPRINT_ORDER}"
+            write(jira.search_parallel(jql, SPRINT_FIELDS, page_size=int(page_size)), sys.stdout)
+except HttpError as e:
+    print(f"Error: Jira API returned HTTP {e.status or 'error'}", file=sys.stderr)
+    print(str(e), file=sys.stderr)
+    sys.exit(3)
+PYEOF
@@ -9,12 +9,21 @@ Usage:
         --end 2026-02-24 \\
         --project SQSH \\
         [--prs prs.json] \\
+        [--pr-index] \\
         [--reviews reviews.json] \\
         [--branches branches.json] \\
+        [--snapshot snapshot.json] \\
+        [--changelog changelog.json] \\
         [-o report.md]
 
+    python3 generate-sprint-report.py \\
+        --tickets tickets.json --prs prs.json \\
+        --split-by-project --output-dir reports/2026-02-20 \\
+        [--teams .cursor/teams.json]
+
 Input formats:
-    tickets.json  — Array of Jira issues (raw MCP output merged into a flat list).
+    tickets.json  — Array (or NDJSON stream) of Jira issues (raw MCP output merged
+                    into a flat list); read incrementally, unused fields are dropped.
                     Each object must have: key, fields.summary, fields.issuetype.name,
                     fields.status.name, fields.status.statusCategory.name,
                     fields.priority.name, fields.assignee.displayName,
@@ -22,25 +31,66 @@ Input formats:
                     Optionally: fields.customfield_10000 (Development),
                     fields.customfield_10097 (Dev Branch).
 
-    prs.json      — (optional) Array of PR objects from search-prs-for-keys.sh.
+    prs.json      — (optional) Array (or NDJSON) of PR objects from search-prs-for-keys.sh.
                     Used as fallback/enrichment alongside Jira dev fields.
                     Each must have: repo, number, title, url, headRefName, state,
                     isDraft, mergedAt.
 
-    reviews.json  — (optional) Object keyed by "repo#number" with { review, checks }.
-    branches.json — (optional) Object keyed by ticket key with [{ repo, ref }].
+    --pr-index    — (optional) Look up fallback PRs for the tickets missing Jira dev info
+                    in the local PR index (hulib/prindex.py) instead of needing prs.json;
+                    a local query, no GitHub calls. Sync it first with
+                    `python3 -m hulib.prindex sync` (search-prs-for-keys.sh --index does).
+                    Combined with --prs, both sets are used.
+
+    reviews.json  — (optional) Object keyed by "repo#number" with { review, checks }, as
+                    written by `sprint-report.py reviews` (hulib/reviews.py). Tickets whose
+                    PR is only known from Jira use "repo#number" for a Jira PR link or
+                    "repo@branch" for a Dev Branch; those entries also carry number and url.
+    branches.json — (optional) Object keyed by ticket key with [{ repo, ref }]: branches
+                    without a PR, as written by `sprint-report.py branches` (hulib/branches.py).
+
+    snapshot.json — (optional) Incremental-refresh snapshot (hulib/snapshot.py).
+                    --prs is treated as a delta: it is merged into the snapshot's PRs,
+                    and the report uses the stored PRs for tickets still missing Jira
+                    dev info — the same set a full fallback search would return.
+
+    changelog.json — (optional) Status / Flagged / Sprint changes per ticket, as written by
+                    `sprint-report.py changelog` or `python3 -m hulib.changelog export`.
+                    Adds a Burndown section (per sprint day: scope, done, remaining, ideal;
+                    in points when the sprint has them) and a Tiempos de Ciclo section
+                    (time In Progress, In Review and blocked per ticket); CSV/JSON rows get
+                    the days per ticket and JSON the burndown.
 
 Output: Markdown report to stdout or -o file.
+
+Org-wide mode (--split-by-project): tickets from several projects are split by key
+prefix, PRs are routed to the projects whose fallback-search keys they mention
+(what a single-team run would have fetched), and each project's report
+is rendered in a separate worker process into <output-dir>/<KEY>.<ext>, together
+with an org roll-up in <output-dir>/ORG.<ext>. Sprint name and dates come from
+each project's own issues.
 """
 
 import argparse
 import csv
 import io
 import json
+import os
 import re
 import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, date
+from functools import lru_cache
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hulib import changelog, snapshot, trace  # noqa: E402
+from hulib.metrics import metrics_db_from_env, record_sprint  # noqa: E402
+from hulib.jsonio import iter_json, iter_json_object  # noqa: E402
+from hulib.keys import extract_ticket_keys  # noqa: E402
+from hulib.prindex import PrIndex, pr_index_path  # noqa: E402
+from hulib.teams import load_teams, team_names  # noqa: E402
 
 JIRA_BASE = "https://humand.atlassian.net/browse"
 
@@ -53,14 +103,84 @@ BACKEND_REPOS = {"humand-main-api"}
 MOBILE_REPOS = {"humand-mobile"}
 TRANSLATION_REPOS = {"hu-translations"}
 
+REPO_ORDER = ["humand-main-api", "humand-web", "humand-mobile", "humand-backoffice", "material-hu", "hu-translations"]
+
 FRONTEND_PREFIXES = ("web ", "admin ", "[web", "[admin")
 BACKEND_PREFIXES = ("backend ",)
 MOBILE_PREFIXES = ("mobile ", "[app", "[mobile", "[ios")
 
+# Issue fields kept by compact_issue(): what Ticket, needs_pr_search and sprint_metadata read.
+# Nested Jira objects (status, assignee, ...) are reduced to the attribute used.
+ISSUE_SCALAR_FIELDS = ("summary", "flagged", "customfield_10021", "customfield_10028",
+                       "customfield_10000", "customfield_10097")
+SPRINT_KEYS = ("name", "startDate", "endDate")
+PR_KEYS = ("repo", "number", "title", "url", "headRefName", "state", "isDraft", "mergedAt")
+
+
+class PullRequest:
+    """A GitHub PR from prs.json, shared by every ticket it mentions."""
+
+    __slots__ = ("repo", "short_repo", "number", "url", "state", "merged", "is_draft", "ready")
+
+    def __init__(self, pr):
+        self.repo = pr["repo"]
+        self.short_repo = short_repo(self.repo)
+        self.number = pr["number"]
+        self.url = pr["url"]
+        self.state = pr["state"]
+        self.merged = bool(pr.get("mergedAt"))
+        self.is_draft = pr.get("isDraft", False)
+        self.ready = self.state == "OPEN" and not self.is_draft and not self.merged  # open, out of draft
+
+
+class Ticket:
+    """A sprint ticket with its PRs; PR buckets, team and category are set once by build_ticket_data."""
+
+    __slots__ = (
+        "key", "summary", "type", "status", "status_cat", "priority", "assignee", "flagged", "points",
+        "prs", "pr_repos", "team", "jira_dev", "jira_branch",
+        "merged_prs", "open_prs", "draft_prs", "category", "_code",
+    )
+
+    def __init__(self, issue):
+        f = issue["fields"]
+        self.key = issue["key"]
+        self.summary = f["summary"]
+        self.type = f["issuetype"]["name"]
+        self.status = f["status"]["name"]
+        self.status_cat = f["status"]["statusCategory"]["name"]
+        self.priority = f["priority"]["name"] if f.get("priority") else "None"
+        self.assignee = f["assignee"]["displayName"] if f.get("assignee") else "—"
+        self.flagged = bool(f.get("customfield_10021") or f.get("flagged"))
+        self.points = f.get("customfield_10028")
+        self.prs = []
+        self.jira_dev = parse_jira_dev_field(f.get("customfield_10000", ""))
+        self.jira_branch = parse_jira_branch_field(f.get("customfield_10097"))
+        self.pr_repos = {self.jira_branch["repo"]} if self.jira_branch else set()
+        self.team = "other"
+        self.merged_prs = self.open_prs = self.draft_prs = ()
+        self.category = None
+        self._code = None
+
+
+class SprintData:
+    """build_ticket_data() result. Unpacks as (ticket_map, categories, repo_stats)."""
+
+    __slots__ = ("ticket_map", "categories", "repo_stats", "flags")
+
+    def __init__(self, ticket_map, categories, repo_stats, flags):
+        self.ticket_map = ticket_map
+        self.categories = categories
+        self.repo_stats = repo_stats
+        self.flags = flags
+
+    def __iter__(self):
+        return iter((self.ticket_map, self.categories, self.repo_stats))
+
 
 def detect_team(ticket, pr_repos):
     """Determine team from ticket title prefix or associated PR repos."""
-    title_lower = ticket["summary"].lower().strip()
+    title_lower = ticket.summary.lower().strip()
 
     if any(title_lower.startswith(p) for p in FRONTEND_PREFIXES):
         return "frontend"
@@ -85,19 +205,27 @@ def detect_team(ticket, pr_repos):
 def sort_key(ticket):
     """Sort by team then priority."""
     return (
-        TEAM_ORDER.get(ticket["_team"], 4),
-        PRIORITY_ORDER.get(ticket["priority"], 99),
+        TEAM_ORDER.get(ticket.team, 4),
+        PRIORITY_ORDER.get(ticket.priority, 99),
     )
 
 
+@lru_cache(maxsize=None)
 def short_repo(repo):
     return repo.replace("humand-", "").replace("hu-", "")
 
 
 def code_summary(ticket):
-    prs = ticket["_prs"]
-    jira_dev = ticket.get("_jira_dev", {})
-    jira_branch = ticket.get("_jira_branch")
+    """Code column text; computed once per ticket (markdown and CSV/JSON rows share it)."""
+    if ticket._code is None:
+        ticket._code = _code_summary(ticket)
+    return ticket._code
+
+
+def _code_summary(ticket):
+    prs = ticket.prs
+    jira_dev = ticket.jira_dev
+    jira_branch = ticket.jira_branch
 
     if not prs:
         if jira_dev.get("pr_state") == "MERGED":
@@ -116,21 +244,14 @@ def code_summary(ticket):
             return "Open PR (repo unknown)"
         if jira_branch:
             return f"Branch in {short_repo(jira_branch['repo'])}, no PR yet"
-        if ticket["status_cat"] == "Done":
+        if ticket.status_cat == "Done":
             return "No code (Jira done)"
         return "—"
 
-    merged_repos = set()
-    open_parts = []
-    draft_parts = []
-    for p in prs:
-        sr = short_repo(p["repo"])
-        if p["merged"]:
-            merged_repos.add(sr)
-        elif p["state"] == "OPEN" and not p["is_draft"]:
-            open_parts.append(f"{sr}#{p['number']} {p['url']}")
-        elif p["is_draft"]:
-            draft_parts.append(f"Draft {sr}#{p['number']} {p['url']}")
+    merged_repos = {p.short_repo for p in ticket.merged_prs}
+    open_parts = [f"{p.short_repo}#{p.number} {p.url}" for p in ticket.open_prs]
+    draft_parts = [f"Draft {p.short_repo}#{p.number} {p.url}" for p in prs
+                   if p.is_draft and not p.merged and not p.ready]
 
     parts = []
     if merged_repos:
@@ -140,66 +261,137 @@ def code_summary(ticket):
     return "; ".join(parts) if parts else "—"
 
 
+def review_key(jira_branch):
+    """reviews.json key for a Jira Dev Branch: "repo#number" for a PR link, else "repo@branch"."""
+    if jira_branch.get("pr_number"):
+        return f"{jira_branch['repo']}#{jira_branch['pr_number']}"
+    return f"{jira_branch['repo']}@{jira_branch['branch']}"
+
+
+def jira_review(ticket, reviews):
+    """reviews.json entry for a ticket whose open PR is only known from Jira, or None."""
+    if ticket.open_prs or not ticket.jira_branch or ticket.jira_dev.get("pr_state") != "OPEN":
+        return None
+    return reviews.get(review_key(ticket.jira_branch))
+
+
+def review_targets(tickets, prs):
+    """reviews.json keys the report can show: open PRs from prs plus Jira PRs still open.
+
+    tickets may be raw/compact issues or Ticket objects.
+    """
+    targets = set()
+    for pr in prs or []:
+        if pr.get("state") == "OPEN" and not pr.get("isDraft") and not pr.get("mergedAt"):
+            targets.add(f"{pr['repo']}#{pr['number']}")
+    for issue in tickets:
+        if isinstance(issue, Ticket):
+            jira_dev, jira_branch = issue.jira_dev, issue.jira_branch
+        else:
+            f = issue["fields"]
+            jira_dev = parse_jira_dev_field(f.get("customfield_10000", ""))
+            jira_branch = parse_jira_branch_field(f.get("customfield_10097"))
+        if jira_branch and jira_dev.get("pr_state") == "OPEN":
+            targets.add(review_key(jira_branch))
+    return sorted(targets)
+
+
 def pr_list_summary(ticket, reviews):
-    prs = ticket["_prs"]
-    open_prs = [p for p in prs if p["state"] == "OPEN" and not p["is_draft"]]
-    if open_prs:
-        parts = []
-        for p in open_prs:
-            parts.append(f"{short_repo(p['repo'])}#{p['number']} {p['url']}")
-        return ", ".join(parts)
-
-    jira_dev = ticket.get("_jira_dev", {})
-    jira_branch = ticket.get("_jira_branch")
+    if ticket.open_prs:
+        return ", ".join(f"{p.short_repo}#{p.number} {p.url}" for p in ticket.open_prs)
+
+    jira_dev = ticket.jira_dev
+    jira_branch = ticket.jira_branch
     if jira_dev.get("pr_state") == "OPEN" and jira_branch:
+        r = jira_review(ticket, reviews)
+        if r and r.get("url"):
+            return f"{short_repo(jira_branch['repo'])}#{r['number']} {r['url']}"
         return f"Open PR in {short_repo(jira_branch['repo'])} (branch: {jira_branch['branch']})"
 
     return "—"
 
 
+# Check states that mean a check has finished and failed (anything else that is
+# not SUCCESS is still running or expected).
+FAILED_CHECKS = {"FAILURE", "ERROR", "CANCELLED", "TIMED_OUT", "ACTION_REQUIRED", "STARTUP_FAILURE"}
+
+
+def review_label(short, r):
+    review = r.get("review") or "REVIEW_REQUIRED"
+    checks = r.get("checks", [])
+    checks_ok = all(c == "SUCCESS" for c in checks) if checks else None
+    if checks_ok is False and not any(c in FAILED_CHECKS for c in checks):
+        checks_ok = None  # pending
+
+    if review == "APPROVED" and checks_ok:
+        return f"{short}: approved, checks green ✓"
+    if review == "CHANGES_REQUESTED":
+        return f"{short}: changes requested"
+    if checks_ok is False:
+        return f"{short}: checks failing"
+    label = "pending review"
+    if checks_ok:
+        label += ", checks green ✓"
+    return f"{short}: {label}"
+
+
 def review_summary(ticket, reviews):
-    prs = ticket["_prs"]
-    open_prs = [p for p in prs if p["state"] == "OPEN" and not p["is_draft"]]
-    parts = []
-    for p in open_prs:
-        short = p["repo"].replace("humand-", "").replace("hu-", "")
-        key = f"{p['repo']}#{p['number']}"
-        r = reviews.get(key, {})
-        review = r.get("review", "REVIEW_REQUIRED")
-        checks = r.get("checks", [])
-        checks_ok = all(c == "SUCCESS" for c in checks) if checks else None
-
-        if review == "APPROVED" and checks_ok:
-            parts.append(f"{short}: approved, checks green ✓")
-        elif review == "CHANGES_REQUESTED":
-            parts.append(f"{short}: changes requested")
-        elif checks_ok is False:
-            parts.append(f"{short}: checks failing")
-        else:
-            label = "pending review"
-            if checks_ok:
-                label += ", checks green ✓"
-            parts.append(f"{short}: {label}")
+    parts = [review_label(p.short_repo, reviews.get(f"{p.repo}#{p.number}", {})) for p in ticket.open_prs]
+    r = jira_review(ticket, reviews)
+    if r is not None:
+        parts.append(review_label(short_repo(ticket.jira_branch["repo"]), r))
     return "; ".join(parts) if parts else ""
 
 
 def activity_summary(ticket, branches_data):
-    prs = ticket["_prs"]
-    jira_dev = ticket.get("_jira_dev", {})
-    jira_branch = ticket.get("_jira_branch")
+    jira_branch = ticket.jira_branch
 
-    if prs or jira_dev.get("pr_count", 0) > 0:
+    if ticket.prs or ticket.jira_dev.get("pr_count", 0) > 0:
         return code_summary(ticket)
 
     if jira_branch:
         return f"Branch in {short_repo(jira_branch['repo'])}, no PR yet"
 
-    branch_info = branches_data.get(ticket["key"], [])
+    branch_info = branches_data.get(ticket.key, [])
     if branch_info:
         repos = ", ".join(sorted(set(short_repo(b["repo"]) for b in branch_info)))
         return f"Branch in {repos}, no PR yet"
 
-    return f"Jira: {ticket['status']}"
+    return f"Jira: {ticket.status}"
+
+
+def needs_pr_search(issue):
+    """True when Jira has no linked PR or Dev Branch for the issue (GitHub fallback needed)."""
+    fields = issue.get("fields", {})
+    dev = fields.get("customfield_10000", "") or ""
+    has_pr = bool(re.search(r'"count":\s*[1-9]', str(dev)))
+    return not has_pr and not fields.get("customfield_10097")
+
+
+def compact_issue(issue):
+    """Raw Jira issue → the same shape with only the fields the report reads.
+
+    Drops avatar/icon URLs, ids and every field outside ISSUE_SCALAR_FIELDS, so
+    a large sprint is held as small dicts instead of full REST payloads.
+    """
+    f = issue["fields"]
+    fields = {name: f[name] for name in ISSUE_SCALAR_FIELDS if name in f}
+    fields["issuetype"] = {"name": f["issuetype"]["name"]}
+    fields["status"] = {"name": f["status"]["name"],
+                        "statusCategory": {"name": f["status"]["statusCategory"]["name"]}}
+    fields["priority"] = {"name": f["priority"]["name"]} if f.get("priority") else None
+    fields["assignee"] = {"displayName": f["assignee"]["displayName"]} if f.get("assignee") else None
+    sprint = f.get("sprint")
+    if isinstance(sprint, dict):
+        fields["sprint"] = {k: sprint[k] for k in SPRINT_KEYS if k in sprint}
+    elif sprint is not None:
+        fields["sprint"] = sprint
+    return {"key": issue["key"], "fields": fields}
+
+
+def compact_pr(pr):
+    """PR object → only the PR_KEYS the report and the snapshot use."""
+    return {k: pr[k] for k in PR_KEYS if k in pr}
 
 
 def parse_jira_dev_field(raw):
@@ -249,131 +441,126 @@ def compute_elapsed_pct(start_str, end_str):
         return None
 
 
+def categorize(t, has_jira_merged, has_jira_open, has_jira_prs):
+    """Category for a ticket whose PR buckets are set. First match wins."""
+    prs = t.prs
+    if t.flagged:
+        return "blocked"
+    if t.status_cat == "Done":
+        return "shipped"
+    if prs and t.merged_prs and all(p.merged or p.state == "CLOSED" for p in prs):
+        return "shipped"
+    if has_jira_merged and not prs:
+        return "shipped"
+    if t.open_prs:
+        return "in_review"
+    if has_jira_open and not prs:
+        return "in_review"
+    if t.status_cat == "In Progress":
+        return "in_progress"
+    if t.draft_prs:
+        return "in_progress"
+    if t.jira_branch is not None and not has_jira_prs:
+        return "in_progress"
+    return "not_started"
+
+
 def build_ticket_data(tickets, prs_list, reviews, branches_data):
-    """Parse tickets + PRs into enriched ticket_map, categories, repo_stats."""
+    """Parse tickets + PRs into a SprintData (ticket_map, categories, repo_stats + observation flags).
+
+    One pass over the tickets sets each ticket's PR buckets, team and category and
+    collects the repo stats and the tickets each observation reports on. tickets
+    may be raw issues or Ticket objects already built while streaming the input.
+    """
     ticket_map = {}
     for issue in tickets:
-        f = issue["fields"]
-        key = issue["key"]
-
-        dev_info = parse_jira_dev_field(f.get("customfield_10000", ""))
-        branch_info = parse_jira_branch_field(f.get("customfield_10097"))
-
-        ticket_map[key] = {
-            "key": key,
-            "summary": f["summary"],
-            "type": f["issuetype"]["name"],
-            "status": f["status"]["name"],
-            "status_cat": f["status"]["statusCategory"]["name"],
-            "priority": f["priority"]["name"] if f.get("priority") else "None",
-            "assignee": f["assignee"]["displayName"] if f.get("assignee") else "—",
-            "flagged": bool(f.get("customfield_10021") or f.get("flagged")),
-            "points": f.get("customfield_10028"),
-            "_prs": [],
-            "_pr_repos": set(),
-            "_team": "other",
-            "_jira_dev": dev_info,
-            "_jira_branch": branch_info,
-        }
-        if branch_info:
-            ticket_map[key]["_pr_repos"].add(branch_info["repo"])
-
-    ticket_keys = set(ticket_map.keys())
-
-    # Enrich from GitHub PR data (fallback / enrichment for PR URLs and review info)
-    for pr in (prs_list or []):
-        title_upper = pr.get("title", "").upper()
-        branch_upper = pr.get("headRefName", "").upper()
-        for tk in ticket_keys:
-            if tk in title_upper or tk in branch_upper:
-                info = {
-                    "repo": pr["repo"],
-                    "number": pr["number"],
-                    "url": pr["url"],
-                    "state": pr["state"],
-                    "merged": bool(pr.get("mergedAt")),
-                    "is_draft": pr.get("isDraft", False),
-                }
-                ticket_map[tk]["_prs"].append(info)
-                ticket_map[tk]["_pr_repos"].add(pr["repo"])
+        t = issue if isinstance(issue, Ticket) else Ticket(issue)
+        ticket_map[t.key] = t
 
-    for t in ticket_map.values():
-        t["_team"] = detect_team(t, t["_pr_repos"])
+    # Enrich from GitHub PR data (fallback / enrichment for PR URLs and review info).
+    # One tokenizing pass per PR, then hash lookups into ticket_map.
+    for pr in (prs_list or []):
+        model = None
+        for tk in extract_ticket_keys(pr.get("title", ""), pr.get("headRefName", "")):
+            t = ticket_map.get(tk)
+            if t is not None:
+                model = model or PullRequest(pr)
+                t.prs.append(model)
+                t.pr_repos.add(model.repo)
 
-    # Categorize
     categories = {"blocked": [], "shipped": [], "in_review": [], "in_progress": [], "not_started": []}
     repo_stats = defaultdict(lambda: {"merged": 0, "open": 0, "wip": 0})
+    flags = {"done_no_code": [], "done_in_progress": [], "done_in_review": [],
+             "code_done_not_jira": [], "unassigned": []}
+    wip_counted = set()  # (repo, branch) of the Jira Dev Branches counted as WIP
 
     for t in ticket_map.values():
-        prs = t["_prs"]
-        merged = [p for p in prs if p["merged"]]
-        open_nondraft = [p for p in prs if p["state"] == "OPEN" and not p["is_draft"]]
-        drafts = [p for p in prs if p["state"] == "OPEN" and p["is_draft"]]
-        jira_dev = t["_jira_dev"]
-        jira_branch = t["_jira_branch"]
-
-        for p in prs:
-            if p["merged"]:
-                repo_stats[p["repo"]]["merged"] += 1
-            elif p["state"] == "OPEN" and not p["is_draft"]:
-                repo_stats[p["repo"]]["open"] += 1
+        prs = t.prs
+        t.team = detect_team(t, t.pr_repos)
+        if prs:
+            t.merged_prs, t.open_prs, t.draft_prs = [], [], []
+            for p in prs:
+                if p.merged:
+                    t.merged_prs.append(p)
+                    repo_stats[p.repo]["merged"] += 1
+                elif p.ready:
+                    t.open_prs.append(p)
+                    repo_stats[p.repo]["open"] += 1
+                elif p.is_draft and p.state == "OPEN":
+                    t.draft_prs.append(p)
+        jira_dev = t.jira_dev
+        jira_branch = t.jira_branch
 
         # Use Jira dev fields when no GitHub PR data was found
         has_jira_merged = jira_dev["pr_state"] == "MERGED" and not jira_dev.get("pr_open", True)
         has_jira_open = jira_dev["pr_state"] == "OPEN" and jira_dev.get("pr_open", False)
-        has_jira_branch = jira_branch is not None
         has_jira_prs = jira_dev["pr_count"] > 0
 
         if has_jira_prs and not prs and jira_branch:
             repo_stats[jira_branch["repo"]]["merged" if has_jira_merged else "open"] += jira_dev["pr_count"]
 
-        if has_jira_branch and not prs and not has_jira_prs:
+        if jira_branch is not None and not prs and not has_jira_prs:
             repo_stats[jira_branch["repo"]]["wip"] += 1
-
-        if t["flagged"]:
-            categories["blocked"].append(t)
-        elif t["status_cat"] == "Done":
-            categories["shipped"].append(t)
-        elif prs and all(p["merged"] or p["state"] == "CLOSED" for p in prs) and merged:
-            categories["shipped"].append(t)
-        elif has_jira_merged and not prs:
-            categories["shipped"].append(t)
-        elif open_nondraft:
-            categories["in_review"].append(t)
-        elif has_jira_open and not prs:
-            categories["in_review"].append(t)
-        elif t["status_cat"] == "In Progress":
-            categories["in_progress"].append(t)
-        elif drafts:
-            categories["in_progress"].append(t)
-        elif has_jira_branch and not has_jira_prs:
-            categories["in_progress"].append(t)
-        else:
-            categories["not_started"].append(t)
+            wip_counted.add((jira_branch["repo"], jira_branch["branch"]))
+
+        t.category = categorize(t, has_jira_merged, has_jira_open, has_jira_prs)
+        categories[t.category].append(t)
+
+        done = t.status_cat == "Done"
+        if t.category == "shipped" and not prs and jira_dev["pr_count"] == 0 and not jira_branch:
+            flags["done_no_code"].append(t)
+        if done and t.category == "in_progress":
+            flags["done_in_progress"].append(t)
+        if done and t.category == "in_review":
+            flags["done_in_review"].append(t)
+        if not done and prs and len(t.merged_prs) == len(prs):
+            flags["code_done_not_jira"].append(t)
+        if t.assignee == "—" and t.type not in ("Epic", "Story", "Initiative"):
+            flags["unassigned"].append(t)
 
     for branch_key, branch_list in branches_data.items():
         if branch_key in ticket_map:
             for b in branch_list:
+                if (b["repo"], b["ref"]) in wip_counted:
+                    continue  # already counted as a ticket's Jira Dev Branch
                 repo_stats[b["repo"]]["wip"] += 1
 
-    for cat in categories.values():
-        cat.sort(key=sort_key)
+    # Category lists (and the observations listed in category order) sort stably by team/priority.
+    for items in categories.values():
+        items.sort(key=sort_key)
+    for name in ("done_no_code", "done_in_progress", "done_in_review"):
+        flags[name].sort(key=sort_key)
 
-    return ticket_map, categories, dict(repo_stats)
+    return SprintData(ticket_map, categories, dict(repo_stats), flags)
 
 
-def generate_observations(categories, ticket_map, repo_stats, elapsed_pct, start, end):
-    """Auto-generate data-backed observations."""
+def generate_observations(data, elapsed_pct):
+    """Auto-generate data-backed observations from the flags collected by build_ticket_data."""
     obs = []
+    flags = data.flags
+    total = len(data.ticket_map)
 
-    shipped = categories["shipped"]
-    in_review = categories["in_review"]
-    in_progress = categories["in_progress"]
-    blocked = categories["blocked"]
-    not_started = categories["not_started"]
-    total = len(ticket_map)
-
-    del_pct = round(len(shipped) / total * 100) if total else 0
+    del_pct = round(len(data.categories["shipped"]) / total * 100) if total else 0
 
     if elapsed_pct is not None and del_pct < elapsed_pct - 20:
         obs.append(
@@ -381,44 +568,26 @@ def generate_observations(categories, ticket_map, repo_stats, elapsed_pct, start
             f"delivery is trailing the timeline."
         )
 
-    done_no_code = [t for t in shipped if not t["_prs"] and t["_jira_dev"]["pr_count"] == 0 and not t["_jira_branch"]]
-    if done_no_code:
-        keys = ", ".join(t["key"] for t in done_no_code)
+    if flags["done_no_code"]:
+        keys = ", ".join(t.key for t in flags["done_no_code"])
         obs.append(f"Tickets marked Done with no linked code: {keys}. Could be non-code tasks or missing PR links.")
 
-    in_progress_done_jira = [
-        t for t in in_progress
-        if t["status_cat"] == "Done"
-    ]
-    in_review_done_jira = [
-        t for t in in_review
-        if t["status_cat"] == "Done"
-    ]
-    mismatches = in_progress_done_jira + in_review_done_jira
+    mismatches = flags["done_in_progress"] + flags["done_in_review"]
     if mismatches:
-        keys = ", ".join(t["key"] for t in mismatches)
+        keys = ", ".join(t.key for t in mismatches)
         obs.append(f"Jira/code status mismatch — these are 'Done' in Jira but code is not fully merged: {keys}.")
 
-    code_done_not_jira = [
-        t for t in ticket_map.values()
-        if t["status_cat"] != "Done"
-        and t["_prs"]
-        and all(p["merged"] for p in t["_prs"])
-    ]
-    if code_done_not_jira:
-        keys = ", ".join(t["key"] for t in code_done_not_jira)
+    if flags["code_done_not_jira"]:
+        keys = ", ".join(t.key for t in flags["code_done_not_jira"])
         obs.append(f"All PRs merged but Jira not 'Done': {keys}. May need status update.")
 
-    unassigned = [
-        t for t in ticket_map.values()
-        if t["assignee"] == "—" and t["type"] not in ("Epic", "Story", "Initiative")
-    ]
-    if unassigned:
-        keys = ", ".join(t["key"] for t in unassigned)
+    if flags["unassigned"]:
+        keys = ", ".join(t.key for t in flags["unassigned"])
         obs.append(f"Unassigned tickets: {keys}.")
 
+    blocked = data.categories["blocked"]
     if blocked:
-        keys = ", ".join(t["key"] for t in blocked)
+        keys = ", ".join(t.key for t in blocked)
         obs.append(f"Blocked tickets: {keys}. Check impediments in Jira.")
 
     if not obs:
@@ -427,10 +596,62 @@ def generate_observations(categories, ticket_map, repo_stats, elapsed_pct, start
     return obs
 
 
-def build_report(tickets, prs_list, reviews, branches_data, sprint_name, start, end, project):
-    ticket_map, categories, repo_stats = build_ticket_data(tickets, prs_list, reviews, branches_data)
+def build_analytics(ticket_map, history, sprint_name, start, end):
+    """Changelogs (hulib/changelog.py) → (burndown rows, {key: Cycle}); the burndown is in points if any."""
+    has_points = any(t.points for t in ticket_map.values())
+    tickets = {key: (t.status, t.status_cat, (t.points or 0) if has_points else 1) for key, t in ticket_map.items()}
+    burndown = changelog.burndown(history, tickets, sprint_name, start, end)
+    cycles = changelog.cycle_times(history, {key: ticket[:2] for key, ticket in tickets.items()})
+    return burndown, cycles
+
+
+def format_days(value):
+    return "—" if value is None else f"{value:.1f} d"
+
+
+def analytics_lines(ticket_map, burndown, cycles):
+    """Burndown and Tiempos de Ciclo sections."""
+    lines = []
+    if burndown:
+        unit = "puntos" if any(t.points for t in ticket_map.values()) else "tickets"
+        number = lambda v: f"{round(v, 1):g}"
+        lines.append(f"## Burndown ({unit})\n")
+        lines.append("| Fecha | Alcance | Hecho | Restante | Ideal |")
+        lines.append("|-------|---------|-------|----------|-------|")
+        for r in burndown:
+            lines.append(f"| {r['date']} | {number(r['scope'])} | {number(r['done'])} | {number(r['remaining'])}"
+                         f" | {number(r['ideal'])} |")
+        lines.append("")
+
+    lines.append("## Tiempos de Ciclo\n")
+    if not cycles:
+        lines.append("Ningún ticket pasó por En Progreso o En Revisión.\n")
+        return lines
+    summary = changelog.summarize(cycles)
+    lines.append(f"**Ciclo mediano: {format_days(summary['median_days'])} · p85: {format_days(summary['p85_days'])}**"
+                 f" ({summary['started']} iniciados, {summary['finished']} terminados)\n")
+    lines.append("| Ticket | Título | Estado | En Progreso | En Revisión | Bloqueado | Ciclo |")
+    lines.append("|--------|--------|--------|-------------|-------------|-----------|-------|")
+    days = changelog.in_days
+    for key, c in sorted(cycles.items(), key=lambda item: (-item[1].cycle, item[0])):
+        t = ticket_map[key]
+        lines.append(f"| {key} {JIRA_BASE}/{key} | {t.summary[:65]} | {t.status} | {format_days(days(c.in_progress))}"
+                     f" | {format_days(days(c.in_review))} | {format_days(days(c.blocked))}"
+                     f" | {format_days(days(c.cycle))}{'' if c.done else ' (abierto)'} |")
+    lines.append("")
+    return lines
+
+
+def build_report(tickets, prs_list, reviews, branches_data, sprint_name, start, end, project, data=None,
+                 history=None):
+    """Render the markdown report. `data` reuses an existing build_ticket_data() result.
 
-    has_points = any(t["points"] for t in ticket_map.values())
+    With history (changelog.json, hulib/changelog.py), the Burndown and Tiempos de Ciclo sections are added.
+    """
+    data = data or build_ticket_data(tickets, prs_list, reviews, branches_data)
+    ticket_map, categories, repo_stats = data
+
+    has_points = any(t.points for t in ticket_map.values())
     total = len(ticket_map)
     shipped = categories["shipped"]
     in_review = categories["in_review"]
@@ -439,7 +660,7 @@ def build_report(tickets, prs_list, reviews, branches_data, sprint_name, start,
     not_started = categories["not_started"]
 
     def pts(items):
-        return sum(t["points"] or 0 for t in items)
+        return sum(t.points or 0 for t in items)
 
     del_pct = round(len(shipped) / total * 100) if total else 0
     elapsed_pct = compute_elapsed_pct(start, end)
@@ -492,7 +713,7 @@ def build_report(tickets, prs_list, reviews, branches_data, sprint_name, start,
         lines.append("| Ticket | Título | Tipo | Responsable | Código |")
         lines.append("|--------|--------|------|-------------|--------|")
         for t in shipped:
-            lines.append(f"| {t['key']} {jira(t['key'])} | {t['summary'][:65]} | {t['type']} | {t['assignee']} | {code_summary(t)} |")
+            lines.append(f"| {t.key} {jira(t.key)} | {t.summary[:65]} | {t.type} | {t.assignee} | {code_summary(t)} |")
         lines.append("")
 
     if in_review:
@@ -501,7 +722,7 @@ def build_report(tickets, prs_list, reviews, branches_data, sprint_name, start,
         lines.append("|--------|--------|------|-------------|-----|--------------------|")
         for t in in_review:
             lines.append(
-                f"| {t['key']} {jira(t['key'])} | {t['summary'][:65]} | {t['type']} | {t['assignee']}"
+                f"| {t.key} {jira(t.key)} | {t.summary[:65]} | {t.type} | {t.assignee}"
                 f" | {pr_list_summary(t, reviews)} | {review_summary(t, reviews)} |"
             )
         lines.append("")
@@ -511,7 +732,7 @@ def build_report(tickets, prs_list, reviews, branches_data, sprint_name, start,
         lines.append("| Ticket | Título | Tipo | Responsable | Actividad |")
         lines.append("|--------|--------|------|-------------|-----------|")
         for t in in_progress:
-            lines.append(f"| {t['key']} {jira(t['key'])} | {t['summary'][:65]} | {t['type']} | {t['assignee']} | {activity_summary(t, branches_data)} |")
+            lines.append(f"| {t.key} {jira(t.key)} | {t.summary[:65]} | {t.type} | {t.assignee} | {activity_summary(t, branches_data)} |")
         lines.append("")
 
     if blocked:
@@ -519,7 +740,7 @@ def build_report(tickets, prs_list, reviews, branches_data, sprint_name, start,
         lines.append("| Ticket | Título | Responsable | Notas |")
         lines.append("|--------|--------|-------------|-------|")
         for t in blocked:
-            lines.append(f"| {t['key']} {jira(t['key'])} | {t['summary'][:65]} | {t['assignee']} | Flaggeado en Jira |")
+            lines.append(f"| {t.key} {jira(t.key)} | {t.summary[:65]} | {t.assignee} | Flaggeado en Jira |")
         lines.append("")
 
     if not_started:
@@ -527,21 +748,25 @@ def build_report(tickets, prs_list, reviews, branches_data, sprint_name, start,
         lines.append("| Ticket | Título | Tipo | Responsable |")
         lines.append("|--------|--------|------|-------------|")
         for t in not_started:
-            lines.append(f"| {t['key']} {jira(t['key'])} | {t['summary'][:65]} | {t['type']} | {t['assignee']} |")
+            lines.append(f"| {t.key} {jira(t.key)} | {t.summary[:65]} | {t.type} | {t.assignee} |")
         lines.append("")
 
     lines.append("---\n")
     lines.append("## Desglose por Repo\n")
     lines.append("| Repo | Mergeados | PRs Abiertos | Branches WIP |")
     lines.append("|------|-----------|--------------|--------------|")
-    for repo in ["humand-main-api", "humand-web", "humand-mobile", "humand-backoffice", "material-hu", "hu-translations"]:
+    for repo in REPO_ORDER:
         s = repo_stats.get(repo, {"merged": 0, "open": 0, "wip": 0})
         lines.append(f"| {repo} | {s['merged']} | {s['open']} | {s['wip']} |")
     lines.append("")
 
+    if history is not None:
+        lines.append("---\n")
+        lines.extend(analytics_lines(ticket_map, *build_analytics(ticket_map, history, sprint_name, start, end)))
+
     lines.append("---\n")
     lines.append("## Observaciones\n")
-    for obs in generate_observations(categories, ticket_map, repo_stats, elapsed_pct, start, end):
+    for obs in generate_observations(data, elapsed_pct):
         lines.append(f"- {obs}")
     lines.append("")
 
@@ -566,33 +791,71 @@ CATEGORY_LABELS = {
 }
 
 
-def build_flat_rows(ticket_map, categories):
-    """Flatten tickets into dicts suitable for CSV/JSON export."""
+CYCLE_COLUMNS = ("in_progress_days", "in_review_days", "blocked_days", "cycle_days")
+
+
+def build_flat_rows(ticket_map, categories, cycles=None):
+    """Flatten tickets into dicts suitable for CSV/JSON export; with cycles, the CYCLE_COLUMNS too."""
     rows = []
     for cat_key, label in CATEGORY_LABELS.items():
         for t in categories[cat_key]:
-            rows.append({
-                "key": t["key"],
-                "summary": t["summary"],
-                "type": t["type"],
-                "status": t["status"],
+            row = {
+                "key": t.key,
+                "summary": t.summary,
+                "type": t.type,
+                "status": t.status,
                 "category": label,
-                "priority": t["priority"],
-                "assignee": t["assignee"],
-                "points": t["points"],
+                "priority": t.priority,
+                "assignee": t.assignee,
+                "points": t.points,
                 "code": code_summary(t),
-            })
+            }
+            if cycles is not None:
+                c = cycles.get(t.key)
+                row.update(zip(CYCLE_COLUMNS, (changelog.in_days(c.in_progress), changelog.in_days(c.in_review),
+                                               changelog.in_days(c.blocked), changelog.in_days(c.cycle))
+                               if c else (None,) * len(CYCLE_COLUMNS)))
+            rows.append(row)
     return rows
 
 
+def metric_rows(ticket_map):
+    """Per-ticket rows for the historical metrics store (hulib/metrics.py)."""
+    return [{
+        "key": t.key,
+        "summary": t.summary,
+        "type": t.type,
+        "status": t.status,
+        "category": t.category,
+        "priority": t.priority,
+        "assignee": t.assignee,
+        "team": t.team,
+        "points": t.points,
+        "code": code_summary(t),
+        "merged_prs": len(t.merged_prs),
+        "open_prs": len(t.open_prs),
+        "draft_prs": len(t.draft_prs),
+    } for t in ticket_map.values()]
+
+
+def record_metrics(db, project, sprint_name, start, end, data):
+    """Store the rendered sprint in the metrics store at db (None: recording is off)."""
+    if db is None:
+        return
+    with trace.span("record metrics", tickets=len(data.ticket_map)):
+        record_sprint(db, project, sprint_name, start, end, metric_rows(data.ticket_map), data.repo_stats)
+
+
 def output_csv(rows, out):
     fieldnames = ["key", "summary", "type", "status", "category", "priority", "assignee", "points", "code"]
+    if rows and CYCLE_COLUMNS[0] in rows[0]:
+        fieldnames += CYCLE_COLUMNS
     writer = csv.DictWriter(out, fieldnames=fieldnames)
     writer.writeheader()
     writer.writerows(rows)
 
 
-def output_json(rows, sprint_name, start, end, project, out):
+def output_json(rows, sprint_name, start, end, project, out, burndown=None):
     payload = {
         "sprint": sprint_name,
         "project": project,
@@ -601,55 +864,303 @@ def output_json(rows, sprint_name, start, end, project, out):
         "generated": datetime.now().strftime("%Y-%m-%d %H:%M"),
         "tickets": rows,
     }
+    if burndown is not None:
+        payload["burndown"] = burndown
     json.dump(payload, out, indent=2, ensure_ascii=False)
     out.write("\n")
 
 
+def sprint_metadata(issues):
+    """First sprint name/startDate/endDate found on the issues → (name, start, end)."""
+    def first(field, default):
+        for i in issues:
+            sprint = i.get("fields", {}).get("sprint") or {}
+            if sprint.get(field):
+                return sprint[field]
+        return default
+
+    return first("name", ""), first("startDate", "unknown")[:10], first("endDate", "unknown")[:10]
+
+
+def project_of(key):
+    return key.split("-", 1)[0]
+
+
+def split_by_project(tickets, prs_list):
+    """Group tickets by key prefix and route PRs to projects.
+
+    A PR goes to every project with a ticket that needs the GitHub fallback
+    search and is mentioned by the PR, which is the PR set a single-team run
+    for that project would have fetched.
+    """
+    tickets_by_project = defaultdict(list)
+    search_keys = set()
+    for issue in tickets:
+        tickets_by_project[project_of(issue["key"])].append(issue)
+        if needs_pr_search(issue):
+            search_keys.add(issue["key"])
+    prs_by_project = defaultdict(list)
+    for pr in prs_list or []:
+        keys = extract_ticket_keys(pr.get("title", ""), pr.get("headRefName", "")) & search_keys
+        for project in sorted({project_of(k) for k in keys}):
+            prs_by_project[project].append(pr)
+    return tickets_by_project, prs_by_project
+
+
+def summarize(ticket_map, categories, repo_stats):
+    """Counts/points per category for the org roll-up."""
+    summary = {cat: len(items) for cat, items in categories.items()}
+    summary["total"] = len(ticket_map)
+    summary["points"] = sum(t.points or 0 for t in ticket_map.values())
+    summary["shipped_points"] = sum(t.points or 0 for t in categories["shipped"])
+    summary["repo_stats"] = repo_stats
+    return summary
+
+
+def write_rows(data, fmt, sprint_name, start, end, project, out, history=None):
+    """CSV or JSON export of a build_ticket_data() result; history adds the cycle times and burndown."""
+    burndown = cycles = None
+    if history is not None:
+        burndown, cycles = build_analytics(data.ticket_map, history, sprint_name, start, end)
+    rows = build_flat_rows(data.ticket_map, data.categories, cycles)
+    if fmt == "csv":
+        output_csv(rows, out)
+    else:
+        output_json(rows, sprint_name, start, end, project, out, burndown)
+
+
+def project_history(history, project):
+    """The changelog.json entries of one project's tickets (None stays None)."""
+    if history is None:
+        return None
+    return {"statuses": history.get("statuses", {}),
+            "issues": {k: v for k, v in history.get("issues", {}).items() if project_of(k) == project}}
+
+
+def render_project(job):
+    """Worker: build one project's report in the requested format → (project, text, meta, summary)."""
+    project, tickets, prs, reviews, branches, fmt, metrics_db, history = job
+    sprint_name, start, end = sprint_metadata(tickets)
+    sprint_name = sprint_name or f"{project} Sprint"
+    data = build_ticket_data(tickets, prs, reviews, branches)
+    record_metrics(metrics_db, project, sprint_name, start, end, data)
+    if fmt == "markdown":
+        text = build_report(tickets, prs, reviews, branches, sprint_name, start, end, project, data=data,
+                            history=history)
+    else:
+        out = io.StringIO()
+        write_rows(data, fmt, sprint_name, start, end, project, out, history)
+        text = out.getvalue()
+    return project, text, (sprint_name, start, end), summarize(*data)
+
+
+def build_rollup(results, team_names, fmt):
+    """Org roll-up across projects: one row per team plus totals and a repo breakdown."""
+    rows = []
+    totals = defaultdict(int)
+    repo_totals = {repo: {"merged": 0, "open": 0, "wip": 0} for repo in REPO_ORDER}
+    for project, _, (sprint_name, start, end), summary in results:
+        total = summary["total"]
+        rows.append({
+            "project": project,
+            "team": team_names.get(project, project),
+            "sprint": sprint_name,
+            "start": start,
+            "end": end,
+            "total": total,
+            "shipped": summary["shipped"],
+            "in_review": summary["in_review"],
+            "in_progress": summary["in_progress"],
+            "blocked": summary["blocked"],
+            "not_started": summary["not_started"],
+            "points": summary["points"],
+            "shipped_points": summary["shipped_points"],
+            "delivery_pct": round(summary["shipped"] / total * 100) if total else 0,
+        })
+        for field in ("total", "shipped", "in_review", "in_progress", "blocked", "not_started", "points", "shipped_points"):
+            totals[field] += summary[field]
+        for repo, stats in summary["repo_stats"].items():
+            agg = repo_totals.setdefault(repo, {"merged": 0, "open": 0, "wip": 0})
+            for field in ("merged", "open", "wip"):
+                agg[field] += stats[field]
+
+    if fmt == "json":
+        payload = {"generated": datetime.now().strftime("%Y-%m-%d %H:%M"), "teams": rows,
+                   "totals": dict(totals), "repos": repo_totals}
+        return json.dumps(payload, indent=2, ensure_ascii=False) + "\n"
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=list(rows[0].keys()) if rows else ["project"])
+        writer.writeheader()
+        writer.writerows(rows)
+        return out.getvalue()
+
+    org_pct = round(totals["shipped"] / totals["total"] * 100) if totals["total"] else 0
+    lines = []
+    lines.append("# Reporte de Sprint: Organización\n")
+    lines.append(f"**Equipos:** {len(rows)}")
+    lines.append(f"**Generado:** {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
+    lines.append("## Salud por Equipo\n")
+    lines.append("| Equipo | Sprint | Fechas | ✅ | 👀 | 🔨 | 🚫 | ⏳ | Total | Entrega |")
+    lines.append("|--------|--------|--------|----|----|----|----|----|-------|---------|")
+    for r in rows:
+        dates = f"{r['start']} — {r['end']}" if r["start"] != "unknown" and r["end"] != "unknown" else "—"
+        lines.append(
+            f"| {r['team']} ({r['project']}) | {r['sprint']} | {dates} | {r['shipped']} | {r['in_review']}"
+            f" | {r['in_progress']} | {r['blocked']} | {r['not_started']} | {r['total']} | {r['delivery_pct']}% |"
+        )
+    lines.append(
+        f"| **Total** | | | **{totals['shipped']}** | **{totals['in_review']}** | **{totals['in_progress']}**"
+        f" | **{totals['blocked']}** | **{totals['not_started']}** | **{totals['total']}** | **{org_pct}%** |"
+    )
+    lines.append("")
+    if totals["points"]:
+        pts_pct = round(totals["shipped_points"] / totals["points"] * 100)
+        lines.append(f"**Entrega: {org_pct}% de tickets entregados ({pts_pct}% por puntos)**\n")
+    else:
+        lines.append(f"**Entrega: {org_pct}% de tickets entregados**\n")
+    lines.append("---\n")
+    lines.append("## Desglose por Repo\n")
+    lines.append("| Repo | Mergeados | PRs Abiertos | Branches WIP |")
+    lines.append("|------|-----------|--------------|--------------|")
+    for repo in REPO_ORDER:
+        s = repo_totals[repo]
+        lines.append(f"| {repo} | {s['merged']} | {s['open']} | {s['wip']} |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def load_team_names(path):
+    return team_names(load_teams(path)) if path else {}
+
+
+FORMAT_EXT = {"markdown": "md", "csv": "csv", "json": "json"}
+
+
+def render_all_projects(tickets, prs, reviews, branches, fmt, output_dir, team_names, workers=None,
+                        metrics_db=None, history=None):
+    """Split by project, render each report in a worker process, write files + ORG roll-up.
+
+    With metrics_db, each worker also records its project's sprint there (hulib/metrics.py);
+    with history (changelog.json), each report gets its burndown and cycle times.
+    """
+    tickets_by_project, prs_by_project = split_by_project(tickets, prs)
+    jobs = [
+        (project, project_tickets, prs_by_project.get(project, []), reviews,
+         {k: v for k, v in branches.items() if project_of(k) == project}, fmt, metrics_db,
+         project_history(history, project))
+        for project, project_tickets in sorted(tickets_by_project.items())
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(render_project, jobs))
+
+    os.makedirs(output_dir, exist_ok=True)
+    ext = FORMAT_EXT[fmt]
+    for project, text, _, _ in results:
+        with open(os.path.join(output_dir, f"{project}.{ext}"), "w") as f:
+            f.write(text)
+    rollup_path = os.path.join(output_dir, f"ORG.{ext}")
+    with open(rollup_path, "w") as f:
+        f.write(build_rollup(results, team_names, fmt))
+    return [project for project, _, _, _ in results], rollup_path
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate sprint report from Jira + GitHub data")
     parser.add_argument("--tickets", required=True, help="Jira tickets JSON file (array of issues)")
     parser.add_argument("--prs", default=None, help="PRs JSON file from search-prs-for-keys.sh (optional enrichment)")
-    parser.add_argument("--sprint", required=True, help="Sprint name")
-    parser.add_argument("--start", required=True, help="Sprint start date")
-    parser.add_argument("--end", required=True, help="Sprint end date")
-    parser.add_argument("--project", required=True, help="Jira project key")
+    parser.add_argument("--sprint", help="Sprint name (required unless --split-by-project)")
+    parser.add_argument("--start", help="Sprint start date (required unless --split-by-project)")
+    parser.add_argument("--end", help="Sprint end date (required unless --split-by-project)")
+    parser.add_argument("--project", help="Jira project key (required unless --split-by-project)")
+    parser.add_argument("--pr-index", action="store_true",
+                        help="Fallback PRs from the local PR index (hulib/prindex.py) (optional)")
     parser.add_argument("--reviews", default=None, help="Reviews JSON (optional)")
     parser.add_argument("--branches", default=None, help="Branches JSON (optional)")
+    parser.add_argument("--snapshot", default=None,
+                        help="Snapshot file for incremental refreshes; --prs is merged in as a delta (optional)")
+    parser.add_argument("--changelog", default=None,
+                        help="Changelogs JSON, for the burndown and cycle-time sections (optional)")
     parser.add_argument("--format", default="markdown", choices=["markdown", "csv", "json"],
                         help="Output format (default: markdown)")
     parser.add_argument("-o", "--output", default=None, help="Output file (default: stdout)")
+    parser.add_argument("--split-by-project", action="store_true",
+                        help="Org-wide mode: one report per project key plus an ORG roll-up")
+    parser.add_argument("--output-dir", default=None, help="Directory for --split-by-project reports")
+    parser.add_argument("--teams", default=None, help="teams.json, for team names in the roll-up (optional)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --split-by-project")
 
     args = parser.parse_args()
-
-    with open(args.tickets) as f:
-        tickets = json.load(f)
+    if args.split_by_project:
+        if not args.output_dir:
+            parser.error("--split-by-project requires --output-dir")
+    else:
+        missing = [f"--{name}" for name in ("sprint", "start", "end", "project") if not getattr(args, name)]
+        if missing:
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
+
+    # Inputs are streamed (JSON array or NDJSON) and each raw issue is reduced as soon
+    # as it is decoded: split mode keeps compact issues for the workers, single-project
+    # mode builds the Ticket model directly, so the raw payload is never held whole.
+    tickets, search_keys = [], []
+    with trace.span("ingest tickets"), open(args.tickets) as f:
+        for issue in iter_json(f):
+            if needs_pr_search(issue):
+                search_keys.append(issue["key"])
+            tickets.append(compact_issue(issue) if args.split_by_project else Ticket(issue))
     prs = []
     if args.prs:
-        with open(args.prs) as f:
-            prs = json.load(f)
+        with trace.span("ingest PRs"), open(args.prs) as f:
+            prs = [compact_pr(pr) for pr in iter_json(f)]
+    if args.pr_index:
+        with trace.span("lookup PR index", keys=len(search_keys)), PrIndex(pr_index_path()) as index:
+            by_id = {(pr["repo"], pr["number"]): pr for pr in prs}
+            by_id.update(((pr["repo"], pr["number"]), compact_pr(pr)) for pr in index.lookup(search_keys))
+            prs = [by_id[k] for k in sorted(by_id)]
+
+    if args.snapshot:
+        with trace.span("snapshot merge + save"):
+            snap = snapshot.load(args.snapshot)
+            prs = snapshot.merge_prs(snap, prs, search_keys)
+            snapshot.save(args.snapshot, snap)
 
     reviews = {}
     if args.reviews:
         with open(args.reviews) as f:
-            reviews = json.load(f)
+            reviews = dict(iter_json_object(f))
 
     branches = {}
     if args.branches:
         with open(args.branches) as f:
-            branches = json.load(f)
+            branches = dict(iter_json_object(f))
+
+    history = None
+    if args.changelog:
+        with open(args.changelog) as f:
+            history = json.load(f)
+
+    if args.split_by_project:
+        with trace.span("render all projects", tickets=len(tickets)):
+            projects, rollup_path = render_all_projects(
+                tickets, prs, reviews, branches, args.format, args.output_dir,
+                load_team_names(args.teams), workers=args.workers, metrics_db=metrics_db_from_env(),
+                history=history,
+            )
+        print(f"Wrote {len(projects)} reports + {rollup_path}", file=sys.stderr)
+        return
 
     out_file = open(args.output, "w") if args.output else sys.stdout
     try:
-        if args.format == "markdown":
-            report = build_report(tickets, prs, reviews, branches, args.sprint, args.start, args.end, args.project)
-            out_file.write(report)
-        else:
-            ticket_map, categories, repo_stats = build_ticket_data(tickets, prs, reviews, branches)
-            rows = build_flat_rows(ticket_map, categories)
-            if args.format == "csv":
-                output_csv(rows, out_file)
-            elif args.format == "json":
-                output_json(rows, args.sprint, args.start, args.end, args.project, out_file)
+        with trace.span("build ticket data", tickets=len(tickets), prs=len(prs)):
+            data = build_ticket_data(tickets, prs, reviews, branches)
+        record_metrics(metrics_db_from_env(), args.project, args.sprint, args.start, args.end, data)
+        with trace.span(f"render {args.format}"):
+            if args.format == "markdown":
+                report = build_report(tickets, prs, reviews, branches, args.sprint, args.start, args.end,
+                                      args.project, data=data, history=history)
+                out_file.write(report)
+            else:
+                write_rows(data, args.format, args.sprint, args.start, args.end, args.project, out_file, history)
     finally:
         if args.output and out_file is not sys.stdout:
             out_file.close()
@@ -0,0 +1,5 @@
+"""hulib — shared Python helpers for the .cursor/scripts shell entry points.
+
+The shell scripts keep their CLI contracts and call into these modules via
+`PYTHONPATH="$SCRIPT_DIR" python3 ...`, so everything here is stdlib-only.
+"""
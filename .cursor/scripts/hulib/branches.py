@@ -0,0 +1,131 @@
+"""WIP branch scan: ticket key → branches with no PR, for the report's branches.json.
+
+One aliased GraphQL request lists, for every repo and project prefix, the
+branches whose name contains the prefix (`refs(refPrefix: "refs/heads/",
+query: ...)`, paged with cursors), each with the count of its open or merged
+PRs. Branch names are matched to the sprint's keys through one set lookup per
+ticket key a name mentions (hulib/keys.py), never one scan per key. Branches
+that already have a PR are left out: the report counts them through the PRs.
+
+Listings go through `gh api graphql` (hulib/github.py) and are cached between
+runs for HUMAND_CACHE_BRANCHES_MAX_AGE seconds (default 600) even without
+HUMAND_CACHE=1; HUMAND_CACHE=0 refetches.
+
+CLI:
+    python3 -m hulib.branches <repo>... -- <KEY>...    # branches.json on stdout
+"""
+
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from . import trace
+from .cache import cache_from_env
+from .github import ALIASES_PER_REQUEST, CONCURRENCY, ORG, PAGE_SIZE, RATE_LIMIT_FIELDS, GitHubError, graphql
+from .keys import extract_ticket_keys
+
+REPOS = ("humand-main-api", "humand-web", "humand-mobile", "humand-backoffice", "material-hu", "hu-translations")
+
+DEFAULT_MAX_AGE = 600
+
+REF_FIELDS = "name associatedPullRequests(first: 1, states: [OPEN, MERGED]) { totalCount }"
+
+
+def ref_queries(keys):
+    """Ref name filters for keys: each project prefix, lower- and upper-case (branch names use both)."""
+    prefixes = sorted({k.split("-", 1)[0] for k in keys})
+    return sorted({p.lower() for p in prefixes} | set(prefixes))
+
+
+def build_request(searches, org=ORG, page_size=PAGE_SIZE):
+    """One GraphQL document with an aliased `repository { refs }` per (alias, repo, query, cursor)."""
+    parts = []
+    for alias, repo, query, cursor in searches:
+        after = f", after: {json.dumps(cursor)}" if cursor else ""
+        parts.append(
+            f"  {alias}: repository(owner: {json.dumps(org)}, name: {json.dumps(repo)}) {{\n"
+            f"    refs(refPrefix: \"refs/heads/\", query: {json.dumps(query)}, first: {page_size}{after}) {{\n"
+            f"      pageInfo {{ hasNextPage endCursor }}\n"
+            f"      nodes {{ {REF_FIELDS} }}\n"
+            f"    }}\n"
+            f"  }}"
+        )
+    parts.append(f"  {RATE_LIMIT_FIELDS}")
+    return "query {\n" + "\n".join(parts) + "\n}"
+
+
+def list_refs(repos, queries, cache=None, max_age=None, concurrency=CONCURRENCY):
+    """→ {(repo, branch): has_pr} for the branches of repos whose name matches any of queries."""
+    aliases = iter(f"b{i}" for i in range(1 << 30))
+    pending = [(next(aliases), repo, query, None) for repo in repos for query in queries]
+    refs = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while pending:
+            batches = [pending[i:i + ALIASES_PER_REQUEST] for i in range(0, len(pending), ALIASES_PER_REQUEST)]
+            results = pool.map(lambda batch: graphql(build_request(batch), cache, "graphql refs", max_age), batches)
+            next_pending = []
+            for batch, data in zip(batches, results):
+                for alias, repo, query, _ in batch:
+                    result = ((data.get(alias) or {}).get("refs")) or {}
+                    for node in result.get("nodes") or []:
+                        prs = (node.get("associatedPullRequests") or {}).get("totalCount", 0)
+                        refs[(repo, node["name"])] = prs > 0
+                    page_info = result.get("pageInfo") or {}
+                    if page_info.get("hasNextPage"):
+                        next_pending.append((alias, repo, query, page_info.get("endCursor")))
+            pending = next_pending
+    return refs
+
+
+def index_branches(refs, keys):
+    """{(repo, branch): has_pr} → {key: [{repo, ref}]} for the branches without a PR that mention keys."""
+    keys = set(keys)
+    branches = {}
+    for (repo, name), has_pr in sorted(refs.items()):
+        if has_pr:
+            continue
+        for key in sorted(extract_ticket_keys(name) & keys):
+            branches.setdefault(key, []).append({"repo": repo, "ref": name})
+    return dict(sorted(branches.items()))
+
+
+def scan_branches(keys, repos=REPOS, cache=None, max_age=None):
+    """WIP branches (no open or merged PR) of repos for keys → branches.json dict."""
+    keys = sorted(set(keys))
+    if not keys:
+        return {}
+    refs = list_refs(repos, ref_queries(keys), cache=cache, max_age=max_age)
+    return index_branches(refs, keys)
+
+
+def branch_cache_from_env(env=None):
+    """The shared response cache for ref listings (on unless HUMAND_CACHE=0) and its max age."""
+    env = os.environ if env is None else env
+    if env.get("HUMAND_CACHE") == "0":
+        return None, 0
+    return cache_from_env(env, force=True), float(env.get("HUMAND_CACHE_BRANCHES_MAX_AGE", DEFAULT_MAX_AGE))
+
+
+def main(argv):
+    if "--" not in argv:
+        print("Usage: python3 -m hulib.branches <repo>... -- <KEY>...", file=sys.stderr)
+        return 1
+    sep = argv.index("--")
+    repos, keys = argv[:sep] or list(REPOS), argv[sep + 1:]
+    cache, max_age = branch_cache_from_env()
+    try:
+        with trace.span("scan branches", keys=len(keys), repos=len(repos)):
+            branches = scan_branches(keys, repos, cache=cache, max_age=max_age)
+    except GitHubError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 3
+    finally:
+        if cache is not None:
+            cache.close()
+    json.dump(branches, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,211 @@
+"""Opt-in on-disk response cache (SQLite) shared by the fetch scripts.
+
+Disabled unless HUMAND_CACHE=1. HTTP GET responses are stored with their
+ETag / Last-Modified validators; a cached entry is only reused after the
+server answers a conditional request with 304, unless it is younger than
+HUMAND_CACHE_MAX_AGE seconds (default 0, i.e. always revalidate). Entries
+older than HUMAND_CACHE_TTL are ignored and refetched. When the file grows
+past HUMAND_CACHE_MAX_MB, least-recently-used entries are evicted.
+
+Environment:
+    HUMAND_CACHE         1 to enable (run-sprint-report.sh --cache sets it, --fresh clears it)
+    HUMAND_CACHE_DIR     default: $XDG_CACHE_HOME/humand-product-workflow (~/.cache/...)
+    HUMAND_CACHE_TTL     seconds an entry may be revalidated for (default: 86400)
+    HUMAND_CACHE_MAX_AGE seconds an entry is served without revalidation (default: 0)
+    HUMAND_CACHE_MAX_MB  size cap before LRU eviction (default: 200)
+    HUMAND_CACHE_GH_MAX_AGE  seconds a cached `gh` result is reused (default: 600; see hulib/gh.py)
+    HUMAND_CACHE_SUMMARY_TTL seconds a cached Jira summary is reused (default: 86400; see hulib/summaries.py)
+    HUMAND_CACHE_BRANCHES_MAX_AGE  seconds a branch listing is reused (default: 600; see hulib/branches.py)
+
+The PR index (hulib/prindex.py), the sprint metrics store (hulib/metrics.py),
+the code index with its mirrors (hulib/codeindex.py), the shared rate-limit
+state (hulib/ratelimit.py), the record of published comments and pages
+(hulib/publish.py) and the stored issue changelogs (hulib/changelog.py) also
+live under HUMAND_CACHE_DIR; `clear` does not touch them.
+
+CLI:
+    python3 -m hulib.cache stats|clear|prune
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# Size-based eviction runs every EVICT_EVERY stores and when the cache is closed.
+EVICT_EVERY = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key           TEXT PRIMARY KEY,
+    url           TEXT NOT NULL,
+    status        INTEGER NOT NULL,
+    headers       TEXT NOT NULL,
+    body          BLOB NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    stored_at     REAL NOT NULL,
+    accessed_at   REAL NOT NULL,
+    size          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def cache_dir(env=None):
+    env = os.environ if env is None else env
+    if env.get("HUMAND_CACHE_DIR"):
+        return env["HUMAND_CACHE_DIR"]
+    base = env.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "humand-product-workflow")
+
+
+def cache_key(*parts):
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+class CacheEntry:
+    __slots__ = ("status", "headers", "body", "etag", "last_modified", "stored_at")
+
+    def __init__(self, status, headers, body, etag, last_modified, stored_at):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def age(self):
+        return time.time() - self.stored_at
+
+
+class ResponseCache:
+    def __init__(self, path, ttl=86400, max_age=0, max_bytes=200 * 1024 * 1024):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        if self._puts:
+            self.evict()
+        with self._lock:
+            self._db.close()
+
+    def get(self, key):
+        """Return the CacheEntry for key, or None if missing or past the TTL."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[5] > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return CacheEntry(row[0], json.loads(row[1]), row[2], row[3], row[4], row[5])
+
+    def is_fresh(self, entry):
+        return entry.age() <= self.max_age
+
+    def reusable(self, headers):
+        """Only responses with validators (or a non-zero max_age) can ever be served again."""
+        return bool(self.max_age > 0 or headers.get("etag") or headers.get("last-modified"))
+
+    def put(self, key, url, status, headers, body):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), body, headers.get("etag"),
+                 headers.get("last-modified"), now, now, len(body)),
+            )
+            self._puts += 1
+            check = self._puts % EVICT_EVERY == 0
+        if check:
+            self.evict()
+
+    def revalidated(self, key):
+        """Record a 304: the stored body is current as of now."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def evict(self):
+        """Drop expired entries, then LRU entries until the cache fits max_bytes."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE stored_at < ?", (time.time() - self.ttl,))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            excess = total - self.max_bytes
+            freed = 0
+            doomed = []
+            for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                doomed.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def stats(self):
+        with self._lock:
+            count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"path": self.path, "entries": count, "bytes": size}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.execute("VACUUM")
+
+
+def cache_enabled(env=None):
+    env = os.environ if env is None else env
+    return env.get("HUMAND_CACHE", "") == "1"
+
+
+def cache_from_env(env=None, force=False):
+    """Return the shared ResponseCache when HUMAND_CACHE=1 (or force), else None."""
+    env = os.environ if env is None else env
+    if not (force or cache_enabled(env)):
+        return None
+    return ResponseCache(
+        os.path.join(cache_dir(env), "http-cache.sqlite3"),
+        ttl=float(env.get("HUMAND_CACHE_TTL", 86400)),
+        max_age=float(env.get("HUMAND_CACHE_MAX_AGE", 0)),
+        max_bytes=int(float(env.get("HUMAND_CACHE_MAX_MB", 200)) * 1024 * 1024),
+    )
+
+
+def main(argv):
+    cmd = argv[0] if argv else "stats"
+    cache = cache_from_env(force=True)
+    if cmd == "stats":
+        print(json.dumps(cache.stats(), indent=2))
+    elif cmd == "clear":
+        cache.clear()
+        print(f"Cleared {cache.path}")
+    elif cmd == "prune":
+        cache.evict()
+        print(json.dumps(cache.stats(), indent=2))
+    else:
+        print("Usage: python3 -m hulib.cache stats|clear|prune", file=sys.stderr)
+        return 1
+    cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
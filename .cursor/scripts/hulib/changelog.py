@@ -0,0 +1,523 @@
+"""Issue changelogs → status timelines, cycle times and the sprint burndown.
+
+Changelogs are fetched in bulk: a `key in (...)` search with
+`expand=changelog` returns a page of issues together with their change
+history, and only issues whose history is longer than what the search embeds
+are paged through /rest/api/3/issue/{key}/changelog. A history entry is never
+edited once written, so its status, Flagged and Sprint items (TRACKED_FIELDS)
+are stored by history id and never fetched again: a sync lists `updated` for
+the keys already stored (one light search per KEY_CHUNK keys) and only expands
+the changelogs of new issues and of issues updated since their last sync,
+paging long histories from the count already stored. An issue's `updated`
+watermark is written once its history is complete, so an interrupted sync is
+redone the next time.
+
+Analysis works on the exported form (also the changelog.json the generator
+reads with --changelog):
+
+    {"statuses": {status name: category name},
+     "issues": {KEY: {"created": epoch, "changes": [[epoch, field, from, to], ...]}}}
+
+Each issue becomes a timeline of intervals from its creation to now, each with
+a bucket (BUCKETS) and whether it was blocked. Statuses map to buckets through
+their category (/rest/api/3/status): Done → done, a name with a REVIEW_WORDS
+word → in_review, In Progress → in_progress, anything else → todo. An interval
+is blocked while the issue is Flagged (the report's 🚫) or in a status named
+with a BLOCKED_WORDS word.
+
+    cycle_times()  per ticket: seconds In Progress, In Review and blocked, and the
+                   cycle from the first start to the last Done (or now)
+    burndown()     per sprint day: scope, done and remaining (points or tickets)
+
+burndown() adds each ticket's join day and Done intervals to two difference
+arrays (array('d'), one slot per day, located with bisect) and takes prefix
+sums, so it costs O(transitions + days) however many tickets, sprints or teams
+are analysed, instead of a status lookup per ticket and day.
+
+File: $HUMAND_CACHE_DIR/changelog.sqlite3 (see hulib/cache.py).
+
+CLI:
+    python3 -m hulib.changelog sync <KEY>...          # fetch what changed since the last sync
+    python3 -m hulib.changelog export <KEY>...        # changelog.json on stdout (no Jira calls)
+    python3 -m hulib.changelog cycle-time [--project KEY[,KEY...]] [--last N] [--format markdown|csv|json]
+        # per sprint recorded in the metrics store (hulib/metrics.py), from the stored changelogs
+    python3 -m hulib.changelog stats
+"""
+
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import sqlite3
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+
+from . import trace
+from .cache import cache_dir
+from .client import HttpError
+from .jira import KEY_CHUNK, JiraClient, chunked
+from .metrics import MetricsStore, metrics_db, render_table
+
+TRACKED_FIELDS = ("status", "Flagged", "Sprint")
+
+BUCKETS = ("todo", "in_progress", "in_review", "done")
+REVIEW_WORDS = ("review", "revisión", "revision", "qa")
+BLOCKED_WORDS = ("block", "bloque", "imped")
+
+DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key         TEXT PRIMARY KEY,
+    created     REAL NOT NULL,
+    updated     TEXT NOT NULL,
+    histories   INTEGER NOT NULL,
+    synced_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    id          INTEGER NOT NULL,
+    field       TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    at          REAL NOT NULL,
+    from_value  TEXT,
+    to_value    TEXT,
+    PRIMARY KEY (id, field)
+);
+CREATE INDEX IF NOT EXISTS changes_key ON changes (key, at, id);
+CREATE TABLE IF NOT EXISTS statuses (
+    name        TEXT PRIMARY KEY,
+    category    TEXT NOT NULL
+);
+"""
+
+
+def changelog_path(env=None):
+    return os.path.join(cache_dir(env), "changelog.sqlite3")
+
+
+def parse_time(value):
+    """Jira timestamp (2026-02-10T14:03:22.123+0000) → epoch seconds."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z").timestamp()
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def history_items(key, histories):
+    """Changelog histories → (id, field, key, at, from, to) rows for the TRACKED_FIELDS items."""
+    rows = []
+    for history in histories:
+        at = parse_time(history["created"])
+        for item in history.get("items") or []:
+            if item.get("field") in TRACKED_FIELDS:
+                rows.append((int(history["id"]), item["field"], key, at,
+                             item.get("fromString"), item.get("toString")))
+    return rows
+
+
+class ChangelogStore:
+    """Tracked changelog items by history id, with the `updated` each issue was synced at."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def synced(self, keys):
+        """→ {key: (updated, histories)} for the keys stored with a complete history."""
+        found = {}
+        for chunk in chunked(sorted(set(keys)), 500):
+            found.update((key, (updated, histories)) for key, updated, histories in self._db.execute(
+                f"SELECT key, updated, histories FROM issues WHERE key IN ({','.join('?' * len(chunk))})", chunk))
+        return found
+
+    def record(self, key, created, updated, histories, items):
+        """Add an issue's new items and mark it synced at updated with histories entries."""
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany("INSERT OR IGNORE INTO changes VALUES (?, ?, ?, ?, ?, ?)", items)
+            self._db.execute("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?)",
+                             (key, created, updated, histories, time.time()))
+
+    def unknown_statuses(self):
+        return [name for (name,) in self._db.execute(
+            "SELECT DISTINCT s FROM (SELECT from_value AS s FROM changes WHERE field = 'status' "
+            "UNION SELECT to_value FROM changes WHERE field = 'status') "
+            "WHERE s IS NOT NULL AND s NOT IN (SELECT name FROM statuses)")]
+
+    def set_statuses(self, categories):
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany("INSERT OR REPLACE INTO statuses VALUES (?, ?)", sorted(categories.items()))
+
+    def export(self, keys):
+        """Stored changelogs of keys → the changelog.json dict (issues never synced are left out)."""
+        issues = {}
+        for chunk in chunked(sorted(set(keys)), 500):
+            marks = ",".join("?" * len(chunk))
+            for key, created in self._db.execute(f"SELECT key, created FROM issues WHERE key IN ({marks})", chunk):
+                issues[key] = {"created": created, "changes": []}
+            for key, at, field, from_value, to_value in self._db.execute(
+                    f"SELECT key, at, field, from_value, to_value FROM changes WHERE key IN ({marks}) "
+                    f"ORDER BY key, at, id", chunk):
+                if key in issues:
+                    issues[key]["changes"].append([at, field, from_value, to_value])
+        return {"statuses": dict(self._db.execute("SELECT name, category FROM statuses")),
+                "issues": dict(sorted(issues.items()))}
+
+    def stats(self):
+        """→ (issues, stored items, statuses)."""
+        return tuple(self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                     for table in ("issues", "changes", "statuses"))
+
+
+def rest_of_history(jira, key, start_at):
+    """Histories of key from start_at on, through the paged issue changelog endpoint."""
+    histories = []
+    while True:
+        page = jira.changelog_page(key, start_at)
+        values = page.get("values") or []
+        histories += values
+        start_at += len(values)
+        if not values or page.get("isLast") or start_at >= page.get("total", start_at):
+            return histories
+
+
+def sync(jira, store, keys):
+    """Fetch the changelogs of keys that are new or updated since their last sync → keys fetched."""
+    keys = sorted(set(keys))
+    known = store.synced(keys)
+
+    def updated(chunk):
+        return [(i["key"], i["fields"].get("updated")) for i in jira.search(f"key in ({','.join(chunk)})", "updated")]
+
+    current = {}
+    for page in jira.map(updated, list(chunked(sorted(known), KEY_CHUNK))):
+        current.update(page)
+    stale = [k for k in keys if k not in known or (k in current and current[k] != known[k][0])]
+
+    def expand(chunk):
+        return list(jira.search(f"key in ({','.join(chunk)})", "created,updated", expand="changelog"))
+
+    long_histories = []
+    for issues in jira.map(expand, list(chunked(stale, KEY_CHUNK))):
+        for issue in issues:
+            key, fields = issue["key"], issue["fields"]
+            log = issue.get("changelog") or {}
+            histories = log.get("histories") or []
+            total = log.get("total", len(histories))
+            entry = (key, parse_time(fields["created"]), fields["updated"], total, history_items(key, histories))
+            if total > len(histories):
+                # Long histories are paged from what is already stored (or embedded, when the search sent the oldest).
+                stored = known.get(key, (None, 0))[1]
+                long_histories.append((entry, max(stored, len(histories)) if not log.get("startAt") else stored))
+            else:
+                store.record(*entry)
+
+    def rest(job):
+        (key, *_), start_at = job
+        return history_items(key, rest_of_history(jira, key, start_at))
+
+    for ((key, created, updated_at, total, items), _), more in zip(long_histories, jira.map(rest, long_histories)):
+        store.record(key, created, updated_at, total, items + more)
+
+    unknown = store.unknown_statuses()
+    if unknown:
+        # Statuses deleted from the workflows stay uncategorized (todo) instead of being looked up every sync.
+        store.set_statuses({**dict.fromkeys(unknown, ""), **jira.statuses()})
+    return stale
+
+
+def fetch_changelogs(keys, path=None, concurrency=6):
+    """Sync the stored changelogs of keys with Jira → changelog.json dict (HttpError propagates)."""
+    with ChangelogStore(path or changelog_path()) as store:
+        with trace.span("sync changelogs", keys=len(keys)) as info, \
+                JiraClient.from_env(concurrency=concurrency, cache=None) as jira:
+            info["fetched"] = len(sync(jira, store, keys))
+        return store.export(keys)
+
+
+# --- analysis ---
+
+def bucket(status, category):
+    """Status name and category → one of BUCKETS."""
+    if category == "Done":
+        return "done"
+    name = (status or "").lower()
+    if any(word in name for word in REVIEW_WORDS):
+        return "in_review"
+    if category == "In Progress":
+        return "in_progress"
+    return "todo"
+
+
+def is_blocked_status(status):
+    name = (status or "").lower()
+    return any(word in name for word in BLOCKED_WORDS)
+
+
+class StatusKinds(dict):
+    """Status name → (bucket, blocked status), worked out once per name."""
+
+    def __init__(self, statuses):
+        super().__init__()
+        self.statuses = statuses
+
+    def __missing__(self, name):
+        kind = self[name] = (bucket(name, self.statuses.get(name)), is_blocked_status(name))
+        return kind
+
+
+def timeline(issue, status, kinds, now):
+    """An exported issue → [(start, end, bucket, blocked)] from its creation to now (kinds: StatusKinds).
+
+    status is the issue's current status (it closes the timeline); the status
+    and the flag before the first change are the first change's `from`.
+    """
+    changes = [c for c in issue["changes"] if c[1] != "Sprint"]
+    first_status = next((c[2] for c in changes if c[1] == "status"), status)
+    flagged = bool(next((c[2] for c in changes if c[1] == "Flagged"), None))
+    kind, blocked = kinds[first_status]
+    at = issue["created"]
+    intervals = []
+    for when, field, _, to_value in changes:
+        if when > at:
+            intervals.append((at, when, kind, flagged or blocked))
+            at = when
+        if field == "status":
+            kind, blocked = kinds[to_value]
+        else:
+            flagged = bool(to_value)
+    if status:
+        kind, blocked = kinds[status]
+    if now > at:
+        intervals.append((at, now, kind, flagged or blocked))
+    return intervals
+
+
+class Cycle:
+    """Seconds a ticket spent In Progress, In Review and blocked, and its cycle so far."""
+
+    __slots__ = ("in_progress", "in_review", "blocked", "cycle", "done")
+
+    def __init__(self, in_progress, in_review, blocked, cycle, done):
+        self.in_progress = in_progress
+        self.in_review = in_review
+        self.blocked = blocked
+        self.cycle = cycle
+        self.done = done
+
+
+def cycle_time(intervals):
+    """Timeline → Cycle, or None if the ticket was never started."""
+    spent = dict.fromkeys(("in_progress", "in_review", "blocked"), 0.0)
+    started = None
+    for start, end, name, blocked in intervals:
+        if name in ("in_progress", "in_review"):
+            spent[name] += end - start
+            started = start if started is None else started
+        if blocked:
+            spent["blocked"] += end - start
+    if started is None:
+        return None
+    start, end, name, _ = intervals[-1]
+    done = name == "done"
+    return Cycle(spent["in_progress"], spent["in_review"], spent["blocked"], (start if done else end) - started, done)
+
+
+def cycle_times(changelog, tickets, now=None):
+    """{key: (status, status category)} → {key: Cycle} for the tickets with a stored changelog that started."""
+    now = time.time() if now is None else now
+    kinds = StatusKinds({**changelog.get("statuses", {}), **{s: cat for s, cat in tickets.values() if cat}})
+    cycles = {}
+    for key, (status, _) in tickets.items():
+        issue = changelog["issues"].get(key)
+        if issue is not None:
+            cycle = cycle_time(timeline(issue, status, kinds, now))
+            if cycle is not None:
+                cycles[key] = cycle
+    return cycles
+
+
+def sprint_days(start, end, now):
+    """Sprint dates (YYYY-MM-DD) → (days so far, sample times): each day's end (UTC), today sampled at now."""
+    try:
+        first, last = date.fromisoformat(start[:10]), date.fromisoformat(end[:10])
+    except (TypeError, ValueError):
+        return [], array("d")
+    days, samples = [], array("d")
+    day = first
+    while day <= last:
+        day_end = datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() + DAY
+        sample = min(day_end, now)
+        if samples and sample <= samples[-1]:
+            break
+        days.append(day.isoformat())
+        samples.append(sample)
+        if day_end > now:
+            break
+        day += timedelta(days=1)
+    return days, samples
+
+
+def added_at(issue, sprint):
+    """When the ticket joined sprint (its last Sprint change adding it), or None if it was there from the start."""
+    joined = None
+    for when, field, from_value, to_value in issue["changes"]:
+        if field == "Sprint" and sprint in (to_value or "").split(", ") \
+                and sprint not in (from_value or "").split(", "):
+            joined = when
+    return joined
+
+
+def burndown(changelog, tickets, sprint, start, end, now=None):
+    """Per sprint day so far → [{date, scope, done, remaining, ideal}].
+
+    tickets: {key: (status, status category, weight)} with weight the ticket's
+    points (or 1 to count tickets). A ticket counts towards the scope from the
+    day it joined the sprint and towards done while it is in a Done status;
+    tickets without a stored changelog count from the start with their current
+    status. ideal runs from the first day's scope to 0 on the last sprint day.
+    """
+    now = time.time() if now is None else now
+    days, samples = sprint_days(start, end, now)
+    if not days:
+        return []
+    n = len(samples)
+    scope, done = array("d", bytes(8 * (n + 1))), array("d", bytes(8 * (n + 1)))
+    kinds = StatusKinds({**changelog.get("statuses", {}), **{s: cat for s, cat, _ in tickets.values() if cat}})
+    for key, (status, category, weight) in tickets.items():
+        if not weight:
+            continue
+        issue = changelog["issues"].get(key)
+        if issue is None:
+            scope[0] += weight
+            if bucket(status, category) == "done":
+                done[0] += weight
+            continue
+        joined = added_at(issue, sprint)
+        scope[bisect_left(samples, joined) if joined is not None else 0] += weight
+        for interval_start, interval_end, name, _ in timeline(issue, status, kinds, float("inf")):
+            if name == "done":
+                done[bisect_left(samples, interval_start)] += weight
+                done[bisect_left(samples, interval_end)] -= weight
+    scope, done = list(accumulate(scope))[:n], list(accumulate(done))[:n]
+    last = (date.fromisoformat(end[:10]) - date.fromisoformat(start[:10])).days or 1
+    return [{"date": day, "scope": s, "done": d, "remaining": s - d,
+             "ideal": round(scope[0] * max(0, last - i) / last, 2)}
+            for i, (day, s, d) in enumerate(zip(days, scope, done))]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of values (None when empty)."""
+    values = sorted(values)
+    if not values:
+        return None
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def in_days(seconds):
+    return None if seconds is None else round(seconds / DAY, 1)
+
+
+def summarize(cycles):
+    """{key: Cycle} → started / finished counts and the finished tickets' median and p85 cycle, in days."""
+    finished = [c.cycle for c in cycles.values() if c.done]
+    return {"started": len(cycles), "finished": len(finished),
+            "median_days": in_days(percentile(finished, 50)), "p85_days": in_days(percentile(finished, 85)),
+            "review_median_days": in_days(percentile([c.in_review for c in cycles.values() if c.done], 50)),
+            "blocked_days": in_days(sum(c.blocked for c in cycles.values()))}
+
+
+# --- cross-sprint ---
+
+def sprint_cycle_times(store, metrics, projects=None, last=None, now=None):
+    """Cycle-time summary of each sprint in the metrics store, from the stored changelogs."""
+    rows = []
+    for project, sprint, start, end in metrics.sprints(projects, last):
+        tickets = {key: (status, None) for key, status in metrics.ticket_statuses(project, sprint)}
+        cycles = cycle_times(store.export(tickets), tickets, now)
+        rows.append({"project": project, "sprint": sprint, "start": start, "end": end,
+                     "tickets": len(tickets), **summarize(cycles)})
+    return rows
+
+
+def format_cycle_time(rows):
+    table = render_table(
+        ["Proyecto", "Sprint", "Fechas", "Tickets", "Iniciados", "Terminados", "Ciclo mediano (d)", "p85 (d)",
+         "Revisión mediana (d)", "Bloqueado (d)"],
+        [(r["project"], r["sprint"], f"{r['start']} — {r['end']}", r["tickets"], r["started"], r["finished"],
+          r["median_days"], r["p85_days"], r["review_median_days"], r["blocked_days"]) for r in rows],
+    )
+    return "## Tiempos de ciclo\n\n" + table
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m hulib.changelog", description="Issue changelogs")
+    parser.add_argument("command", choices=["sync", "export", "cycle-time", "stats"])
+    parser.add_argument("keys", nargs="*", metavar="KEY")
+    parser.add_argument("--project", default=None, help="cycle-time: comma-separated project keys (default: all)")
+    parser.add_argument("--last", type=int, default=None, help="cycle-time: only each project's N most recent sprints")
+    parser.add_argument("--format", default="markdown", choices=["markdown", "csv", "json"])
+    args = parser.parse_args(argv)
+    if args.command in ("sync", "export") and not args.keys:
+        parser.error(f"{args.command} needs ticket keys")
+
+    if args.command == "sync":
+        try:
+            changelog = fetch_changelogs(args.keys, concurrency=int(os.environ.get("JIRA_CONCURRENCY", 6)))
+        except HttpError as e:
+            print(f"Error: Jira API returned HTTP {e.status or 'error'}\n{e}", file=sys.stderr)
+            return 3
+        print(f"{len(changelog['issues'])} changelogs stored", file=sys.stderr)
+        return 0
+    with ChangelogStore(changelog_path()) as store:
+        if args.command == "export":
+            json.dump(store.export(args.keys), sys.stdout, indent=2, ensure_ascii=False)
+            sys.stdout.write("\n")
+            return 0
+        if args.command == "stats":
+            issues, items, statuses = store.stats()
+            print(f"{issues} issues, {items} status/flag/sprint changes, {statuses} statuses")
+            return 0
+        path = metrics_db()
+        if not os.path.exists(path):
+            print(f"Error: no metrics store at {path}; generate a report first", file=sys.stderr)
+            return 1
+        projects = [p.strip() for p in args.project.split(",") if p.strip()] if args.project else None
+        with MetricsStore(path) as metrics:
+            rows = sprint_cycle_times(store, metrics, projects, args.last)
+
+    if args.format == "json":
+        json.dump(rows, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    elif args.format == "csv":
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=list(rows[0].keys()) if rows else ["project"])
+        writer.writeheader()
+        writer.writerows(rows)
+        sys.stdout.write(out.getvalue())
+    else:
+        sys.stdout.write(format_cycle_time(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,238 @@
+"""Pooled keep-alive HTTP client with retry/backoff.
+
+One HttpClient per host. Connections are reused across requests and threads
+(a checked-out connection is owned by one thread until its response has been
+read), so a fan-out of N requests costs pool_size TLS handshakes instead of N.
+
+Retries: 429 and 5xx responses plus connection errors are retried with
+exponential backoff and jitter. A Retry-After header (seconds or HTTP date)
+overrides the computed delay. Non-idempotent requests (POST, PATCH) are only
+retried on 429, which is rejected before it is processed: after a timeout or a
+5xx the server may already have acted on them, and a retry would act twice
+(e.g. a duplicate Jira comment). Pass retry_unsafe=True for a POST that only
+reads.
+
+Caching: with a hulib.cache.ResponseCache attached, GET responses are stored
+and later requests are sent as conditional requests (If-None-Match /
+If-Modified-Since); a 304 is answered from the cache.
+
+Scheduling: every attempt first takes a slot from the host's shared rate-limit
+budget, every response reports the host's X-RateLimit-* headers back, and a 429
+pauses the host for every caller (hulib/ratelimit.py). Identical GETs in flight
+at the same time are sent once.
+
+Tracing: with HUMAND_TRACE set, every request is recorded as an `http` span
+(hulib/trace.py) with its status, body size, retries and X-RateLimit-Remaining.
+"""
+
+import email.utils
+import http.client
+import json
+import queue
+import random
+import socket
+import time
+import urllib.parse
+
+from . import ratelimit, trace
+from .cache import cache_key
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+MAX_RETRY_AFTER = 120
+
+
+class HttpError(Exception):
+    """Non-2xx response (after retries) or a connection that kept failing."""
+
+    def __init__(self, message, status=None, url=None, body=b""):
+        super().__init__(message)
+        self.status = status
+        self.url = url
+        self.body = body
+
+
+class Response:
+    __slots__ = ("status", "headers", "body", "url", "retries")
+
+    def __init__(self, status, headers, body, url, retries=0):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.url = url
+        self.retries = retries
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (delta-seconds or HTTP date) → seconds, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(int(value), MAX_RETRY_AFTER)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return min(max(0.0, when.timestamp() - time.time()), MAX_RETRY_AFTER)
+
+
+class HttpClient:
+    def __init__(self, base_url, headers=None, timeout=15, pool_size=10, max_retries=4, backoff=0.5, cache=None):
+        parsed = urllib.parse.urlsplit(base_url.rstrip("/"))
+        if parsed.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {base_url}")
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path
+        self.base_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache = cache
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    # --- connection pool ---
+
+    def _new_connection(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._new_connection()
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- requests ---
+
+    def url_for(self, path, params=None):
+        target = path if path.startswith(self.base_path + "/") else self.base_path + path
+        if params:
+            target += "?" + urllib.parse.urlencode(params, doseq=True)
+        return target
+
+    def _send_once(self, method, target, body, headers):
+        conn = self._acquire()
+        try:
+            conn.request(method, target, body=body, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        return resp.status, {k.lower(): v for k, v in resp.getheaders()}, data
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return retry_after
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    def request(self, method, path, params=None, json_body=None, headers=None, ok=(200,), retry_unsafe=False):
+        """Send a request, retrying 429/5xx/connection errors. Returns Response.
+
+        Non-idempotent methods are retried on 429 only, unless retry_unsafe.
+        Raises HttpError when the final status is not in `ok`.
+        """
+        if not trace.enabled():
+            return self._request(method, path, params, json_body, headers, ok, retry_unsafe)
+        with trace.span(trace.endpoint_label(method, self.url_for(path)), "http", host=self.host) as info:
+            try:
+                resp = self._request(method, path, params, json_body, headers, ok, retry_unsafe)
+            except HttpError as e:
+                info.update(status=e.status, bytes=len(e.body), error=str(e)[:200])
+                raise
+            info.update(status=resp.status, bytes=len(resp.body), retries=resp.retries,
+                        rate_limit_remaining=resp.headers.get("x-ratelimit-remaining"))
+            return resp
+
+    def _request(self, method, path, params, json_body, headers, ok, retry_unsafe=False):
+        target = self.url_for(path, params)
+        url = f"{self.scheme}://{self.host}{':' + str(self.port) if self.port else ''}{target}"
+        hdrs = dict(self.headers)
+        hdrs.update(headers or {})
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            hdrs.setdefault("Content-Type", "application/json")
+        if method == "GET":
+            return ratelimit.coalesce(("GET", url, tuple(sorted(hdrs.items())), ok),
+                                      lambda: self._fetch(method, target, url, body, hdrs, ok))
+        return self._fetch(method, target, url, body, hdrs, ok, retry_unsafe)
+
+    def _fetch(self, method, target, url, body, hdrs, ok, retry_unsafe=False):
+        entry = key = None
+        if self.cache is not None and method == "GET":
+            key = cache_key(url, hdrs.get("Authorization", ""))
+            entry = self.cache.get(key)
+            if entry is not None:
+                if self.cache.is_fresh(entry):
+                    return Response(entry.status, entry.headers, entry.body, url)
+                if entry.etag:
+                    hdrs["If-None-Match"] = entry.etag
+                if entry.last_modified:
+                    hdrs["If-Modified-Since"] = entry.last_modified
+
+        retry_any = retry_unsafe or method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            ratelimit.acquire(self.host)
+            try:
+                status, resp_headers, data = self._send_once(method, target, body, hdrs)
+            except (http.client.HTTPException, OSError, socket.timeout) as e:
+                if attempt >= self.max_retries or not retry_any:
+                    raise HttpError(f"{method} {url} failed after {attempt + 1} attempts: {e}", url=url) from e
+                time.sleep(self._delay(attempt))
+                attempt += 1
+                continue
+
+            retry_after = retry_after_seconds(resp_headers.get("retry-after"))
+            if status in RETRY_STATUSES and attempt < self.max_retries and (retry_any or status == 429):
+                delay = self._delay(attempt, retry_after)
+                ratelimit.observe(self.host, status, resp_headers, retry_after=delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            ratelimit.observe(self.host, status, resp_headers, retry_after=retry_after)
+
+            if status == 304 and entry is not None:
+                self.cache.revalidated(key)
+                return Response(entry.status, entry.headers, entry.body, url, retries=attempt)
+
+            if status not in ok:
+                snippet = data[:300].decode("utf-8", "replace")
+                raise HttpError(f"{method} {url} returned HTTP {status}: {snippet}", status=status, url=url, body=data)
+            if key is not None and status == 200 and self.cache.reusable(resp_headers):
+                self.cache.put(key, url, status, resp_headers, data)
+            return Response(status, resp_headers, data, url, retries=attempt)
+
+    def get_json(self, path, params=None, headers=None):
+        return self.request("GET", path, params=params, headers=headers).json()
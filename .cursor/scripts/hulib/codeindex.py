@@ -0,0 +1,501 @@
+"""Local code index of the product repos: paths, symbols and trigram text search.
+
+The feature-estimate-plan skill gathers evidence with one `gh api` call per
+tree listing, file read and search. Here each repo is kept as a shallow bare
+mirror of its default branch (`git clone --bare --depth 1`, then
+`git fetch --depth 1`), and its files are indexed into SQLite:
+
+    files       repo, path, blob id, language, size
+    file_text   file contents, FTS5 with the trigram tokenizer (substring search)
+    symbols     functions, classes, types, routes ... with their line
+
+A sync only reads the blobs whose id changed since the last indexed commit
+(`git ls-tree` against the stored ids, contents through one
+`git cat-file --batch`), and skips a repo whose branch did not move. Vendored
+and generated paths, binaries and files over MAX_FILE_BYTES are listed but
+not indexed. Queries are local and print grep-style evidence:
+
+    <repo>/<path>:<line>: <snippet>
+
+Environment:
+    HUMAND_CODE_DIR         mirrors + index (default: $HUMAND_CACHE_DIR/code; see hulib/cache.py)
+    HUMAND_CODE_MIRROR_URL  clone URL template (default: https://github.com/{org}/{repo}.git,
+                            authenticated through `gh auth git-credential`)
+
+CLI:
+    python3 -m hulib.codeindex sync [<repo>...]
+    python3 -m hulib.codeindex search <text> [--repo R] [--path GLOB] [--limit N] [--json]
+    python3 -m hulib.codeindex symbol <name>|<prefix>* [--repo R] [--kind K] [--limit N] [--json]
+    python3 -m hulib.codeindex files <substring>|<glob> [--repo R] [--limit N] [--json]
+    python3 -m hulib.codeindex show <repo> <path> [--lines A-B]
+    python3 -m hulib.codeindex stats
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import trace
+from .cache import cache_dir
+from .github import ORG
+
+# Default branch per repo (feature-estimate-plan's Repository Registry; hu-translations holds no code).
+REPO_BRANCHES = {
+    "humand-main-api": "develop",
+    "material-hu": "main",
+    "humand-web": "develop",
+    "humand-backoffice": "develop",
+    "humand-mobile": "develop",
+}
+
+DEFAULT_MIRROR_URL = "https://github.com/{org}/{repo}.git"
+
+MAX_FILE_BYTES = 512 * 1024
+SNIPPET_CHARS = 200
+
+SKIP_DIRS = {"node_modules", "vendor", "dist", "build", "coverage", "Pods", ".yarn", ".next", "__snapshots__"}
+SKIP_SUFFIXES = (".min.js", ".map", ".lock", "-lock.json", ".snap", ".png", ".jpg", ".jpeg", ".gif", ".webp",
+                 ".ico", ".pdf", ".zip", ".jar", ".ttf", ".otf", ".woff", ".woff2", ".mp4", ".mp3")
+
+EXT_LANG = {
+    ".js": "js", ".jsx": "js", ".mjs": "js", ".cjs": "js", ".ts": "js", ".tsx": "js",
+    ".py": "py", ".rb": "rb", ".java": "java", ".kt": "kt", ".swift": "swift", ".go": "go",
+}
+
+_JS_NAME = r"[A-Za-z_$][\w$]*"
+SYMBOL_PATTERNS = {
+    "js": [
+        ("function", rf"^[ \t]*(?:export[ \t]+(?:default[ \t]+)?)?(?:async[ \t]+)?function\*?[ \t]+({_JS_NAME})"),
+        ("class", rf"^[ \t]*(?:export[ \t]+(?:default[ \t]+)?)?(?:abstract[ \t]+)?class[ \t]+({_JS_NAME})"),
+        ("function", rf"^[ \t]*(?:export[ \t]+)?(?:const|let)[ \t]+({_JS_NAME})[ \t]*(?::[^=\n]+)?=[ \t]*"
+                     rf"(?:async[ \t]*)?(?:\([^)\n]*\)|{_JS_NAME})[ \t]*(?::[^=\n]+)?=>"),
+        ("type", rf"^[ \t]*(?:export[ \t]+)?(?:declare[ \t]+)?(?:interface|type)[ \t]+({_JS_NAME})"),
+        ("enum", rf"^[ \t]*(?:export[ \t]+)?(?:const[ \t]+)?enum[ \t]+({_JS_NAME})"),
+        ("route", r"""^[ \t]*(?:router|app|route[rs]?)\.(?:get|post|put|patch|delete)\([ \t]*['"`]([^'"`\n]+)"""),
+    ],
+    "py": [("function", r"^[ \t]*(?:async[ \t]+)?def[ \t]+(\w+)"), ("class", r"^[ \t]*class[ \t]+(\w+)")],
+    "rb": [("function", r"^[ \t]*def[ \t]+(?:self\.)?(\w+[?!=]?)"), ("class", r"^[ \t]*(?:class|module)[ \t]+([\w:]+)")],
+    "java": [("class", r"^[ \t]*(?:public[ \t]+|private[ \t]+|protected[ \t]+|abstract[ \t]+|final[ \t]+)*"
+                       r"(?:class|interface|enum|record)[ \t]+(\w+)")],
+    "kt": [("function", r"^[ \t]*(?:\w+[ \t]+)*fun[ \t]+(?:<[^>\n]*>[ \t]*)?(?:\w+\.)?(\w+)"),
+           ("class", r"^[ \t]*(?:\w+[ \t]+)*(?:class|interface|object)[ \t]+(\w+)")],
+    "swift": [("function", r"^[ \t]*(?:\w+[ \t]+)*func[ \t]+(\w+)"),
+              ("class", r"^[ \t]*(?:\w+[ \t]+)*(?:class|struct|protocol|enum|extension)[ \t]+(\w+)")],
+    "go": [("function", r"^func[ \t]+(?:\([^)\n]*\)[ \t]*)?(\w+)"), ("type", r"^type[ \t]+(\w+)")],
+}
+SYMBOL_RES = {lang: [(kind, re.compile(p, re.M)) for kind, p in patterns] for lang, patterns in SYMBOL_PATTERNS.items()}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    repo        TEXT PRIMARY KEY,
+    branch      TEXT NOT NULL,
+    commit_id   TEXT NOT NULL,
+    indexed_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id          INTEGER PRIMARY KEY,
+    repo        TEXT NOT NULL,
+    path        TEXT NOT NULL,
+    blob        TEXT NOT NULL,
+    lang        TEXT,
+    size        INTEGER NOT NULL,
+    indexed     INTEGER NOT NULL,
+    UNIQUE (repo, path)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS file_text USING fts5(body, tokenize = 'trigram', detail = 'none');
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id     INTEGER NOT NULL,
+    name        TEXT NOT NULL COLLATE NOCASE,
+    kind        TEXT NOT NULL,
+    line        INTEGER NOT NULL,
+    snippet     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name);
+CREATE INDEX IF NOT EXISTS symbols_file ON symbols (file_id);
+"""
+
+
+class CodeIndexError(Exception):
+    """A mirror could not be cloned/fetched or read."""
+
+
+def code_dir(env=None):
+    env = os.environ if env is None else env
+    return env.get("HUMAND_CODE_DIR") or os.path.join(cache_dir(env), "code")
+
+
+def skipped(path):
+    """Vendored/generated paths and binary assets are listed but never read."""
+    parts = path.split("/")
+    return any(p in SKIP_DIRS for p in parts[:-1]) or path.endswith(SKIP_SUFFIXES)
+
+
+def extract_symbols(lang, text):
+    """→ [(name, kind, line, snippet)] for the definitions SYMBOL_PATTERNS finds in text."""
+    found = []
+    for kind, pattern in SYMBOL_RES.get(lang, ()):
+        for m in pattern.finditer(text):
+            start = m.start()
+            end = text.find("\n", start)
+            line_text = text[start:end if end >= 0 else len(text)].strip()
+            found.append((m.group(1), kind, text.count("\n", 0, start) + 1, line_text[:SNIPPET_CHARS]))
+    found.sort(key=lambda s: s[2])
+    return found
+
+
+def git_error(proc):
+    """First line of a failed git command's stderr (the `fatal:` message)."""
+    lines = proc.stderr.decode("utf-8", "replace").strip().splitlines()
+    return lines[0] if lines else f"exit code {proc.returncode}"
+
+
+def snippet(line):
+    line = line.strip()
+    return line if len(line) <= SNIPPET_CHARS else line[:SNIPPET_CHARS] + "…"
+
+
+class Mirror:
+    """Shallow bare clone of one repo's default branch."""
+
+    def __init__(self, repo, branch, root, url_template=DEFAULT_MIRROR_URL):
+        self.repo = repo
+        self.branch = branch
+        self.path = os.path.join(root, f"{repo}.git")
+        self.url = url_template.replace("{org}", ORG).replace("{repo}", repo)
+
+    def git(self, *args, **kwargs):
+        auth = ["-c", "credential.helper=!gh auth git-credential"] if self.url.startswith("https://github.com/") else []
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        return subprocess.run(["git", *auth, *args], capture_output=True, env=env, **kwargs)
+
+    def sync(self):
+        """Clone or fetch the branch (depth 1) → its commit id."""
+        ref = f"refs/heads/{self.branch}"
+        action = "fetch" if os.path.isdir(self.path) else "clone"
+        with trace.span("mirror sync", repo=self.repo, action=action):
+            if action == "clone":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                proc = self.git("clone", "--quiet", "--bare", "--depth", "1", "--single-branch",
+                                "--branch", self.branch, self.url, self.path)
+                if proc.returncode != 0:
+                    shutil.rmtree(self.path, ignore_errors=True)
+            else:
+                proc = self.git("--git-dir", self.path, "fetch", "--quiet", "--depth", "1", "--no-tags",
+                                "origin", f"+{ref}:{ref}")
+        if proc.returncode != 0:
+            raise CodeIndexError(f"{self.repo}: git {action} of {self.url} failed: {git_error(proc)}")
+        return self.rev_parse(ref)
+
+    def rev_parse(self, ref):
+        proc = self.git("--git-dir", self.path, "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}")
+        if proc.returncode != 0:
+            raise CodeIndexError(f"{self.repo}: {ref} not found in {self.path}")
+        return proc.stdout.decode().strip()
+
+    def tree(self, commit):
+        """→ {path: (blob id, size)} for every blob of commit."""
+        proc = self.git("--git-dir", self.path, "ls-tree", "-r", "-l", "-z", commit)
+        if proc.returncode != 0:
+            raise CodeIndexError(f"{self.repo}: git ls-tree failed: {git_error(proc)}")
+        entries = {}
+        for record in proc.stdout.split(b"\0"):
+            if not record:
+                continue
+            meta, _, path = record.partition(b"\t")
+            _, kind, blob, size = meta.split()
+            if kind == b"blob":
+                entries[path.decode("utf-8", "replace")] = (blob.decode(), int(size) if size != b"-" else 0)
+        return entries
+
+    def read_blobs(self, blobs):
+        """Yield (blob id, bytes) for blobs through one `git cat-file --batch`."""
+        if not blobs:
+            return
+        proc = subprocess.Popen(["git", "--git-dir", self.path, "cat-file", "--batch"],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+        def feed():
+            try:
+                proc.stdin.write("".join(f"{b}\n" for b in blobs).encode())
+            finally:
+                proc.stdin.close()
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        try:
+            for _ in blobs:
+                header = proc.stdout.readline().split()
+                if len(header) < 3:
+                    continue  # "<id> missing"
+                data = proc.stdout.read(int(header[2]))
+                proc.stdout.read(1)
+                yield header[0].decode(), data
+        finally:
+            writer.join()
+            proc.stdout.close()
+            proc.wait()
+
+
+class CodeIndex:
+    """Files, trigram-indexed contents and symbols of the mirrored repos."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def indexed_commit(self, repo):
+        row = self._db.execute("SELECT commit_id FROM repos WHERE repo = ?", (repo,)).fetchone()
+        return row[0] if row else None
+
+    def update(self, mirror, commit):
+        """Re-index the files of mirror whose blob changed since the stored state → (changed, removed)."""
+        tree = mirror.tree(commit)
+        stored = {path: (file_id, blob) for file_id, path, blob in
+                  self._db.execute("SELECT id, path, blob FROM files WHERE repo = ?", (mirror.repo,))}
+        removed = [stored[p][0] for p in stored.keys() - tree.keys()]
+        changed = {p: entry for p, entry in tree.items() if stored.get(p, (None, None))[1] != entry[0]}
+        wanted = {blob for p, (blob, size) in changed.items() if size <= MAX_FILE_BYTES and not skipped(p)}
+        contents = dict(mirror.read_blobs(sorted(wanted)))
+
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            for file_id in removed + [stored[p][0] for p in changed if p in stored]:
+                self._forget(file_id)
+            for path, (blob, size) in sorted(changed.items()):
+                data = contents.get(blob)
+                text = None if data is None or b"\0" in data[:8192] else data.decode("utf-8", "replace")
+                lang = EXT_LANG.get(os.path.splitext(path)[1].lower())
+                file_id = self._db.execute(
+                    "INSERT INTO files (repo, path, blob, lang, size, indexed) VALUES (?, ?, ?, ?, ?, ?)",
+                    (mirror.repo, path, blob, lang, size, text is not None),
+                ).lastrowid
+                if text is None:
+                    continue
+                self._db.execute("INSERT INTO file_text (rowid, body) VALUES (?, ?)", (file_id, text))
+                self._db.executemany("INSERT INTO symbols VALUES (?, ?, ?, ?, ?)",
+                                     [(file_id, *s) for s in extract_symbols(lang, text)])
+            self._db.execute("INSERT OR REPLACE INTO repos VALUES (?, ?, ?, ?)",
+                             (mirror.repo, mirror.branch, commit, time.time()))
+        return len(changed), len(removed)
+
+    def _forget(self, file_id):
+        self._db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        self._db.execute("DELETE FROM file_text WHERE rowid = ?", (file_id,))
+        self._db.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
+
+    def search(self, text, repos=None, path_glob=None, limit=50):
+        """Lines containing text (case-insensitive) → [(repo, path, line, snippet)], at most limit.
+
+        Candidate files come from the trigram index (`LIKE` on file_text); their lines are then
+        matched exactly. Hits are sorted, but which files fill the limit first is not.
+        """
+        if len(text) < 3:
+            raise ValueError("search text needs at least 3 characters (trigram index)")
+        where, params = _repo_filter(repos, "f.")
+        if path_glob:
+            where += " AND f.path GLOB ?"
+            params += (path_glob,)
+        needle = text.lower()
+        hits = []
+        rows = self._db.execute(
+            f"SELECT f.repo, f.path, t.body FROM file_text t JOIN files f ON f.id = t.rowid "
+            f"WHERE t.body LIKE ? {where}", (f"%{text}%", *params))
+        for repo, path, body in rows:
+            for number, line in enumerate(body.split("\n"), 1):
+                if needle in line.lower():
+                    hits.append((repo, path, number, snippet(line)))
+            if len(hits) >= limit:
+                break
+        return sorted(hits)[:limit]
+
+    def symbols(self, name, repos=None, kind=None, limit=50):
+        """Definitions named name (case-insensitive; "prefix*" for a prefix) → [(repo, path, line, kind, name, snippet)]."""
+        if name.endswith("*"):
+            prefix = name[:-1]
+            cond, params = "s.name >= ? AND s.name < ?", (prefix, prefix + "\U0010ffff")
+        else:
+            cond, params = "s.name = ?", (name,)
+        where, repo_params = _repo_filter(repos, "f.")
+        if kind:
+            where += " AND s.kind = ?"
+            repo_params += (kind,)
+        return self._db.execute(
+            f"SELECT f.repo, f.path, s.line, s.kind, s.name, s.snippet FROM symbols s JOIN files f ON f.id = s.file_id "
+            f"WHERE {cond} {where} ORDER BY f.repo, f.path, s.line LIMIT ?", (*params, *repo_params, limit)
+        ).fetchall()
+
+    def files(self, pattern, repos=None, limit=200):
+        """Paths matching a glob (if pattern has *?[) or containing pattern → [(repo, path, size)]."""
+        glob = any(c in pattern for c in "*?[")
+        cond, value = ("path GLOB ?", pattern) if glob else ("instr(lower(path), ?) > 0", pattern.lower())
+        where, params = _repo_filter(repos)
+        return self._db.execute(f"SELECT repo, path, size FROM files WHERE {cond} {where} ORDER BY repo, path LIMIT ?",
+                                (value, *params, limit)).fetchall()
+
+    def show(self, repo, path):
+        """Indexed text of repo/path, or None."""
+        row = self._db.execute("SELECT t.body FROM files f JOIN file_text t ON t.rowid = f.id "
+                               "WHERE f.repo = ? AND f.path = ?", (repo, path)).fetchone()
+        return row[0] if row else None
+
+    def stats(self):
+        """→ {repo: (branch, commit, indexed_at, files, indexed files, symbols)}."""
+        counts = {repo: (n, indexed) for repo, n, indexed in
+                  self._db.execute("SELECT repo, COUNT(*), SUM(indexed) FROM files GROUP BY repo")}
+        symbols = dict(self._db.execute("SELECT f.repo, COUNT(*) FROM symbols s JOIN files f ON f.id = s.file_id "
+                                        "GROUP BY f.repo"))
+        return {repo: (branch, commit, indexed_at, *counts.get(repo, (0, 0)), symbols.get(repo, 0))
+                for repo, branch, commit, indexed_at in
+                self._db.execute("SELECT repo, branch, commit_id, indexed_at FROM repos ORDER BY repo")}
+
+
+def _repo_filter(repos, prefix=""):
+    if not repos:
+        return "", ()
+    return f"AND {prefix}repo IN ({','.join('?' * len(repos))})", tuple(repos)
+
+
+def sync(repos=None, env=None, concurrency=4):
+    """Fetch the mirrors concurrently, then re-index what changed → {repo: (commit, changed, removed) | error}."""
+    env = os.environ if env is None else env
+    root = code_dir(env)
+    mirrors = [Mirror(repo, REPO_BRANCHES[repo], root, env.get("HUMAND_CODE_MIRROR_URL") or DEFAULT_MIRROR_URL)
+               for repo in (repos or REPO_BRANCHES)]
+
+    def fetch(mirror):
+        try:
+            return mirror.sync()
+        except CodeIndexError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        commits = list(pool.map(fetch, mirrors))
+
+    results = {}
+    with CodeIndex(os.path.join(root, "index.sqlite3")) as index:
+        for mirror, commit in zip(mirrors, commits):
+            if isinstance(commit, CodeIndexError):
+                results[mirror.repo] = commit
+            elif index.indexed_commit(mirror.repo) == commit:
+                results[mirror.repo] = (commit, 0, 0)
+            else:
+                with trace.span("index repo", repo=mirror.repo) as info:
+                    changed, removed = index.update(mirror, commit)
+                    info.update(changed=changed, removed=removed)
+                results[mirror.repo] = (commit, changed, removed)
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m hulib.codeindex", description="Local code index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("sync", help="Fetch the mirrors and re-index changed files")
+    p.add_argument("repos", nargs="*", metavar="repo", help=f"Default: {', '.join(REPO_BRANCHES)}")
+    for name, arg, help_text in (("search", "text", "Lines containing text"),
+                                 ("symbol", "name", "Definitions by name (prefix*)"),
+                                 ("files", "pattern", "Paths containing a substring or matching a glob")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument(arg)
+        p.add_argument("--repo", action="append", choices=list(REPO_BRANCHES), help="Limit to repo (repeatable)")
+        p.add_argument("--limit", type=int, default=200 if name == "files" else 50)
+        p.add_argument("--json", action="store_true", help="JSON output")
+        if name == "search":
+            p.add_argument("--path", default=None, help="Only paths matching this glob")
+        if name == "symbol":
+            p.add_argument("--kind", default=None, help="function, class, type, enum, route")
+    p = sub.add_parser("show", help="Print an indexed file with line numbers")
+    p.add_argument("repo", choices=list(REPO_BRANCHES))
+    p.add_argument("path")
+    p.add_argument("--lines", default=None, help="A-B line range")
+    sub.add_parser("stats", help="Indexed commit and counts per repo")
+    args = parser.parse_args(argv)
+
+    if args.command == "sync":
+        unknown = sorted(set(args.repos) - set(REPO_BRANCHES))
+        if unknown:
+            parser.error(f"unknown repo(s): {', '.join(unknown)}")
+        failed = False
+        with trace.span("code index sync"):
+            results = sync(args.repos)
+        for repo, result in results.items():
+            if isinstance(result, CodeIndexError):
+                failed = True
+                print(f"Warning: {result}", file=sys.stderr)
+            else:
+                commit, changed, removed = result
+                print(f"{repo}: {commit[:12]} ({changed} files re-indexed, {removed} removed)", file=sys.stderr)
+        return 3 if failed else 0
+
+    path = os.path.join(code_dir(), "index.sqlite3")
+    if not os.path.exists(path):
+        print("Error: no code index yet; run `python3 -m hulib.codeindex sync`", file=sys.stderr)
+        return 1
+    with CodeIndex(path) as index:
+        if args.command == "stats":
+            for repo, (branch, commit, indexed_at, files, indexed, symbols) in index.stats().items():
+                when = time.strftime("%Y-%m-%d %H:%M", time.localtime(indexed_at))
+                print(f"{repo:<18} {branch}@{commit[:12]}  {files} files ({indexed} indexed), "
+                      f"{symbols} symbols, synced {when}")
+            return 0
+        if args.command == "show":
+            text = index.show(args.repo, args.path)
+            if text is None:
+                print(f"Error: {args.repo}/{args.path} is not indexed", file=sys.stderr)
+                return 1
+            lines = text.split("\n")
+            start, _, end = (args.lines or f"1-{len(lines)}").partition("-")
+            first, last = max(1, int(start)), min(len(lines), int(end or start))
+            for number in range(first, last + 1):
+                print(f"{number:>5}  {lines[number - 1]}")
+            return 0
+        try:
+            if args.command == "search":
+                rows = index.search(args.text, args.repo, args.path, args.limit)
+                keys = ("repo", "path", "line", "snippet")
+            elif args.command == "symbol":
+                rows = index.symbols(args.name, args.repo, args.kind, args.limit)
+                keys = ("repo", "path", "line", "kind", "name", "snippet")
+            else:
+                rows = index.files(args.pattern, args.repo, args.limit)
+                keys = ("repo", "path", "size")
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+
+    if args.json:
+        json.dump([dict(zip(keys, row)) for row in rows], sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    elif args.command == "files":
+        for repo, file_path, size in rows:
+            print(f"{repo}/{file_path}\t{size}")
+    elif args.command == "symbol":
+        for repo, file_path, line, kind, _, text in rows:
+            print(f"{repo}/{file_path}:{line}: [{kind}] {text}")
+    else:
+        for repo, file_path, line, text in rows:
+            print(f"{repo}/{file_path}:{line}: {text}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
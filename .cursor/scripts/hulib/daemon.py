@@ -0,0 +1,529 @@
+"""Report daemon: each team's sprint kept in memory and updated from webhooks.
+
+`sprint-report.py serve` loads every team's open sprint once (the `run`
+pipeline, through the per-sprint snapshot) and keeps its issues, fallback PRs,
+review status and WIP branches in memory. Jira and GitHub webhooks
+(hulib/webhooks.py) posted to its local HTTP endpoint are applied to that state
+as they arrive, so a report is rendered from memory in milliseconds instead of
+being fetched again:
+
+  - jira:issue_created / updated / deleted: the issue replaces its copy, joins
+    its team's sprint (by key prefix and sprint) or leaves it;
+  - pull_request: stored when it mentions a ticket of the team (the report
+    keeps the ones the fallback search would return); while it is open or
+    merged its head branch is no longer a WIP branch;
+  - push: a new branch naming a sprint ticket becomes a WIP branch and a deleted
+    one goes away; a push to a PR head or Jira Dev Branch marks its review
+    status for a refresh, a push to a staging branch (develop, main, release-*,
+    versions) of a staging repo marks the staging status stale;
+  - reviews, check suites / runs and statuses mark review status for a refresh.
+
+Work that needs GitHub (review status of the PRs touched, the fallback search
+for tickets that join without Jira dev info) is batched by a worker thread
+every DEBOUNCE seconds. Every HUMAND_DAEMON_SWEEP seconds each team is reloaded
+through its snapshot (an incremental refresh) to repair missed events: what it
+corrected is reported as `drift` in /status, and events received while it ran
+are applied again on top of its result. Until then, tickets whose order a
+status change would move keep their previous place among equal-priority rows.
+
+Endpoints (bound to 127.0.0.1 unless --host says otherwise):
+    GET  /report/<team>[?format=markdown|csv|json]
+    GET  /staging/<team>     team-staging-status.sh output; a stale copy is served
+                             (X-Stale: 1) while it is regenerated
+    GET  /status
+    POST /webhooks/jira | /webhooks/github
+    POST /sweep[/<team>]
+
+The daemon's own Jira and GitHub calls run at background priority
+(hulib/ratelimit.py), so interactive runs sharing the budget go first. Served
+reports are not recorded in the metrics store; a scheduled `run` still does.
+
+Environment:
+    HUMAND_DAEMON_SWEEP    seconds between reconciliation sweeps (default: 900; 0 disables)
+    HUMAND_WEBHOOK_SECRET  see hulib/webhooks.py; required with a non-loopback --host
+    RELEASE_REPOS, VERSION_REPOS  staging repos, as team-staging-status.sh reads them
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import trace
+from .keys import extract_ticket_keys
+from .teams import resolve_project
+from .webhooks import DEFAULT_PORT, github_event, in_sprint, jira_event, verify
+
+DEBOUNCE = 2.0
+DEFAULT_SWEEP = 900
+
+STAGING_BRANCH = re.compile(r"^(develop|main|master|release[/-].+|v?\d+\.\d+.*)$")
+
+CONTENT_TYPES = {
+    "markdown": "text/markdown; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json; charset=utf-8",
+}
+
+
+def log(message):
+    print(f"==> {message}", file=sys.stderr)
+
+
+def staging_repos(env=None):
+    env = os.environ if env is None else env
+    return set((env.get("RELEASE_REPOS") or "humand-web humand-backoffice humand-main-api").split()) | \
+        set((env.get("VERSION_REPOS") or "humand-mobile").split())
+
+
+def project_of(key):
+    return key.split("-", 1)[0]
+
+
+def diff_count(old, new):
+    """Entries of two dicts that were added, removed or changed."""
+    return sum(old.get(k) != new.get(k) for k in set(old) | set(new))
+
+
+class TeamState:
+    """One team's sprint as the report reads it, plus what is pending for it."""
+
+    def __init__(self, project, name):
+        self.project = project
+        self.name = name
+        self.issues = {}            # key → compact issue, in JQL order
+        self.prs = {}               # (repo, number) → PR mentioning a ticket of the project
+        self.reviews = {}
+        self.branches = {}
+        self.searched = set()       # keys whose fallback PRs are in prs
+        self.reviewed = set()       # review targets already fetched
+        self.pending_search = set()
+        self.pending_reviews = set()
+        self.journal = None         # events received during a sweep
+        self.version = 0
+        self.loaded_at = self.event_at = None
+        self.drift = None
+        self.staging = None         # (text, generated_at)
+        self.staging_gen = 0        # bumped when the staging status goes stale
+        self.staging_done = -1      # staging_gen the cached text was generated at
+        self.staging_lock = threading.Lock()
+
+
+class Daemon:
+    """In-memory sprint states, webhook application and the worker thread.
+
+    gen is generate-sprint-report.py. Callbacks (from sprint-report.py):
+        load(project)       → (tickets, prs, reviews, branches) for the open sprint
+        search(keys)        → fallback PRs for keys, or None to skip the search
+        reviews(targets)    → reviews dict for review targets, or None (review status off)
+        staging(project, name) → team-staging-status.sh output, or None (/staging off)
+    """
+
+    def __init__(self, gen, teams, projects, names, load, search=None, reviews=None, staging=None,
+                 sprint=None, sweep_every=DEFAULT_SWEEP, debounce=DEBOUNCE):
+        self.gen = gen
+        self.teams = teams
+        self.sprint = sprint
+        self.states = {p: TeamState(p, names.get(p, p)) for p in projects}
+        self.load_sprint = load
+        self.search = search
+        self.fetch_reviews = reviews
+        self.run_staging = staging
+        self.sweep_every = sweep_every
+        self.debounce = debounce
+        self.staging_repos = staging_repos()
+        self.lock = threading.RLock()
+        self.stopping = threading.Event()
+        self.wake = threading.Event()
+        self.sweep_requested = set()
+        self.started_at = time.time()
+        self.last_sweep = time.time()
+        self.events = 0
+
+    # State ------------------------------------------------------------------
+
+    def resolve(self, team):
+        project = resolve_project(team, self.teams)
+        return project if project in self.states else None
+
+    def _reset(self, state, data):
+        """Replace state with freshly loaded data."""
+        tickets, prs, reviews, branches = data
+        # Compacted like webhook issues, so a sweep compares like with like (snapshot issues are raw).
+        state.issues = {i["key"]: self.gen.compact_issue(i) for i in tickets}
+        state.prs = {(p["repo"], p["number"]): p for p in prs}
+        state.reviews = dict(reviews)
+        state.branches = dict(branches)
+        state.searched = {k for k, i in state.issues.items() if self.gen.needs_pr_search(i)}
+        state.reviewed = set(self.gen.review_targets(tickets, prs)) if self.fetch_reviews else set()
+        state.pending_search.clear()
+        state.pending_reviews.clear()
+        state.loaded_at = time.time()
+        state.version += 1
+
+    def _contents(self, state):
+        """What drift is counted on: issues, the PRs the report uses, WIP branches."""
+        return state.issues, self._pr_map(state), state.branches
+
+    def _report_prs(self, state):
+        """The stored PRs a fallback search for the tickets without Jira dev info returns, by (repo, number)."""
+        search_keys = {k for k, i in state.issues.items() if self.gen.needs_pr_search(i)}
+        prs = [pr for pr in state.prs.values()
+               if extract_ticket_keys(pr.get("title", ""), pr.get("headRefName", "")) & search_keys]
+        return sorted(prs, key=lambda p: (p["repo"], p["number"]))
+
+    def _pr_map(self, state):
+        return {(p["repo"], p["number"]): p for p in self._report_prs(state)}
+
+    def _changed(self, state):
+        """After an event: bump the version and queue what now needs GitHub."""
+        state.version += 1
+        state.event_at = time.time()
+        if self.search:
+            state.pending_search |= {k for k, i in state.issues.items()
+                                     if k not in state.searched and self.gen.needs_pr_search(i)}
+        if self.fetch_reviews:
+            targets = self.gen.review_targets(state.issues.values(), self._report_prs(state))
+            state.pending_reviews |= set(targets) - state.reviewed
+        if state.pending_search or state.pending_reviews:
+            self.wake.set()
+
+    def _set_branch(self, state, key, repo, ref, present):
+        """Add or remove one WIP branch of key; lists are replaced, never mutated (renders share them)."""
+        entry = {"repo": repo, "ref": ref}
+        current = [b for b in state.branches.get(key, []) if b != entry]
+        if present:
+            current = sorted(current + [entry], key=lambda b: (b["repo"], b["ref"]))
+        branches = {k: v for k, v in state.branches.items() if k != key}
+        if current:
+            branches[key] = current
+        state.branches = dict(sorted(branches.items()))
+
+    def _mark_review(self, state, repo, numbers=(), branches=()):
+        """Queue the review status of PRs numbers / heads branches of repo for a refresh, if the report shows it."""
+        if not self.fetch_reviews:
+            return
+        targets = {f"{repo}#{n}" for n in numbers} | {f"{repo}@{b}" for b in branches}
+        targets |= {f"{repo}#{p['number']}" for p in state.prs.values()
+                    if p["repo"] == repo and p.get("headRefName") in branches}
+        targets &= set(self.gen.review_targets(state.issues.values(), self._report_prs(state)))
+        if targets:
+            state.reviewed -= targets
+            state.pending_reviews |= targets
+            self.wake.set()
+
+    def _journal(self, state, event):
+        if state.journal is not None:
+            state.journal.append(event)
+
+    # Webhooks ---------------------------------------------------------------
+
+    def apply_jira(self, payload, replay=False):
+        """Apply a Jira webhook payload → projects it changed."""
+        event = jira_event(payload)
+        if event is None:
+            return []
+        action, issue = event
+        with self.lock:
+            state = self.states.get(project_of(issue["key"]))
+            if state is None:
+                return []
+            if not replay:
+                self._journal(state, ("jira", payload))
+            key = issue["key"]
+            if action == "upsert" and in_sprint(issue["fields"], self.sprint):
+                state.issues[key] = self.gen.compact_issue(issue)
+            elif state.issues.pop(key, None) is None:
+                return []
+            self._changed(state)
+            return [state.project]
+
+    def apply_github(self, event_name, payload, states=None):
+        """Apply a GitHub webhook payload to states (default: every team) → projects it changed."""
+        event = github_event(event_name, payload)
+        if event is None:
+            return []
+        replay = states is not None
+        with self.lock:
+            changed = []
+            for state in states or self.states.values():
+                if not replay:
+                    self._journal(state, ("github", event_name, payload))
+                if self._apply_github(state, event):
+                    self._changed(state)
+                    changed.append(state.project)
+            if event["type"] == "push" and event["repo"] in self.staging_repos \
+                    and STAGING_BRANCH.match(event["branch"]):
+                for state in states or self.states.values():
+                    state.staging_gen += 1
+            return changed
+
+    def _apply_github(self, state, event):
+        repo = event["repo"]
+        if event["type"] == "pull_request":
+            pr = event["pr"]
+            keys = {k for k in extract_ticket_keys(pr["title"], pr["headRefName"]) if project_of(k) == state.project}
+            if not keys:
+                return False
+            state.prs[(repo, pr["number"])] = pr
+            for key in keys & set(state.issues):
+                # The branch scan only lists branches without an open or merged PR.
+                self._set_branch(state, key, repo, pr["headRefName"], pr["state"] == "CLOSED")
+            if pr["state"] == "OPEN":
+                self._mark_review(state, repo, numbers=[pr["number"]])
+            return True
+        if event["type"] == "push":
+            branch = event["branch"]
+            self._mark_review(state, repo, branches=[branch])
+            keys = extract_ticket_keys(branch) & set(state.issues)
+            has_pr = any(p["repo"] == repo and p.get("headRefName") == branch and p["state"] != "CLOSED"
+                         for p in state.prs.values())
+            if not keys or not (event["created"] or event["deleted"]):
+                return False
+            for key in keys:
+                self._set_branch(state, key, repo, branch, event["created"] and not has_pr)
+            return True
+        self._mark_review(state, repo, numbers=event["numbers"], branches=event["branches"])
+        return False
+
+    # Reports ----------------------------------------------------------------
+
+    def snapshot(self, project):
+        """Copies of what a render reads, taken under the lock."""
+        with self.lock:
+            state = self.states[project]
+            return list(state.issues.values()), self._report_prs(state), dict(state.reviews), dict(state.branches)
+
+    def render(self, project, fmt):
+        """Report text for project in fmt, rendered from memory."""
+        tickets, prs, reviews, branches = self.snapshot(project)
+        with trace.span(f"daemon render {fmt}", project=project, tickets=len(tickets)):
+            _, text, _, _ = self.gen.render_project((project, tickets, prs, reviews, branches, fmt, None, None))
+        return text
+
+    def staging(self, project):
+        """→ (staging status text, stale); regenerated first only if none was ever generated."""
+        state = self.states[project]
+        with self.lock:
+            cached, fresh = state.staging, state.staging_done == state.staging_gen
+        if cached is None:
+            return self._regenerate_staging(state), False
+        if not fresh:
+            threading.Thread(target=self._regenerate_staging, args=(state,), daemon=True).start()
+        return cached[0], not fresh
+
+    def _regenerate_staging(self, state):
+        with state.staging_lock:
+            with self.lock:
+                gen = state.staging_gen
+                if state.staging is not None and state.staging_done == gen:
+                    return state.staging[0]
+            with trace.span("daemon staging status", project=state.project):
+                text = self.run_staging(state.project, state.name)
+            with self.lock:
+                state.staging, state.staging_done = (text, time.time()), gen
+            return text
+
+    def status(self):
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "events": self.events,
+                "last_sweep": self.last_sweep,
+                "teams": {p: {
+                    "name": s.name, "tickets": len(s.issues), "prs": len(self._report_prs(s)),
+                    "reviews": len(s.reviews), "branches": len(s.branches), "version": s.version,
+                    "loaded_at": s.loaded_at, "event_at": s.event_at, "drift": s.drift,
+                    "pending": {"search": len(s.pending_search), "reviews": len(s.pending_reviews)},
+                    "staging": None if s.staging is None else
+                    {"generated_at": s.staging[1], "stale": s.staging_done != s.staging_gen},
+                } for p, s in self.states.items()},
+            }
+
+    # Loading, sweeps and the worker ------------------------------------------
+
+    def load_all(self, workers=4):
+        """Initial load of every team (in parallel); errors propagate."""
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            loaded = dict(zip(self.states, pool.map(self.load_sprint, self.states)))
+        with self.lock:
+            for project, data in loaded.items():
+                self._reset(self.states[project], data)
+        self.last_sweep = time.time()
+
+    def sweep(self, projects=None):
+        """Reload projects (default: all) and re-apply the events received meanwhile."""
+        for project in projects or list(self.states):
+            state = self.states[project]
+            with self.lock:
+                state.journal = []
+            try:
+                with trace.span("daemon sweep", project=project):
+                    data = self.load_sprint(project)
+            except Exception as e:
+                print(f"Warning: sweep of {project} failed: {e}", file=sys.stderr)
+                with self.lock:
+                    state.journal = None
+                continue
+            with self.lock:
+                journal, state.journal = state.journal, None
+                before = self._contents(state)
+                self._reset(state, data)
+                state.staging_gen += 1
+                for source, *event in journal:
+                    if source == "jira":
+                        self.apply_jira(*event, replay=True)
+                    else:
+                        self.apply_github(*event, states=[state])
+                state.drift = dict(zip(("tickets", "prs", "branches"),
+                                       map(diff_count, before, self._contents(state))))
+            drift = state.drift
+            log(f"Sweep {project}: {len(state.issues)} tickets; corrected {drift['tickets']} tickets, "
+                f"{drift['prs']} PRs, {drift['branches']} branch entries; {len(journal)} events re-applied")
+        if projects is None:
+            self.last_sweep = time.time()
+
+    def request_sweep(self, projects=None):
+        with self.lock:
+            self.sweep_requested |= set(projects or self.states)
+        self.wake.set()
+
+    def _drain(self, state):
+        """Run the GitHub work queued for state."""
+        with self.lock:
+            keys, state.pending_search = sorted(state.pending_search), set()
+            targets, state.pending_reviews = state.pending_reviews, set()
+            targets = sorted(targets & set(self.gen.review_targets(state.issues.values(), self._report_prs(state))))
+            state.reviewed |= set(targets)  # in flight: not queued again by events meanwhile
+        if keys:
+            try:
+                prs = self.search(keys)
+            except Exception as e:
+                print(f"Warning: PR search for {len(keys)} new tickets failed: {e}", file=sys.stderr)
+            else:
+                with self.lock:
+                    for pr in prs:
+                        state.prs[(pr["repo"], pr["number"])] = pr
+                    state.searched |= set(keys)
+                    self._changed(state)
+        if targets:
+            try:
+                reviews = self.fetch_reviews(targets)
+            except Exception as e:
+                print(f"Warning: review status for {len(targets)} PRs failed: {e}", file=sys.stderr)
+                with self.lock:
+                    state.reviewed -= set(targets)
+            else:
+                with self.lock:
+                    state.reviews = {**state.reviews, **reviews}
+                    state.version += 1
+
+    def work(self):
+        """Worker loop: queued GitHub work every debounce seconds, sweeps when due or requested."""
+        while not self.stopping.is_set():
+            due = self.last_sweep + self.sweep_every - time.time()
+            self.wake.wait(timeout=max(due, 0) if self.sweep_every else None)
+            if self.stopping.wait(self.debounce):
+                break
+            self.wake.clear()
+            for state in self.states.values():
+                self._drain(state)
+            with self.lock:
+                requested, self.sweep_requested = self.sweep_requested, set()
+            if self.sweep_every and time.time() - self.last_sweep >= self.sweep_every:
+                self.sweep()
+            elif requested:
+                self.sweep(sorted(requested))
+
+    def serve(self, host="127.0.0.1", port=DEFAULT_PORT, secret=None):
+        """Serve until interrupted; the worker thread runs alongside."""
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        server.app, server.secret = self, secret
+        worker = threading.Thread(target=self.work, name="daemon-worker", daemon=True)
+        worker.start()
+        log(f"Serving {', '.join(self.states)} on http://{host}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopping.set()
+            self.wake.set()
+            server.server_close()
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "humand-report-daemon"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def send(self, status, body, content_type="application/json; charset=utf-8", headers=()):
+        data = body.encode() if isinstance(body, str) else json.dumps(body, indent=2).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def route(self):
+        url = urllib.parse.urlsplit(self.path)
+        return [p for p in url.path.split("/") if p], urllib.parse.parse_qs(url.query)
+
+    def do_GET(self):
+        app = self.server.app
+        parts, query = self.route()
+        if parts == ["status"]:
+            return self.send(200, app.status())
+        if len(parts) != 2 or parts[0] not in ("report", "staging"):
+            return self.send(404, {"error": "not found"})
+        project = app.resolve(parts[1])
+        if project is None:
+            return self.send(404, {"error": f"unknown team {parts[1]!r}"})
+        if parts[0] == "staging":
+            if app.run_staging is None:
+                return self.send(404, {"error": "staging status is off"})
+            try:
+                text, stale = app.staging(project)
+            except Exception as e:
+                return self.send(502, {"error": f"team-staging-status.sh failed: {e}"})
+            return self.send(200, text, CONTENT_TYPES["markdown"], [("X-Stale", "1" if stale else "0")])
+        fmt = query.get("format", ["markdown"])[0]
+        if fmt not in CONTENT_TYPES:
+            return self.send(400, {"error": f"format must be one of {', '.join(CONTENT_TYPES)}"})
+        return self.send(200, app.render(project, fmt), CONTENT_TYPES[fmt])
+
+    def do_POST(self):
+        app = self.server.app
+        parts, _ = self.route()
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if parts[:1] == ["sweep"] and len(parts) <= 2:
+            project = app.resolve(parts[1]) if len(parts) == 2 else None
+            if len(parts) == 2 and project is None:
+                return self.send(404, {"error": f"unknown team {parts[1]!r}"})
+            app.request_sweep([project] if project else None)
+            return self.send(202, {"sweep": [project] if project else sorted(app.states)})
+        if len(parts) != 2 or parts[0] != "webhooks" or parts[1] not in ("jira", "github"):
+            return self.send(404, {"error": "not found"})
+        if not verify(self.server.secret, body, self.headers):
+            return self.send(401, {"error": "bad or missing signature"})
+        try:
+            payload = json.loads(body)
+            if parts[1] == "jira":
+                changed = app.apply_jira(payload)
+            else:
+                changed = app.apply_github(self.headers.get("X-GitHub-Event"), payload)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return self.send(400, {"error": f"unrecognized payload: {e!r}"})
+        with app.lock:
+            app.events += 1
+        return self.send(202, {"changed": changed})
@@ -0,0 +1,102 @@
+"""`gh` CLI wrapper that goes through the shared response cache.
+
+Drop-in for `gh` in the shell scripts:
+
+    PYTHONPATH="$SCRIPT_DIR" python3 -m hulib.gh pr list --repo HumandDev/humand-web ...
+
+`gh pr list` / `gh api graphql` expose no ETag to revalidate against, so a cached
+stdout (keyed by the full argv) is reused only while it is younger than
+HUMAND_CACHE_GH_MAX_AGE seconds (default 600). With HUMAND_CACHE unset the
+command runs uncached. Failed commands are never cached. With HUMAND_TRACE set,
+each call is recorded as a `gh` span (hulib/trace.py).
+
+Every run takes a slot from the shared api.github.com budget first
+(hulib/ratelimit.py). A run that fails on a GitHub rate limit pauses the host
+for every caller and is retried up to MAX_THROTTLE_RETRIES times; identical
+read-only calls in flight at the same time run once.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+from . import ratelimit, trace
+from .cache import cache_from_env, cache_key
+
+DEFAULT_GH_MAX_AGE = 600
+
+MAX_THROTTLE_RETRIES = 2
+
+# gh's messages for primary and secondary rate limits, REST and GraphQL.
+RATE_LIMITED = re.compile(rb"rate limit|submitted too quickly", re.IGNORECASE)
+
+READ_COMMANDS = {("pr", "list"), ("pr", "view"), ("pr", "status"), ("repo", "view")}
+
+
+def run_gh(args, cache=None, max_age=None, stdin=None):
+    """Run `gh <args>` → (returncode, stdout bytes, stderr bytes), served from cache when possible."""
+    with trace.span(trace.gh_label(args), "gh") as info:
+        code, out, err = _run_gh(args, cache, max_age, stdin, info)
+        info.update(code=code, bytes=len(out))
+    return code, out, err
+
+
+def _run_gh(args, cache, max_age, stdin, info):
+    if max_age is None:
+        max_age = float(os.environ.get("HUMAND_CACHE_GH_MAX_AGE", DEFAULT_GH_MAX_AGE))
+    key = None
+    if cache is not None and stdin is None:
+        key = cache_key("gh", *args)
+        entry = cache.get(key)
+        if entry is not None and entry.age() <= max_age:
+            info["cached"] = True
+            return 0, entry.body, b""
+
+    if stdin is None and is_read(args):
+        code, out, err = ratelimit.coalesce(("gh", *args), lambda: _call_gh(args, None))
+    else:
+        code, out, err = _call_gh(args, stdin)
+    if key is not None and code == 0:
+        cache.put(key, "gh " + " ".join(args), 200, {}, out)
+    return code, out, err
+
+
+def is_read(args):
+    """Whether `gh <args>` only reads (safe to share with a concurrent identical call)."""
+    if tuple(args[:2]) in READ_COMMANDS:
+        return True
+    return (args[:1] == ["api"] and not any(a in ("-X", "--method") or a.startswith("--method=") for a in args)
+            and not any("mutation" in a for a in args))
+
+
+def _call_gh(args, stdin):
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        ratelimit.acquire(ratelimit.GITHUB_HOST)
+        try:
+            proc = subprocess.run(["gh", *args], input=stdin, capture_output=True)
+        except FileNotFoundError:
+            return 127, b"", b"gh: command not found\n"
+        if proc.returncode == 0 or not RATE_LIMITED.search(proc.stderr):
+            break
+        ratelimit.update(ratelimit.GITHUB_HOST, throttle=True)
+        if attempt < MAX_THROTTLE_RETRIES:
+            print(f"Warning: GitHub rate limit hit; retrying gh {' '.join(args[:2])} once the budget allows",
+                  file=sys.stderr)
+    return proc.returncode, proc.stdout, proc.stderr
+
+
+def main(argv):
+    cache = cache_from_env()
+    try:
+        code, out, err = run_gh(argv, cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    sys.stdout.buffer.write(out)
+    sys.stderr.buffer.write(err)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
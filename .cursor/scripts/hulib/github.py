@@ -0,0 +1,196 @@
+"""Batched GitHub PR search over aliased GraphQL `search` queries.
+
+search-prs-for-keys.sh used to run one `gh pr list --search` per 10 keys per
+repo, each capped at --limit 100 with the overflow silently dropped. Here every
+search query covers all repos (repeated `repo:` qualifiers), keys are packed
+into each query up to GitHub's search limits, many queries are sent as aliases
+of one GraphQL request, and every query is paged with cursors until exhausted.
+
+GitHub search limits (docs: "Limitations on query length"): at most
+MAX_OPERATORS AND/OR/NOT operators and MAX_QUERY_CHARS characters of search
+text per query; qualifiers such as `repo:` and `is:pr` do not count. Each key
+contributes two terms (title text and `head:` branch), so the operator cap is
+usually what bounds a query. A search never returns more than MAX_RESULTS
+results; a query that matches more is split into narrower queries (per repo, then
+per key), and only what still cannot be listed is reported on stderr.
+
+Requests go through `gh api graphql` (hulib/gh.py), so HUMAND_CACHE=1 and the
+shared rate-limit budget (hulib/ratelimit.py) apply. Each request also asks for
+`rateLimit { cost remaining limit resetAt }`: the budget is reported back to the
+scheduler, and HUMAND_TRACE records it per request (hulib/trace.py).
+"""
+
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from . import ratelimit, trace
+from .cache import cache_from_env
+from .gh import run_gh
+
+ORG = "HumandDev"
+
+MAX_OPERATORS = 5
+MAX_QUERY_CHARS = 256
+MAX_RESULTS = 1000
+
+PAGE_SIZE = 100
+ALIASES_PER_REQUEST = 20
+CONCURRENCY = 4
+
+PR_FIELDS = "number title url state isDraft headRefName mergedAt repository { name }"
+
+RATE_LIMIT_FIELDS = "rateLimit { cost remaining limit resetAt }"
+
+
+class GitHubError(Exception):
+    """`gh api graphql` failed or returned no data."""
+
+
+def key_terms(key):
+    return [key, f"head:{key.lower()}"]
+
+
+def pack_queries(keys, max_operators=MAX_OPERATORS, max_chars=MAX_QUERY_CHARS):
+    """Group keys so each group's `a OR head:a OR b ...` fits the search limits."""
+    groups, current, terms = [], [], []
+    for key in keys:
+        candidate = terms + key_terms(key)
+        if current and (len(candidate) - 1 > max_operators or len(" OR ".join(candidate)) > max_chars):
+            groups.append(current)
+            current, candidate = [], key_terms(key)
+        current.append(key)
+        terms = candidate
+    if current:
+        groups.append(current)
+    return groups
+
+
+def search_string(keys, repos, org=ORG):
+    terms = " OR ".join(t for k in keys for t in key_terms(k))
+    qualifiers = " ".join(f"repo:{org}/{repo}" for repo in repos)
+    return f"{terms} is:pr {qualifiers}"
+
+
+def build_request(searches, page_size=PAGE_SIZE):
+    """One GraphQL document with an aliased `search` per (alias, query, cursor)."""
+    parts = []
+    for alias, query, cursor in searches:
+        after = f", after: {json.dumps(cursor)}" if cursor else ""
+        parts.append(
+            f"  {alias}: search(query: {json.dumps(query)}, type: ISSUE, first: {page_size}{after}) {{\n"
+            f"    issueCount\n"
+            f"    pageInfo {{ hasNextPage endCursor }}\n"
+            f"    nodes {{ ... on PullRequest {{ {PR_FIELDS} }} }}\n"
+            f"  }}"
+        )
+    parts.append(f"  {RATE_LIMIT_FIELDS}")
+    return "query {\n" + "\n".join(parts) + "\n}"
+
+
+def graphql(query, cache=None, name="graphql search", max_age=None):
+    with trace.span(name, "github") as info:
+        code, out, err = run_gh(["api", "graphql", "-f", f"query={query}"], cache=cache, max_age=max_age)
+        try:
+            payload = json.loads(out) if out else {}
+        except json.JSONDecodeError:
+            payload = {}
+        budget = (payload.get("data") or {}).get("rateLimit") or {}
+        info.update(budget)
+    if budget.get("remaining") is not None:
+        ratelimit.update(ratelimit.GITHUB_HOST, budget["remaining"], budget.get("limit"),
+                         ratelimit.reset_time(budget.get("resetAt")))
+    if payload.get("errors"):
+        messages = "; ".join(e.get("message", "") for e in payload["errors"])
+        print(f"Warning: GitHub GraphQL errors: {messages}", file=sys.stderr)
+    if code != 0 and not payload.get("data"):
+        raise GitHubError(f"gh api graphql exited with {code}: {err.decode('utf-8', 'replace').strip()}")
+    return payload.get("data") or {}
+
+
+def split_search(keys, repos):
+    """Narrower searches for a query that hit MAX_RESULTS: per repo first, then per key."""
+    if len(repos) > 1:
+        return [(keys, [repo]) for repo in repos]
+    if len(keys) > 1:
+        return [([key], repos) for key in keys]
+    return []
+
+
+def search_prs(keys, repos, cache=None, concurrency=CONCURRENCY):
+    """Search PRs mentioning any of keys (title or branch) in repos → PR dicts.
+
+    Output matches `gh pr list --json number,title,state,url,isDraft,headRefName,mergedAt`
+    plus `repo`, de-duplicated and ordered by (repo, number). A query matching more
+    than MAX_RESULTS PRs is re-run split by repo, then by key; only a single key in
+    a single repo over the cap is reported as truncated.
+    """
+    aliases = iter(f"q{i}" for i in range(1 << 30))
+    searches = {}
+
+    def add(group, group_repos):
+        alias = next(aliases)
+        searches[alias] = (group, group_repos)
+        return alias, search_string(group, group_repos), None
+
+    repos = list(repos)
+    pending = [add(group, repos) for group in pack_queries(sorted(set(keys)))]
+    found = {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while pending:
+            batches = [pending[i:i + ALIASES_PER_REQUEST] for i in range(0, len(pending), ALIASES_PER_REQUEST)]
+            results = pool.map(lambda batch: graphql(build_request(batch), cache), batches)
+            next_pending = []
+            for batch, data in zip(batches, results):
+                for alias, query, cursor in batch:
+                    result = data.get(alias)
+                    if result is None:
+                        print(f"Warning: no result for search {query!r}; its PRs are missing", file=sys.stderr)
+                        continue
+                    for node in result.get("nodes") or []:
+                        repo = (node.get("repository") or {}).get("name")
+                        if not node.get("number") or repo not in repos:
+                            continue
+                        pr = {k: node.get(k) for k in ("number", "title", "state", "url", "isDraft",
+                                                         "headRefName", "mergedAt")}
+                        pr["repo"] = repo
+                        found[f"{repo}#{pr['number']}"] = pr
+
+                    if cursor is None and result.get("issueCount", 0) > MAX_RESULTS:
+                        narrower = split_search(*searches[alias])
+                        if narrower:
+                            next_pending.extend(add(group, group_repos) for group, group_repos in narrower)
+                            continue
+                        print(f"Warning: search {query!r} matched {result['issueCount']} PRs; GitHub returns "
+                              f"at most {MAX_RESULTS}, the rest are missing", file=sys.stderr)
+                    page_info = result.get("pageInfo") or {}
+                    if page_info.get("hasNextPage"):
+                        next_pending.append((alias, query, page_info.get("endCursor")))
+            pending = next_pending
+
+    return sorted(found.values(), key=lambda p: (p["repo"], p["number"]))
+
+
+def main(argv):
+    if len(argv) < 2 or argv[0] != "search-prs" or "--" not in argv:
+        print("Usage: python3 -m hulib.github search-prs <repo>... -- <KEY>...", file=sys.stderr)
+        return 1
+    sep = argv.index("--")
+    repos, keys = argv[1:sep], argv[sep + 1:]
+    cache = cache_from_env()
+    try:
+        with trace.span("GitHub PR search", keys=len(keys), repos=len(repos)):
+            prs = search_prs(keys, repos, cache=cache)
+    except GitHubError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 3
+    finally:
+        if cache is not None:
+            cache.close()
+    json.dump(prs, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
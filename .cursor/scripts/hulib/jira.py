@@ -0,0 +1,197 @@
+"""Jira REST helpers: credential resolution, paged JQL search, dev-status and changelog lookups."""
+
+import base64
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import cache_from_env
+from .client import HttpClient
+
+DEFAULT_BASE_URL = "https://humand.atlassian.net"
+
+# Jira caps maxResults at 100 for /search; key in (...) lists are chunked to match.
+PAGE_SIZE = 100
+KEY_CHUNK = 100
+
+# Fields the sprint report reads (see generate-sprint-report.py).
+SPRINT_FIELDS = ("summary,issuetype,status,priority,assignee,flagged,customfield_10021,"
+                 "customfield_10028,customfield_10000,customfield_10097,sprint")
+SPRINT_ORDER = "status ASC, priority DESC"
+
+
+def jira_settings(env=None):
+    """Resolve (base_url, email, token) from the env var aliases the scripts accept."""
+    env = os.environ if env is None else env
+    base = env.get("JIRA_BASE_URL") or env.get("ATLASSIAN_BASE_URL") or DEFAULT_BASE_URL
+    base = base.rstrip("/")
+    if base.endswith("/browse"):
+        base = base[: -len("/browse")]
+    email = (env.get("JIRA_EMAIL") or env.get("ATLASSIAN_EMAIL")
+             or env.get("JIRA_USERNAME") or env.get("JIRA_USER") or "")
+    token = env.get("JIRA_API_TOKEN") or env.get("ATLASSIAN_API_TOKEN") or env.get("JIRA_TOKEN") or ""
+    return base, email, token
+
+
+def sprint_jql(projects, sprint=None):
+    """JQL filter for a named sprint (or the open sprints) of one or more projects."""
+    projects = [p for p in projects.split(",") if p] if isinstance(projects, str) else list(projects)
+    clause = f"project in ({','.join(projects)})" if len(projects) > 1 else f"project = {projects[0]}"
+    if sprint:
+        return f'sprint = "{sprint}" AND {clause}'
+    return f"sprint in openSprints() AND {clause}"
+
+
+def chunked(items, size):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class JiraClient:
+    def __init__(self, base_url, email, token, concurrency=10, timeout=15, max_retries=4, cache=None):
+        auth = base64.b64encode(f"{email}:{token}".encode()).decode()
+        self.concurrency = max(1, concurrency)
+        self.http = HttpClient(
+            base_url,
+            headers={"Authorization": f"Basic {auth}", "Accept": "application/json"},
+            timeout=timeout,
+            pool_size=self.concurrency,
+            max_retries=max_retries,
+            cache=cache,
+        )
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Build a client from the env credentials; attaches the response cache if HUMAND_CACHE=1."""
+        base, email, token = jira_settings()
+        kwargs.setdefault("cache", cache_from_env())
+        return cls(base, email, token, **kwargs)
+
+    def close(self):
+        self.http.close()
+        if self.http.cache is not None:
+            self.http.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def search_page(self, jql, fields, start_at=0, max_results=PAGE_SIZE, expand=None):
+        params = {
+            "jql": jql,
+            "fields": fields,
+            "startAt": start_at,
+            "maxResults": max_results,
+            "validateQuery": "warn",
+        }
+        if expand:
+            params["expand"] = expand
+        return self.http.get_json("/rest/api/3/search", params=params)
+
+    def search(self, jql, fields, page_size=PAGE_SIZE, expand=None):
+        """Yield every issue matching jql, following startAt pagination."""
+        start_at = 0
+        while True:
+            data = self.search_page(jql, fields, start_at, page_size, expand)
+            issues = data.get("issues", [])
+            yield from issues
+            start_at += len(issues)
+            if not issues or start_at >= data.get("total", 0):
+                return
+
+    def search_parallel(self, jql, fields, page_size=PAGE_SIZE):
+        """Yield every issue matching jql, fetching pages after the first concurrently.
+
+        The first page reports `total`; the remaining startAt offsets are fetched
+        over the shared connection pool with at most `concurrency` pages in flight,
+        and yielded in order. Only that window of pages is held in memory.
+        Issues that shift between pages while paging are de-duplicated by key.
+        """
+        first = self.search_page(jql, fields, 0, page_size)
+        issues = first.get("issues", [])
+        total = first.get("total", 0)
+        step = len(issues) or page_size  # Jira may cap maxResults below page_size
+        seen = set()
+
+        def fresh(page):
+            for issue in page:
+                if issue["key"] not in seen:
+                    seen.add(issue["key"])
+                    yield issue
+
+        yield from fresh(issues)
+        if not issues or total <= step:
+            return
+
+        offsets = iter(range(step, total, step))
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            window = deque()
+            for start_at in offsets:
+                window.append(pool.submit(self.search_page, jql, fields, start_at, step))
+                if len(window) >= self.concurrency:
+                    break
+            while window:
+                page = window.popleft().result().get("issues", [])
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    window.append(pool.submit(self.search_page, jql, fields, next_offset, step))
+                yield from fresh(page)
+
+    def issue_ids(self, keys):
+        """Resolve ticket keys → numeric issue ids via chunked `key in (...)` searches."""
+        key_to_id = {}
+        for chunk in chunked(sorted(set(keys)), KEY_CHUNK):
+            jql = f"key in ({','.join(chunk)})"
+            for issue in self.search(jql, "key"):
+                key_to_id[issue["key"]] = issue["id"]
+        return key_to_id
+
+    def dev_status(self, issue_id, data_type="pullrequest"):
+        return self.http.get_json("/rest/dev-status/latest/issue/detail", params={
+            "issueId": issue_id,
+            "applicationType": "GitHub",
+            "dataType": data_type,
+        })
+
+    def changelog_page(self, key, start_at=0, max_results=PAGE_SIZE):
+        """One page of an issue's change history, oldest first."""
+        return self.http.get_json(f"/rest/api/3/issue/{key}/changelog", params={
+            "startAt": start_at,
+            "maxResults": max_results,
+        })
+
+    def statuses(self):
+        """Every workflow status → {name: status category name}."""
+        return {s["name"]: (s.get("statusCategory") or {}).get("name", "")
+                for s in self.http.get_json("/rest/api/3/status") or []}
+
+    def map(self, fn, items):
+        """Run fn over items with at most `concurrency` requests in flight."""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(fn, items))
+
+
+def dev_items(payload):
+    """Flatten a dev-status detail payload → [{type, repo, name, url, state}]."""
+    items = []
+    for detail in (payload or {}).get("detail", []):
+        for pr in detail.get("pullRequests", []):
+            items.append({
+                "type": "pullrequest",
+                "repo": pr.get("source", {}).get("url", "").split("/")[-1] if pr.get("source") else "",
+                "name": pr.get("name", ""),
+                "url": pr.get("url", ""),
+                "state": pr.get("status", ""),
+            })
+        for branch in detail.get("branches", []):
+            items.append({
+                "type": "branch",
+                "repo": branch.get("repository", {}).get("name", ""),
+                "name": branch.get("name", ""),
+                "url": branch.get("url", ""),
+                "state": "open",
+            })
+    return items
@@ -0,0 +1,114 @@
+"""Incremental JSON writers and streaming readers shared by the scripts."""
+
+import json
+
+
+def write_json_array(items, out):
+    """Stream items as a JSON array, byte-identical to json.dump(list(items), out, indent=2)."""
+    count = 0
+    for item in items:
+        out.write("[\n  " if count == 0 else ",\n  ")
+        out.write(json.dumps(item, indent=2).replace("\n", "\n  "))
+        count += 1
+    out.write("\n]" if count else "[]")
+    return count
+
+
+def write_ndjson(items, out):
+    """Stream items as newline-delimited JSON (one compact object per line)."""
+    count = 0
+    for item in items:
+        out.write(json.dumps(item, separators=(",", ":")))
+        out.write("\n")
+        count += 1
+    return count
+
+
+CHUNK_SIZE = 1 << 16
+
+
+class _Stream:
+    """Buffered text reader for decoding consecutive JSON values with raw_decode."""
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self, skip=""):
+        """Skip whitespace (and any chars in `skip`) → next char, or "" at EOF."""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and (buf[pos].isspace() or buf[pos] in skip):
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, got {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value, reading more input until it is complete."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self._fill():
+                    raise
+                continue
+            # A number (or literal) ending exactly at the buffer edge may continue in the next chunk.
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            if self.pos > self.chunk_size:
+                self.buf, self.pos = self.buf[self.pos:], 0
+            return obj
+
+
+def iter_json(fp, chunk_size=CHUNK_SIZE):
+    """Yield the items of a JSON array, or the values of an NDJSON stream, one at a time.
+
+    Only the current item and one input chunk are held in memory, so callers can
+    compact each item before the next one is decoded.
+    """
+    stream = _Stream(fp, chunk_size)
+    first = stream.peek()
+    if first == "[":
+        stream.pos += 1
+        while stream.peek(skip=",") != "]":
+            if stream.peek() == "":
+                raise ValueError("Unterminated JSON array")
+            yield stream.value()
+        return
+    while stream.peek() != "":
+        yield stream.value()
+
+
+def iter_json_object(fp, chunk_size=CHUNK_SIZE):
+    """Yield (key, value) pairs of a top-level JSON object one member at a time."""
+    stream = _Stream(fp, chunk_size)
+    stream.expect("{")
+    while stream.peek(skip=",") != "}":
+        if stream.peek() == "":
+            raise ValueError("Unterminated JSON object")
+        key = stream.value()
+        stream.expect(":")
+        yield key, stream.value()
@@ -0,0 +1,18 @@
+"""Ticket-key extraction shared by the report generator and the PR fetchers."""
+
+import re
+
+TICKET_KEY_RE = re.compile(r"[A-Z]+-\d+")
+
+
+def extract_ticket_keys(*texts):
+    """Return the set of exact ticket keys (e.g. SQSH-123) mentioned in texts.
+
+    Matching is case-insensitive on the input (branch names are usually
+    lowercase) and exact on the key, so SQSH-12 never matches SQSH-123.
+    """
+    keys = set()
+    for text in texts:
+        if text:
+            keys.update(TICKET_KEY_RE.findall(text.upper()))
+    return keys
@@ -0,0 +1,330 @@
+"""Historical sprint metrics: every generated report stored per (project, sprint, ticket).
+
+generate-sprint-report.py and sprint-report.py record each sprint they render
+(single team or --all-teams / --split-by-project) into a SQLite store: one row
+per ticket with its category, points, assignee, team and code state, plus the
+sprint's per-repo PR counts and its totals (computed once, when it is recorded).
+Re-rendering a sprint replaces its rows, so the
+store holds the latest state of every sprint. Cross-sprint questions are then
+indexed local queries instead of re-fetching Jira or parsing old reports:
+
+    velocity     tickets / points committed and shipped per sprint
+    carry-over   tickets that appeared in more than one sprint of a project
+    throughput   merged PRs linked to each sprint's tickets, per repo
+
+Categories are stored by key (shipped, in_review, in_progress, blocked,
+not_started); repo counts are those of the report's "Desglose por Repo".
+
+Environment:
+    HUMAND_METRICS_DB  store path (default: $HUMAND_CACHE_DIR/metrics.sqlite3; see hulib/cache.py)
+    HUMAND_METRICS=0   do not record generated sprints
+
+CLI:
+    python3 -m hulib.metrics velocity   [--project KEY[,KEY...]] [--last N] [--format markdown|csv|json]
+    python3 -m hulib.metrics carry-over [--project KEY[,KEY...]] [--last N] [--min-sprints N] [--format ...]
+    python3 -m hulib.metrics throughput [--project KEY[,KEY...]] [--last N] [--format ...]
+    python3 -m hulib.metrics sprints    [--project KEY[,KEY...]]
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from .cache import cache_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sprints (
+    project     TEXT NOT NULL,
+    sprint      TEXT NOT NULL,
+    start       TEXT NOT NULL,
+    end         TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    total       INTEGER NOT NULL,
+    shipped     INTEGER NOT NULL,
+    points      REAL NOT NULL,
+    shipped_points REAL NOT NULL,
+    PRIMARY KEY (project, sprint)
+);
+CREATE INDEX IF NOT EXISTS sprints_start ON sprints (project, start);
+CREATE TABLE IF NOT EXISTS tickets (
+    project     TEXT NOT NULL,
+    sprint      TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    summary     TEXT NOT NULL,
+    type        TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    priority    TEXT NOT NULL,
+    assignee    TEXT NOT NULL,
+    team        TEXT NOT NULL,
+    points      REAL,
+    code        TEXT NOT NULL,
+    merged_prs  INTEGER NOT NULL,
+    open_prs    INTEGER NOT NULL,
+    draft_prs   INTEGER NOT NULL,
+    PRIMARY KEY (project, sprint, key)
+);
+CREATE INDEX IF NOT EXISTS tickets_key ON tickets (project, key, sprint);
+CREATE TABLE IF NOT EXISTS repo_stats (
+    project     TEXT NOT NULL,
+    sprint      TEXT NOT NULL,
+    repo        TEXT NOT NULL,
+    merged      INTEGER NOT NULL,
+    open        INTEGER NOT NULL,
+    wip         INTEGER NOT NULL,
+    PRIMARY KEY (project, sprint, repo)
+);
+"""
+
+TICKET_COLUMNS = ("key", "summary", "type", "status", "category", "priority", "assignee", "team", "points",
+                  "code", "merged_prs", "open_prs", "draft_prs")
+
+
+def metrics_db(env=None):
+    env = os.environ if env is None else env
+    return env.get("HUMAND_METRICS_DB") or os.path.join(cache_dir(env), "metrics.sqlite3")
+
+
+def metrics_db_from_env(env=None):
+    """Store path reports are recorded into, or None when HUMAND_METRICS=0."""
+    env = os.environ if env is None else env
+    return None if env.get("HUMAND_METRICS") == "0" else metrics_db(env)
+
+
+class MetricsStore:
+    """Sprints, their tickets and per-repo PR counts, keyed by (project, sprint)."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, project, sprint, start, end, tickets, repo_stats):
+        """Replace the sprint's rows with tickets (dicts with TICKET_COLUMNS) and repo_stats."""
+        sprint_id = (project, sprint)
+        shipped = [t for t in tickets if t["category"] == "shipped"]
+        totals = (len(tickets), len(shipped), sum(t["points"] or 0 for t in tickets),
+                  sum(t["points"] or 0 for t in shipped))
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            for table in ("tickets", "repo_stats"):
+                self._db.execute(f"DELETE FROM {table} WHERE project = ? AND sprint = ?", sprint_id)
+            self._db.execute("INSERT OR REPLACE INTO sprints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             (*sprint_id, start or "unknown", end or "unknown", time.time(), *totals))
+            self._db.executemany(
+                f"INSERT INTO tickets VALUES (?, ?, {', '.join('?' * len(TICKET_COLUMNS))})",
+                [(*sprint_id, *(t[c] for c in TICKET_COLUMNS)) for t in tickets],
+            )
+            self._db.executemany(
+                "INSERT INTO repo_stats VALUES (?, ?, ?, ?, ?, ?)",
+                [(*sprint_id, repo, s["merged"], s["open"], s["wip"]) for repo, s in sorted(repo_stats.items())],
+            )
+
+    def sprints(self, projects=None, last=None, columns="project, sprint, start, end"):
+        """Sprint rows (project first), oldest first; last keeps each project's N most recent."""
+        where, params = _project_filter(projects)
+        rows = self._db.execute(
+            f"SELECT {columns} FROM sprints {where} ORDER BY project, start, sprint", params
+        ).fetchall()
+        if last:
+            by_project = {}
+            for row in rows:
+                by_project.setdefault(row[0], []).append(row)
+            rows = [row for project_rows in by_project.values() for row in project_rows[-last:]]
+        return rows
+
+    def ticket_statuses(self, project, sprint):
+        """→ [(key, Jira status)] of the sprint's tickets as last recorded."""
+        return self._db.execute("SELECT key, status FROM tickets WHERE project = ? AND sprint = ? ORDER BY key",
+                                (project, sprint)).fetchall()
+
+    def velocity(self, projects=None, last=None):
+        """Tickets and points committed / shipped per selected sprint (the totals stored with it)."""
+        rows = []
+        for project, sprint, start, end, total, shipped, points, shipped_points in self.sprints(
+                projects, last, "project, sprint, start, end, total, shipped, points, shipped_points"):
+            rows.append({"project": project, "sprint": sprint, "start": start, "end": end,
+                         "total": total, "shipped": shipped,
+                         "points": _number(points), "shipped_points": _number(shipped_points),
+                         "delivery_pct": round(shipped / total * 100) if total else 0})
+        return rows
+
+    def carry_over(self, projects=None, last=None, min_sprints=2):
+        """Tickets in at least min_sprints of the selected sprints, with where they were and where they ended."""
+        selected = self.sprints(projects, last)
+        self._db.execute("CREATE TEMP TABLE IF NOT EXISTS selected "
+                         "(project TEXT, sprint TEXT, ord INTEGER, PRIMARY KEY (project, sprint))")
+        self._db.execute("DELETE FROM selected")
+        self._db.executemany("INSERT INTO selected VALUES (?, ?, ?)",
+                             [(project, sprint, i) for i, (project, sprint, _, _) in enumerate(selected)])
+        history = {}
+        for project, key, _, sprint, summary, category, points, assignee in self._db.execute(
+                "WITH carried AS (SELECT t.project, t.key FROM tickets t JOIN selected s USING (project, sprint) "
+                "                 GROUP BY t.project, t.key HAVING COUNT(*) >= ?) "
+                "SELECT t.project, t.key, s.ord, t.sprint, t.summary, t.category, t.points, t.assignee "
+                "FROM carried c JOIN tickets t USING (project, key) JOIN selected s USING (project, sprint) "
+                "ORDER BY t.project, t.key, s.ord", (min_sprints,)):
+            history.setdefault((project, key), []).append((sprint, summary, category, points, assignee))
+        rows = []
+        for (project, key), entries in history.items():
+            last_sprint, summary, category, points, assignee = entries[-1]
+            rows.append({"project": project, "key": key, "summary": summary, "sprints": len(entries),
+                         "sprint_names": [e[0] for e in entries], "last_sprint": last_sprint,
+                         "last_category": category, "points": _number(points), "assignee": assignee})
+        rows.sort(key=lambda r: (r["project"], -r["sprints"], _key_order(r["key"])))
+        return rows
+
+    def throughput(self, projects=None, last=None):
+        """Per-repo merged / open / WIP counts for each selected sprint."""
+        selected = self.sprints(projects, last)
+        stats = {}
+        where, params = _project_filter(projects)
+        for project, sprint, repo, merged, open_, wip in self._db.execute(
+                f"SELECT project, sprint, repo, merged, open, wip FROM repo_stats {where}", params):
+            stats.setdefault((project, sprint), {})[repo] = {"merged": merged, "open": open_, "wip": wip}
+        return [{"project": project, "sprint": sprint, "start": start, "end": end,
+                 "repos": stats.get((project, sprint), {})}
+                for project, sprint, start, end in selected]
+
+
+def _project_filter(projects):
+    if not projects:
+        return "", ()
+    return f"WHERE project IN ({','.join('?' * len(projects))})", tuple(projects)
+
+
+def _number(value):
+    """Points as stored (REAL) → int when whole, for display."""
+    if value is None:
+        return None
+    return int(value) if float(value).is_integer() else value
+
+
+def _key_order(key):
+    project, _, number = key.partition("-")
+    return project, int(number) if number.isdigit() else 0
+
+
+def record_sprint(path, project, sprint, start, end, tickets, repo_stats):
+    """Record one rendered sprint into the store at path; a failure only warns (the report is already out)."""
+    try:
+        with MetricsStore(path) as store:
+            store.record(project, sprint, start, end, tickets, repo_stats)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: sprint metrics not recorded in {path}: {e}", file=sys.stderr)
+
+
+def repo_columns(rows):
+    """Repos that appear in throughput rows, in first-seen order."""
+    return list(dict.fromkeys(repo for row in rows for repo in row["repos"]))
+
+
+def render_table(headers, rows):
+    lines = ["| " + " | ".join(headers) + " |", "|" + "|".join("-" * (len(h) + 2) for h in headers) + "|"]
+    lines += ["| " + " | ".join("—" if v is None else str(v).replace("|", "\\|") for v in row) + " |" for row in rows]
+    return "\n".join(lines) + "\n"
+
+
+def format_velocity(rows):
+    table = render_table(
+        ["Proyecto", "Sprint", "Fechas", "Tickets", "✅", "Entrega", "Puntos", "Puntos ✅"],
+        [(r["project"], r["sprint"], f"{r['start']} — {r['end']}", r["total"], r["shipped"],
+          f"{r['delivery_pct']}%", r["points"], r["shipped_points"]) for r in rows],
+    )
+    return "## Velocidad\n\n" + table
+
+
+def format_carry_over(rows):
+    table = render_table(
+        ["Proyecto", "Ticket", "Resumen", "Sprints", "Último estado", "Puntos", "Asignado"],
+        [(r["project"], r["key"], r["summary"], f"{r['sprints']} ({', '.join(r['sprint_names'])})",
+          f"{r['last_category']} ({r['last_sprint']})", r["points"], r["assignee"]) for r in rows],
+    )
+    return "## Arrastre entre sprints\n\n" + table
+
+
+def format_throughput(rows):
+    repos = repo_columns(rows)
+    table = render_table(
+        ["Proyecto", "Sprint"] + [repo.replace("humand-", "") for repo in repos] + ["Total"],
+        [(r["project"], r["sprint"], *(r["repos"].get(repo, {}).get("merged", 0) for repo in repos),
+          sum(s["merged"] for s in r["repos"].values())) for r in rows],
+    )
+    return "## PRs mergeados por repo\n\n" + table
+
+
+FORMATTERS = {"velocity": format_velocity, "carry-over": format_carry_over, "throughput": format_throughput}
+
+
+def flat_rows(command, rows):
+    """Query rows → flat dicts for CSV."""
+    if command == "carry-over":
+        return [dict(r, sprint_names=", ".join(r["sprint_names"])) for r in rows]
+    if command == "throughput":
+        repos = repo_columns(rows)
+        return [dict({k: r[k] for k in ("project", "sprint", "start", "end")},
+                     **{repo: r["repos"].get(repo, {}).get("merged", 0) for repo in repos}) for r in rows]
+    return rows
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m hulib.metrics", description="Cross-sprint metrics")
+    parser.add_argument("command", choices=["velocity", "carry-over", "throughput", "sprints"])
+    parser.add_argument("--project", default=None, help="Comma-separated project keys (default: all)")
+    parser.add_argument("--last", type=int, default=None, help="Only each project's N most recent sprints")
+    parser.add_argument("--min-sprints", type=int, default=2, help="carry-over: minimum sprints per ticket")
+    parser.add_argument("--format", default="markdown", choices=["markdown", "csv", "json"])
+    parser.add_argument("--db", default=None, help="Store path (default: $HUMAND_METRICS_DB or the cache dir)")
+    args = parser.parse_args(argv)
+
+    path = args.db or metrics_db()
+    if not os.path.exists(path):
+        print(f"Error: no metrics store at {path}; generate a report first", file=sys.stderr)
+        return 1
+    projects = [p.strip() for p in args.project.split(",") if p.strip()] if args.project else None
+
+    with MetricsStore(path) as store:
+        if args.command == "sprints":
+            for project, sprint, start, end in store.sprints(projects, args.last):
+                print(f"{project}\t{sprint}\t{start}\t{end}")
+            return 0
+        if args.command == "velocity":
+            rows = store.velocity(projects, args.last)
+        elif args.command == "carry-over":
+            rows = store.carry_over(projects, args.last, args.min_sprints)
+        else:
+            rows = store.throughput(projects, args.last)
+
+    if args.format == "json":
+        json.dump(rows, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    elif args.format == "csv":
+        flat = flat_rows(args.command, rows)
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=list(flat[0].keys()) if flat else ["project"])
+        writer.writeheader()
+        writer.writerows(flat)
+        sys.stdout.write(out.getvalue())
+    else:
+        sys.stdout.write(FORMATTERS[args.command](rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,246 @@
+"""Local PR ↔ ticket index (SQLite), kept current from a per-repo watermark.
+
+The GitHub fallback search (hulib/github.py) full-text searches every run for
+keys it has already seen. The index instead lists each repo's PRs ordered by
+`updatedAt` (`repository { pullRequests(orderBy: UPDATED_AT DESC) }`, one alias
+per repo in one GraphQL request) and stores every PR whose title or head branch
+mentions a ticket key (hulib/keys.py), with one row per key it mentions. The
+first sync pages through every PR; later syncs stop at the first page that
+reaches the repo's watermark (the newest `updatedAt` already stored), usually
+after a single request. A lookup is then a local query:
+
+    {repo, number, title, state, url, isDraft, headRefName, mergedAt}
+
+per PR, ordered by (repo, number): the shape search-prs-for-keys.sh prints.
+Keys are matched exactly on the title and branch, as the snapshot merge
+(hulib/snapshot.py) does.
+
+A repo's watermark only moves once its listing reached it, so an interrupted
+sync is resumed from the top the next time. Requests go through
+`gh api graphql` uncached (the index is the cache); HUMAND_TRACE applies. The
+`sync` command runs at background priority (hulib/ratelimit.py), so reports
+running at the same time get the GitHub budget first; a lookup's sync does not.
+
+File: $HUMAND_CACHE_DIR/pr-index.sqlite3 (see hulib/cache.py).
+
+CLI:
+    python3 -m hulib.prindex sync [<repo>...]                  # bring the index up to date
+    python3 -m hulib.prindex lookup [--no-sync] <repo>... -- <KEY>...   # JSON on stdout
+    python3 -m hulib.prindex stats
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from . import ratelimit, trace
+from .branches import REPOS
+from .cache import cache_dir
+from .github import ORG, PAGE_SIZE, RATE_LIMIT_FIELDS, GitHubError, graphql
+from .jira import chunked
+from .keys import extract_ticket_keys
+
+PR_INDEX_FIELDS = "number title url state isDraft headRefName mergedAt updatedAt"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prs (
+    repo        TEXT NOT NULL,
+    number      INTEGER NOT NULL,
+    title       TEXT NOT NULL,
+    url         TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    is_draft    INTEGER NOT NULL,
+    head_ref    TEXT NOT NULL,
+    merged_at   TEXT,
+    updated_at  TEXT NOT NULL,
+    PRIMARY KEY (repo, number)
+);
+CREATE TABLE IF NOT EXISTS pr_keys (
+    key         TEXT NOT NULL,
+    repo        TEXT NOT NULL,
+    number      INTEGER NOT NULL,
+    PRIMARY KEY (key, repo, number)
+);
+CREATE INDEX IF NOT EXISTS pr_keys_pr ON pr_keys (repo, number);
+CREATE TABLE IF NOT EXISTS watermarks (
+    repo        TEXT PRIMARY KEY,
+    updated_at  TEXT NOT NULL,
+    synced_at   REAL NOT NULL
+);
+"""
+
+
+def pr_index_path(env=None):
+    return os.path.join(cache_dir(env), "pr-index.sqlite3")
+
+
+class PrIndex:
+    """PRs by ticket key, with the `updatedAt` watermark each repo was synced to."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def watermark(self, repo):
+        """Newest `updatedAt` stored for repo, or None if it was never fully synced."""
+        row = self._db.execute("SELECT updated_at FROM watermarks WHERE repo = ?", (repo,)).fetchone()
+        return row[0] if row else None
+
+    def upsert(self, repo, nodes):
+        """Store PR nodes of repo; PRs that no longer mention a key are dropped."""
+        with self._db:
+            self._db.execute("BEGIN")
+            for node in nodes:
+                pr = (repo, node["number"])
+                self._db.execute("DELETE FROM pr_keys WHERE repo = ? AND number = ?", pr)
+                keys = extract_ticket_keys(node.get("title", ""), node.get("headRefName", ""))
+                if not keys:
+                    self._db.execute("DELETE FROM prs WHERE repo = ? AND number = ?", pr)
+                    continue
+                self._db.execute(
+                    "INSERT OR REPLACE INTO prs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*pr, node.get("title") or "", node.get("url") or "", node.get("state") or "",
+                     int(bool(node.get("isDraft"))), node.get("headRefName") or "", node.get("mergedAt"),
+                     node["updatedAt"]),
+                )
+                self._db.executemany("INSERT INTO pr_keys VALUES (?, ?, ?)", [(k, *pr) for k in sorted(keys)])
+
+    def set_watermark(self, repo, updated_at):
+        self._db.execute("INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?)", (repo, updated_at, time.time()))
+
+    def lookup(self, keys, repos=REPOS):
+        """PRs of repos mentioning any of keys → PR dicts ordered by (repo, number)."""
+        repos = list(repos)
+        found = {}
+        for chunk in chunked(sorted(set(keys)), 500):
+            rows = self._db.execute(
+                f"SELECT DISTINCT p.repo, p.number, p.title, p.state, p.url, p.is_draft, p.head_ref, p.merged_at "
+                f"FROM pr_keys k JOIN prs p ON p.repo = k.repo AND p.number = k.number "
+                f"WHERE k.key IN ({','.join('?' * len(chunk))}) AND p.repo IN ({','.join('?' * len(repos))})",
+                (*chunk, *repos),
+            )
+            for repo, number, title, state, url, is_draft, head_ref, merged_at in rows:
+                found[(repo, number)] = {"number": number, "title": title, "state": state, "url": url,
+                                         "isDraft": bool(is_draft), "headRefName": head_ref,
+                                         "mergedAt": merged_at, "repo": repo}
+        return [found[k] for k in sorted(found)]
+
+    def stats(self):
+        """→ {repo: (indexed PRs, watermark, synced_at)}."""
+        counts = dict(self._db.execute("SELECT repo, COUNT(*) FROM prs GROUP BY repo"))
+        marks = {repo: (updated_at, synced_at) for repo, updated_at, synced_at
+                 in self._db.execute("SELECT repo, updated_at, synced_at FROM watermarks")}
+        return {repo: (counts.get(repo, 0), *marks.get(repo, (None, None)))
+                for repo in sorted(set(counts) | set(marks))}
+
+
+def build_request(pages, org=ORG, page_size=PAGE_SIZE):
+    """One GraphQL document with an aliased `repository { pullRequests }` per (alias, repo, cursor)."""
+    parts = []
+    for alias, repo, cursor in pages:
+        after = f", after: {json.dumps(cursor)}" if cursor else ""
+        parts.append(
+            f"  {alias}: repository(owner: {json.dumps(org)}, name: {json.dumps(repo)}) {{\n"
+            f"    pullRequests(first: {page_size}{after}, orderBy: {{field: UPDATED_AT, direction: DESC}}) {{\n"
+            f"      pageInfo {{ hasNextPage endCursor }}\n"
+            f"      nodes {{ {PR_INDEX_FIELDS} }}\n"
+            f"    }}\n"
+            f"  }}"
+        )
+    parts.append(f"  {RATE_LIMIT_FIELDS}")
+    return "query {\n" + "\n".join(parts) + "\n}"
+
+
+def sync(index, repos=REPOS):
+    """List each repo's PRs updated since its watermark into index → {repo: PRs listed}."""
+    repos = list(repos)
+    marks = {repo: index.watermark(repo) for repo in repos}
+    newest = dict(marks)
+    listed = dict.fromkeys(repos, 0)
+    pending = [(f"r{i}", repo, None) for i, repo in enumerate(repos)]
+    while pending:
+        data = graphql(build_request(pending), name="graphql PR index")
+        next_pending = []
+        for alias, repo, _ in pending:
+            result = ((data.get(alias) or {}).get("pullRequests")) or {}
+            nodes = [n for n in result.get("nodes") or [] if n and n.get("number")]
+            fresh = [n for n in nodes if marks[repo] is None or n["updatedAt"] >= marks[repo]]
+            index.upsert(repo, fresh)
+            listed[repo] += len(fresh)
+            if fresh and (newest[repo] is None or fresh[0]["updatedAt"] > newest[repo]):
+                newest[repo] = fresh[0]["updatedAt"]
+            page_info = result.get("pageInfo") or {}
+            if page_info.get("hasNextPage") and len(fresh) == len(nodes):
+                next_pending.append((alias, repo, page_info.get("endCursor")))
+            elif newest[repo] is not None:
+                index.set_watermark(repo, newest[repo])
+        pending = next_pending
+    return listed
+
+
+def lookup_prs(keys, repos=REPOS, refresh=True, env=None):
+    """PRs mentioning keys from the local index, synced first unless refresh is False.
+
+    A failed sync falls back to what the index already holds (with a warning);
+    GitHubError propagates only if a repo was never synced.
+    """
+    with PrIndex(pr_index_path(env)) as index:
+        if refresh:
+            try:
+                with trace.span("sync PR index", repos=len(repos)) as info:
+                    info["prs"] = sum(sync(index, repos).values())
+            except GitHubError as e:
+                if any(index.watermark(repo) is None for repo in repos):
+                    raise
+                print(f"Warning: {e}; using the PR index as of its last sync", file=sys.stderr)
+        with trace.span("lookup PR index", keys=len(keys)) as info:
+            prs = index.lookup(keys, repos)
+            info["prs"] = len(prs)
+    return prs
+
+
+def main(argv):
+    usage = __doc__.split("CLI:")[1]
+    command, args = (argv[0], argv[1:]) if argv else ("", [])
+    try:
+        if command == "sync":
+            ratelimit.set_priority(ratelimit.BACKGROUND)
+            with PrIndex(pr_index_path()) as index, trace.span("sync PR index"):
+                listed = sync(index, args or REPOS)
+            for repo, count in listed.items():
+                print(f"{repo}: {count} PRs listed", file=sys.stderr)
+        elif command == "lookup" and "--" in args:
+            refresh = args[:1] != ["--no-sync"]
+            args = args[0 if refresh else 1:]
+            sep = args.index("--")
+            json.dump(lookup_prs(args[sep + 1:], args[:sep] or REPOS, refresh=refresh), sys.stdout, indent=2)
+        elif command == "stats" and not args:
+            with PrIndex(pr_index_path()) as index:
+                for repo, (count, updated_at, synced_at) in index.stats().items():
+                    synced = time.strftime("%Y-%m-%d %H:%M", time.localtime(synced_at)) if synced_at else "never"
+                    print(f"{repo:<20} {count:>6} PRs  watermark {updated_at or '—'}  synced {synced}")
+        else:
+            print(usage, file=sys.stderr)
+            return 1
+    except GitHubError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 3
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,369 @@
+"""Delta-aware export of the sprint report: Jira ticket comments and a Confluence page.
+
+"post to jira" used to add a comment to every ticket with code activity and
+"post to confluence" to rewrite the whole page on every publish. Here each
+published item is stored with a content hash, and a publish only sends what
+changed since the last one:
+
+  - Jira: one report comment per ticket and sprint (category, status, points,
+    code). The first publish adds it; later ones edit that same comment, and
+    only for tickets whose line changed. Jira has no bulk comment endpoint, so
+    the edits are sent over the pooled client at most --publish-concurrency at
+    a time.
+  - Confluence: the report is hashed per `## ` section (without the lines
+    that only depend on today's date, see VOLATILE_LINE). The page is created
+    once, then updated in one request only when a section changed; the
+    version message names those sections.
+
+Hashes cover the content only, never the publish date, so an unchanged ticket
+costs nothing on a daily republish. A dry run prints the planned calls and
+records nothing. A failed call is reported and left unrecorded, so the next
+publish retries it. Comment and page creations (POST) are not retried within a
+publish on timeouts or 5xx (hulib/client.py): a lost response must not turn
+into a duplicate comment or page.
+
+File: $HUMAND_CACHE_DIR/publish.sqlite3 (see hulib/cache.py).
+
+CLI:
+    python3 -m hulib.publish stats                 # published items per channel and scope
+    python3 -m hulib.publish forget <scope>        # republish everything of scope next time
+"""
+
+import hashlib
+import html
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
+
+from .cache import cache_dir
+from .client import HttpError
+
+JIRA = "jira"
+CONFLUENCE = "confluence"
+
+# Tickets without code activity get no new comment ("post to jira" covers code activity only). One that
+# already has a report comment, e.g. its PR was unlinked, still gets it edited to the current line.
+NO_ACTIVITY = {"—", "No code (Jira done)"}
+
+DEFAULT_CONCURRENCY = 4
+
+# Report lines derived from the date alone: **Generado:**, the sprint's elapsed-time progress and the
+# "Sprint is N% elapsed" observation. They change every day with nothing new to read, so hashing them
+# would republish the page daily; they are left out of the hashes and go out, current, with the next
+# publish that has a real change.
+VOLATILE_LINE = re.compile(r"\*\*Generado:\*\*|\*\*Progreso del sprint: \d+%|- Sprint is \d+% elapsed ")
+
+# Confluence items: the page itself, and the report header (the text before the first `## `).
+PAGE_ITEM = "#page"
+HEADER = "#header"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS published (
+    channel      TEXT NOT NULL,
+    scope        TEXT NOT NULL,
+    item         TEXT NOT NULL,
+    hash         TEXT NOT NULL,
+    remote_id    TEXT,
+    version      INTEGER,
+    published_at REAL NOT NULL,
+    PRIMARY KEY (channel, scope, item)
+);
+"""
+
+
+def publish_path(env=None):
+    return os.path.join(cache_dir(env), "publish.sqlite3")
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class PublishStore:
+    """What was last published per (channel, scope, item): content hash and remote id."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def items(self, channel, scope):
+        """→ {item: (hash, remote_id, version)}."""
+        rows = self._db.execute("SELECT item, hash, remote_id, version FROM published WHERE channel = ? AND scope = ?",
+                                (channel, scope))
+        return {item: (h, remote_id, version) for item, h, remote_id, version in rows}
+
+    def record(self, channel, scope, item, digest, remote_id=None, version=None):
+        self._db.execute("INSERT OR REPLACE INTO published VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (channel, scope, item, digest, remote_id, version, time.time()))
+
+    def record_many(self, channel, scope, entries):
+        """Replace scope's items with entries {item: (hash, remote_id, version)}."""
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM published WHERE channel = ? AND scope = ?", (channel, scope))
+            self._db.executemany("INSERT INTO published VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 [(channel, scope, item, *entry, time.time()) for item, entry in entries.items()])
+
+    def forget(self, scope):
+        return self._db.execute("DELETE FROM published WHERE scope = ?", (scope,)).rowcount
+
+    def stats(self):
+        """→ [(channel, scope, items, last published_at)]."""
+        return self._db.execute("SELECT channel, scope, COUNT(*), MAX(published_at) FROM published "
+                                "GROUP BY channel, scope ORDER BY channel, scope").fetchall()
+
+
+class Call:
+    """One planned API call: what it changes, and the hash to record once it succeeded."""
+
+    __slots__ = ("channel", "scope", "item", "method", "path", "body", "digest", "remote_id", "version", "note",
+                 "sections")
+
+    def __init__(self, channel, scope, item, method, path, body, digest, remote_id=None, version=None, note="",
+                 sections=None):
+        self.channel = channel
+        self.scope = scope
+        self.item = item
+        self.method = method
+        self.path = path
+        self.body = body
+        self.digest = digest
+        self.remote_id = remote_id
+        self.version = version
+        self.note = note
+        self.sections = sections  # Confluence: {section: hash} recorded with the page
+
+    def describe(self):
+        return f"{self.method:<4} {self.path}  ({self.note})"
+
+
+# Jira comments ---------------------------------------------------------------
+
+def comment_line(row):
+    """The comment content a ticket's hash covers."""
+    points = f" · {row['points']} pts" if row.get("points") is not None else ""
+    return f"{row['category']} ({row['status']}{points}) — Código: {row['code']}"
+
+
+def adf(paragraphs):
+    """Plain paragraphs → Atlassian Document Format (what REST v3 comment bodies take)."""
+    return {"type": "doc", "version": 1, "content": [
+        {"type": "paragraph", "content": [{"type": "text", "text": text}]} for text in paragraphs]}
+
+
+def plan_comments(store, scope, sprint_name, rows, today=None):
+    """Calls adding or editing the report comment of every ticket whose line changed.
+
+    Tickets without code activity are only planned when they already have a comment, to edit it.
+    """
+    today = today or date.today().isoformat()
+    published = store.items(JIRA, scope)
+    calls = []
+    for row in rows:
+        previous = published.get(row["key"])
+        if row["code"] in NO_ACTIVITY and not (previous and previous[1]):
+            continue
+        line = comment_line(row)
+        digest = content_hash(line)
+        if previous and previous[0] == digest:
+            continue
+        body = {"body": adf([f"Reporte de sprint {sprint_name} (actualizado {today})", line])}
+        if previous and previous[1]:
+            calls.append(Call(JIRA, scope, row["key"], "PUT", f"/rest/api/3/issue/{row['key']}/comment/{previous[1]}",
+                              body, digest, remote_id=previous[1], note="changed"))
+        else:
+            calls.append(Call(JIRA, scope, row["key"], "POST", f"/rest/api/3/issue/{row['key']}/comment",
+                              body, digest, note="new"))
+    return calls
+
+
+def send_comment(http, call):
+    """→ comment id. An edited comment that was deleted in Jira is posted again."""
+    path = call.path
+    if call.method == "PUT":
+        try:
+            return http.request("PUT", path, json_body=call.body).json()["id"]
+        except HttpError as e:
+            if e.status != 404:
+                raise
+        path = path.rsplit("/", 1)[0]
+    return http.request("POST", path, json_body=call.body, ok=(200, 201)).json()["id"]
+
+
+# Confluence page -------------------------------------------------------------
+
+def report_sections(markdown):
+    """Markdown report → {section title: text} split on `## ` headings (HEADER before the first)."""
+    sections = {}
+    title, lines = HEADER, []
+    for line in markdown.splitlines():
+        if line.startswith("## "):
+            sections[title] = "\n".join(lines)
+            title, lines = line[3:].strip(), []
+        elif not VOLATILE_LINE.match(line):
+            lines.append(line)
+    sections[title] = "\n".join(lines)
+    return sections
+
+
+def inline(text):
+    text = html.escape(text, quote=False)
+    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    return re.sub(r"`(.+?)`", r"<code>\1</code>", text)
+
+
+def storage_format(markdown):
+    """The report's markdown subset (headings, tables, lists, rules, bold, code) → Confluence storage XHTML."""
+    out, table, items = [], [], []
+
+    def flush():
+        if table:
+            head, *body = table
+            out.append("<table><tbody><tr>" + "".join(f"<th>{inline(c)}</th>" for c in head) + "</tr>"
+                       + "".join("<tr>" + "".join(f"<td>{inline(c)}</td>" for c in row) + "</tr>" for row in body)
+                       + "</tbody></table>")
+            table.clear()
+        if items:
+            out.append("<ul>" + "".join(f"<li>{inline(i)}</li>" for i in items) + "</ul>")
+            items.clear()
+
+    for line in markdown.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("|"):
+            cells = [c.strip() for c in stripped.strip("|").split("|")]
+            if not all(re.fullmatch(r":?-+:?", c) for c in cells):
+                table.append(cells)
+            continue
+        if stripped.startswith("- "):
+            items.append(stripped[2:])
+            continue
+        flush()
+        heading = re.match(r"(#{1,6}) (.*)", stripped)
+        if heading:
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{inline(heading.group(2))}</h{level}>")
+        elif stripped == "---":
+            out.append("<hr/>")
+        elif stripped:
+            out.append(f"<p>{inline(stripped)}</p>")
+    flush()
+    return "\n".join(out)
+
+
+def plan_page(store, space, parent, title, markdown):
+    """The call creating or updating the report page, or [] when no section changed."""
+    scope = f"{space}/{title}"
+    published = store.items(CONFLUENCE, scope)
+    sections = {name: content_hash(text) for name, text in report_sections(markdown).items()}
+    page = published.get(PAGE_ITEM, (None, None, None))
+    previous = {name: entry[0] for name, entry in published.items() if name != PAGE_ITEM}
+    changed = [name if name != HEADER else "encabezado" for name in sections if previous.get(name) != sections[name]]
+    removed = [name for name in previous if name not in sections]
+    if page[1] and not changed and not removed:
+        return []
+    body = {"type": "page", "title": title, "space": {"key": space},
+            "body": {"storage": {"value": storage_format(markdown), "representation": "storage"}}}
+    if parent:
+        body["ancestors"] = [{"id": str(parent)}]
+    digest = content_hash("\n".join(f"{name}\0{h}" for name, h in sections.items()))
+    return [Call(CONFLUENCE, scope, PAGE_ITEM, "PUT" if page[1] else "POST",
+                 f"/wiki/rest/api/content/{page[1]}" if page[1] else "/wiki/rest/api/content",
+                 body, digest, remote_id=page[1], version=page[2], sections=sections,
+                 note=f"{len(changed + removed)} sections changed: {', '.join(changed + removed)}"
+                 if page[1] else "new page")]
+
+
+def send_page(http, call):
+    """→ (page id, version). Finds an existing page by title first; a version conflict is retried once."""
+    body = dict(call.body)
+    page_id, version = call.remote_id, call.version
+    if page_id is None:
+        found = http.get_json("/wiki/rest/api/content", params={
+            "spaceKey": body["space"]["key"], "title": body["title"], "expand": "version"}).get("results") or []
+        if found:
+            page_id, version = found[0]["id"], found[0]["version"]["number"]
+    if page_id is None:
+        created = http.request("POST", "/wiki/rest/api/content", json_body=body, ok=(200, 201)).json()
+        return created["id"], created["version"]["number"]
+    for attempt in range(2):
+        body["version"] = {"number": (version or 0) + 1, "message": call.note}
+        try:
+            updated = http.request("PUT", f"/wiki/rest/api/content/{page_id}", json_body=body).json()
+            break
+        except HttpError as e:
+            if e.status != 409 or attempt:
+                raise
+            version = http.get_json(f"/wiki/rest/api/content/{page_id}", params={"expand": "version"})["version"]["number"]
+    return updated["id"], updated["version"]["number"]
+
+
+# Execution -------------------------------------------------------------------
+
+def execute(jira, store, calls, dry_run=False):
+    """Send calls over jira's pool (at most its concurrency at a time) → number of failed calls.
+
+    Each call is recorded in store as soon as it succeeded; nothing is sent or recorded with dry_run.
+    """
+    if dry_run:
+        for call in calls:
+            print(call.describe())
+        return 0
+
+    def send(call):
+        if call.channel == JIRA:
+            return send_comment(jira.http, call)
+        return send_page(jira.http, call)
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=jira.concurrency) as pool:
+        futures = {pool.submit(send, call): call for call in calls}
+        for future in as_completed(futures):
+            call = futures[future]
+            try:
+                result = future.result()
+            except HttpError as e:
+                print(f"Warning: {call.method} {call.path} failed: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            if call.channel == JIRA:
+                store.record(JIRA, call.scope, call.item, call.digest, str(result))
+            else:
+                page_id, version = result
+                entries = {name: (h, None, None) for name, h in call.sections.items()}
+                entries[PAGE_ITEM] = (call.digest, str(page_id), version)
+                store.record_many(CONFLUENCE, call.scope, entries)
+    return failed
+
+
+def main(argv):
+    usage = __doc__.split("CLI:")[1]
+    with PublishStore(publish_path()) as store:
+        if argv == ["stats"]:
+            for channel, scope, count, published_at in store.stats():
+                when = time.strftime("%Y-%m-%d %H:%M", time.localtime(published_at))
+                print(f"{channel:<11} {scope:<50} {count:>5} items  last {when}")
+        elif len(argv) == 2 and argv[0] == "forget":
+            print(f"{store.forget(argv[1])} items forgotten", file=sys.stderr)
+        else:
+            print(usage, file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,393 @@
+"""Shared rate-limit budget and request scheduler for the Jira and GitHub callers.
+
+Every outbound request asks the scheduler for a slot first: HttpClient (Jira)
+before each attempt, hulib/gh.py before each `gh` run. The state is one SQLite
+row per host under HUMAND_CACHE_DIR, so one budget is shared by every thread
+and every process of a run (the fetch scripts, their parallel `gh` jobs,
+team-staging-status.sh):
+
+- Token bucket: a host with a configured limit (HUMAND_RATE_LIMITS) gets
+  `rate` requests per second, in bursts of up to `burst`.
+- Adaptive: the budget a server reports is recorded after every response
+  (X-RateLimit-Remaining/-Limit/-Reset headers, GraphQL `rateLimit`), and
+  nobody sends once it is spent until it resets. A 429 or a `gh` rate-limit
+  error blocks the host for every caller until Retry-After (THROTTLE_WAIT
+  seconds without one) and halves its rate, which then recovers by
+  RECOVER_STEP of the configured rate per second.
+- Priority: interactive requests (reports; the default) go first. Background
+  ones (HUMAND_PRIORITY=background, `prindex sync`) leave BACKGROUND_SHARE of
+  the bucket and the last RESERVE_SHARE of the server's budget to interactive
+  callers, and hold off while an interactive request is waiting.
+- Coalescing: identical reads in flight in one process (GET URL + headers,
+  read-only `gh` argv) are sent once and every caller gets that result.
+  Across processes, HUMAND_CACHE=1 serves the repeats.
+
+Hosts without a configured limit (a local Jira stand-in, hulib/replay.py) are
+only held back by what they report. With HUMAND_TRACE set, every wait is
+recorded as a `wait` span (hulib/trace.py).
+
+Environment:
+    HUMAND_RATE_LIMIT   0 to send requests unscheduled
+    HUMAND_RATE_LIMITS  comma-separated host=rate[/burst]; host may be a glob
+                        (default: api.github.com=10/20,*.atlassian.net=10/20)
+    HUMAND_PRIORITY     interactive (default) or background
+
+File: $HUMAND_CACHE_DIR/ratelimit.sqlite3 (see hulib/cache.py).
+
+CLI:
+    python3 -m hulib.ratelimit status    # budget and state per host
+    python3 -m hulib.ratelimit reset     # forget recorded budgets and blocks
+"""
+
+import fnmatch
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
+from . import trace
+from .cache import cache_dir
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+GITHUB_HOST = "api.github.com"
+DEFAULT_LIMITS = "api.github.com=10/20,*.atlassian.net=10/20"
+
+# GitHub asks to wait at least a minute after a secondary rate limit without Retry-After.
+THROTTLE_WAIT = 60
+MAX_WAIT = 3600
+# Throttling halves a host's rate down to MIN_RATE_SHARE of the configured one.
+MIN_RATE_SHARE = 0.05
+RECOVER_STEP = 0.02
+BACKGROUND_SHARE = 0.25
+RESERVE_SHARE = 0.1
+# Background callers yield for this long after an interactive caller had to wait.
+INTERACTIVE_HOLD = 2.0
+POLL = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    host            TEXT PRIMARY KEY,
+    tokens          REAL NOT NULL,
+    rate            REAL NOT NULL,
+    refilled_at     REAL NOT NULL,
+    remaining       INTEGER,
+    quota           INTEGER,
+    reset_at        REAL,
+    blocked_until   REAL NOT NULL DEFAULT 0,
+    interactive_at  REAL NOT NULL DEFAULT 0,
+    throttled       INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def parse_limits(spec):
+    """"api.github.com=10/20,*.atlassian.net=5" → [(host glob, rate, burst)]."""
+    limits = []
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        host, _, value = item.partition("=")
+        rate, _, burst = value.partition("/")
+        try:
+            rate = float(rate)
+            burst = float(burst) if burst else max(1.0, rate)
+        except ValueError:
+            raise ValueError(f"not a host=rate[/burst] limit: {item!r}") from None
+        if rate <= 0 or burst < 1:
+            raise ValueError(f"rate must be > 0 and burst >= 1: {item!r}")
+        limits.append((host.strip().lower(), rate, burst))
+    return limits
+
+
+def reset_time(value, now=None):
+    """A reset header or GraphQL `resetAt` (epoch seconds, delta seconds or ISO 8601) → epoch, or None."""
+    if value in (None, ""):
+        return None
+    now = time.time() if now is None else now
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        try:
+            return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return seconds if seconds > 1e9 else now + seconds
+
+
+def header_int(headers, name):
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class Scheduler:
+    """Per-host token buckets and server budgets, shared through one SQLite file."""
+
+    def __init__(self, path, limits=(), priority=INTERACTIVE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.limits = list(limits)
+        self.priority = priority
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def limit_for(self, host):
+        """(rate, burst) of the first HUMAND_RATE_LIMITS pattern matching host, or None."""
+        host = (host or "").lower()
+        for pattern, rate, burst in self.limits:
+            if fnmatch.fnmatchcase(host, pattern):
+                return rate, burst
+        return None
+
+    def _load(self, host, now, limit):
+        row = self._db.execute(
+            "SELECT tokens, rate, refilled_at, remaining, quota, reset_at, blocked_until, interactive_at "
+            "FROM hosts WHERE host = ?", (host,)).fetchone()
+        if row is None:
+            rate, burst = limit or (0.0, 0.0)
+            self._db.execute("INSERT INTO hosts (host, tokens, rate, refilled_at) VALUES (?, ?, ?, ?)",
+                             (host, burst, rate, now))
+            return [burst, rate, now, None, None, None, 0.0, 0.0]
+        state = list(row)
+        if limit:
+            rate, burst = limit
+            current = min(state[1], rate) if state[1] > 0 else rate
+            state[0] = min(burst, state[0] + (now - state[2]) * current)
+            recovering = now - max(state[2], state[6])
+            state[1] = min(rate, current + rate * RECOVER_STEP * recovering) if recovering > 0 else current
+        if state[5] is not None and state[5] <= now:
+            state[3] = state[5] = None  # the server's window has reset
+        return state
+
+    def _reserve(self, quota):
+        return quota * RESERVE_SHARE if quota else 0
+
+    def _take(self, host, priority):
+        """Take a slot for one request → 0, or the seconds to wait before asking again."""
+        now = time.time()
+        limit = self.limit_for(host)
+        background = priority == BACKGROUND
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            tokens, rate, _, remaining, quota, reset_at, blocked_until, interactive_at = self._load(host, now, limit)
+            delay = 0.0
+            if blocked_until > now:
+                delay = blocked_until - now
+            elif remaining is not None and reset_at is not None \
+                    and remaining <= (self._reserve(quota) if background else 0):
+                delay = reset_at - now
+            elif background and interactive_at > now - INTERACTIVE_HOLD:
+                delay = POLL
+            elif limit:
+                need = 1 + (limit[1] * BACKGROUND_SHARE if background else 0)
+                if tokens < need:
+                    delay = (need - tokens) / rate
+            if delay > 0:
+                if not background:
+                    interactive_at = now
+            else:
+                tokens -= 1 if limit else 0
+                # Counted down locally so concurrent callers do not all spend the last unit.
+                remaining = remaining - 1 if remaining is not None else None
+            self._db.execute(
+                "UPDATE hosts SET tokens = ?, rate = ?, refilled_at = ?, remaining = ?, reset_at = ?, "
+                "interactive_at = ? WHERE host = ?",
+                (tokens, rate, now, remaining, reset_at, interactive_at, host))
+        return min(delay, MAX_WAIT)
+
+    def acquire(self, host, priority=None):
+        """Block until host has a slot for one request → seconds waited."""
+        priority = priority or self.priority
+        started = time.time()
+        while True:
+            delay = self._take(host, priority)
+            if delay <= 0:
+                break
+            time.sleep(min(delay, POLL))
+        waited = time.time() - started
+        if waited >= 0.001 and trace.enabled():
+            trace.record(f"rate limit {host}", "wait", started, waited, {"priority": priority})
+        return waited
+
+    def update(self, host, remaining=None, quota=None, reset_at=None, throttle=None):
+        """Record the budget a server reported and, with throttle (seconds, or True), block the host."""
+        now = time.time()
+        limit = self.limit_for(host)
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            tokens, rate, _, old_remaining, old_quota, old_reset, blocked_until, _ = self._load(host, now, limit)
+            if remaining is not None:
+                old_remaining, old_quota = remaining, quota or old_quota
+                old_reset = reset_at or old_reset
+            throttled = 0
+            if throttle is not None and throttle is not False:
+                wait = THROTTLE_WAIT if throttle is True else min(float(throttle), MAX_WAIT)
+                blocked_until = max(blocked_until, now + wait)
+                throttled = 1
+                if limit:
+                    tokens, rate = 0.0, max(limit[0] * MIN_RATE_SHARE, rate / 2)
+            self._db.execute(
+                "UPDATE hosts SET tokens = ?, rate = ?, refilled_at = ?, remaining = ?, quota = ?, reset_at = ?, "
+                "blocked_until = ?, throttled = throttled + ? WHERE host = ?",
+                (tokens, rate, now, old_remaining, old_quota, old_reset,
+                 blocked_until, throttled, host))
+
+    def observe(self, host, status, headers, retry_after=None):
+        """Record a response's X-RateLimit-* headers (lower-cased names).
+
+        A 429 (or a 403 that spent the budget or carries Retry-After) throttles
+        the host for retry_after seconds, else until the reported reset.
+        """
+        remaining = header_int(headers, "x-ratelimit-remaining")
+        reset_at = reset_time(headers.get("x-ratelimit-reset"))
+        throttle = None
+        if status == 429 or (status == 403 and (remaining == 0 or "retry-after" in headers)):
+            throttle = retry_after
+            if throttle is None:
+                throttle = max(0.0, reset_at - time.time()) if reset_at else True
+        self.update(host, remaining, header_int(headers, "x-ratelimit-limit"), reset_at, throttle)
+
+    def coalesce(self, key, fn):
+        """fn() once per key at a time: callers arriving while it runs get its result (or exception)."""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def status(self):
+        """→ {host: state dict} with the bucket refilled to now."""
+        now = time.time()
+        hosts = {}
+        with self._lock:
+            rows = self._db.execute("SELECT host, throttled FROM hosts ORDER BY host").fetchall()
+            states = [(host, throttled, self._load(host, now, self.limit_for(host))) for host, throttled in rows]
+        for host, throttled, (tokens, rate, _, remaining, quota, reset_at, blocked_until, _) in states:
+            limit = self.limit_for(host)
+            hosts[host] = {"limit": limit, "tokens": tokens if limit else None, "rate": rate if limit else None,
+                           "remaining": remaining, "quota": quota, "reset_in": reset_at and reset_at - now,
+                           "blocked_for": max(0.0, blocked_until - now), "throttled": throttled}
+        return hosts
+
+    def reset(self):
+        with self._lock:
+            self._db.execute("DELETE FROM hosts")
+
+
+def ratelimit_path(env=None):
+    return os.path.join(cache_dir(env), "ratelimit.sqlite3")
+
+
+def scheduler_from_env(env=None):
+    """A Scheduler for the shared state file, or None with HUMAND_RATE_LIMIT=0."""
+    env = os.environ if env is None else env
+    if env.get("HUMAND_RATE_LIMIT") == "0":
+        return None
+    priority = env.get("HUMAND_PRIORITY") or INTERACTIVE
+    if priority not in (INTERACTIVE, BACKGROUND):
+        raise ValueError(f"HUMAND_PRIORITY must be {INTERACTIVE} or {BACKGROUND}, not {priority!r}")
+    limits = parse_limits(env.get("HUMAND_RATE_LIMITS") or DEFAULT_LIMITS)
+    return Scheduler(ratelimit_path(env), limits, priority)
+
+
+_scheduler = None
+_scheduler_ready = False
+_scheduler_lock = threading.Lock()
+
+
+def scheduler():
+    """The process-wide Scheduler (None when disabled or its state file cannot be opened)."""
+    global _scheduler, _scheduler_ready
+    if not _scheduler_ready:
+        with _scheduler_lock:
+            if not _scheduler_ready:
+                try:
+                    _scheduler = scheduler_from_env()
+                except (ValueError, OSError, sqlite3.Error) as e:
+                    print(f"Warning: rate-limit scheduler disabled: {e}", file=sys.stderr)
+                _scheduler_ready = True
+    return _scheduler
+
+
+def set_priority(priority):
+    """Priority of this process's requests from now on, unless HUMAND_PRIORITY says otherwise."""
+    s = scheduler()
+    if s is not None and not os.environ.get("HUMAND_PRIORITY"):
+        s.priority = priority
+
+
+def acquire(host):
+    s = scheduler()
+    return s.acquire(host) if s is not None else 0.0
+
+
+def observe(host, status, headers, retry_after=None):
+    s = scheduler()
+    if s is not None:
+        s.observe(host, status, headers, retry_after)
+
+
+def update(host, remaining=None, quota=None, reset_at=None, throttle=None):
+    s = scheduler()
+    if s is not None:
+        s.update(host, remaining, quota, reset_at, throttle)
+
+
+def coalesce(key, fn):
+    s = scheduler()
+    return s.coalesce(key, fn) if s is not None else fn()
+
+
+def main(argv):
+    if argv not in (["status"], ["reset"], []):
+        print("Usage: python3 -m hulib.ratelimit status|reset", file=sys.stderr)
+        return 1
+    env = dict(os.environ, HUMAND_RATE_LIMIT="1")
+    try:
+        s = scheduler_from_env(env)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if argv == ["reset"]:
+        s.reset()
+        print(f"Reset {s.path}")
+        return 0
+    for host, st in s.status().items():
+        bucket = (f"{st['tokens']:.1f}/{st['limit'][1]:g} tokens at {st['rate']:.2f}/s" if st["limit"]
+                  else "no local limit")
+        budget = (f"{st['remaining']}/{st['quota'] or '?'} left, resets in {st['reset_in']:.0f}s"
+                  if st["remaining"] is not None and st["reset_in"] is not None else "budget unknown")
+        blocked = f", blocked {st['blocked_for']:.0f}s" if st["blocked_for"] else ""
+        print(f"{host:<28} {bucket:<32} {budget}{blocked}  throttled {st['throttled']}x")
+    s.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,448 @@
+"""Record/replay stand-in for Jira REST and the `gh` CLI.
+
+One local HTTP server plays both roles:
+
+  - Jira: scripts point JIRA_BASE_URL at it. In record mode every request is
+    forwarded to the real site (--upstream) and the response is stored in the
+    cassette; in replay mode it is answered from the cassette.
+  - gh: .cursor/scripts/replay-bin/gh is a `gh` shim that forwards its argv to
+    the server (HUMAND_REPLAY_URL), which runs the real `gh` when recording and
+    returns the stored stdout/stderr/exit code when replaying.
+
+Because every call goes through one process, the server can add latency
+(--latency MS, or `recorded` to replay the upstream timings, plus --jitter),
+enforce rate limits with Jira-style X-RateLimit-* / Retry-After headers (429)
+and GitHub-style "API rate limit exceeded" errors, and count calls and
+concurrency per endpoint.
+
+A cassette is a directory with one JSON file per distinct request
+(http/<sha256>.json, gh/<sha256>.json), holding the last response recorded for
+it. Authorization headers and cookies are never written.
+
+CLI:
+    python3 -m hulib.replay run --cassette DIR --record -- ./run-sprint-report.sh shark
+    python3 -m hulib.replay run --cassette DIR --latency recorded -- ./run-sprint-report.sh shark
+    python3 -m hulib.replay serve --cassette DIR [--port 8765] [--rate-limit 100]
+    python3 -m hulib.replay stats DIR
+
+`run` starts the server on a free port, runs the command with JIRA_BASE_URL,
+HUMAND_REPLAY_URL and PATH pointing at it (dummy Jira credentials are set when
+replaying), then prints wall time, call counts, misses, 429s and the maximum
+number of calls in flight. Exit code: the command's.
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .cache import cache_key
+from .client import HttpClient, HttpError
+from .jira import jira_settings
+from . import trace
+from .trace import endpoint_label as http_label, gh_label
+
+SHIM_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "replay-bin")
+
+GH_ENDPOINT = "/__replay/gh"
+STATS_ENDPOINT = "/__replay/stats"
+
+# Request headers forwarded upstream, and response headers kept in the cassette.
+FORWARD_HEADERS = ("authorization", "accept", "content-type")
+KEEP_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "retry-after")
+
+GH_RATE_LIMIT_MESSAGE = "gh: API rate limit exceeded for user ID 0. (HTTP 403)\n"
+
+
+# --- cassette ---
+
+def encode_body(data):
+    try:
+        return {"body": data.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(data).decode()}
+
+
+def decode_body(entry):
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+def http_key(method, target, body):
+    return cache_key("http", method, target, body.decode("utf-8", "replace"))
+
+
+def gh_key(args, stdin):
+    return cache_key("gh", *args, "\0stdin", stdin or "")
+
+
+class Cassette:
+    def __init__(self, path):
+        self.path = path
+
+    def _file(self, kind, key):
+        return os.path.join(self.path, kind, f"{key}.json")
+
+    def get(self, kind, key):
+        try:
+            with open(self._file(kind, key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, kind, key, entry):
+        path = self._file(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f, indent=1)
+        os.replace(tmp, path)
+
+    def entries(self, kind):
+        directory = os.path.join(self.path, kind)
+        for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name)) as f:
+                    yield json.load(f)
+
+
+# --- server ---
+
+class RateLimiter:
+    """Fixed-window request budget: `limit` calls per `window` seconds (0 = unlimited)."""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.used = 0
+
+    def take(self):
+        """→ (allowed, remaining, seconds until the window resets)."""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= self.window:
+                self.window_start, self.used = now, 0
+            reset = self.window - (now - self.window_start)
+            if self.limit and self.used >= self.limit:
+                return False, 0, reset
+            self.used += 1
+            return True, max(0, self.limit - self.used), reset
+
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, cassette, record=False, upstream=None, latency="recorded", jitter=0.0,
+                 rate_limit=0, gh_rate_limit=0, rate_window=60.0):
+        super().__init__(address, ReplayHandler)
+        self.cassette = cassette
+        self.record = record
+        self.upstream = HttpClient(upstream, max_retries=0, timeout=60) if record and upstream else None
+        self.latency = latency
+        self.jitter = jitter
+        self.jira_limit = RateLimiter(rate_limit, rate_window)
+        self.gh_limit = RateLimiter(gh_rate_limit, rate_window)
+        self.real_gh = shutil.which("gh", path=os.pathsep.join(
+            p for p in os.environ.get("PATH", "").split(os.pathsep) if os.path.abspath(p) != SHIM_DIR))
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.misses = Counter()
+        self.limited = Counter()
+        self.seconds = defaultdict(float)
+        self.in_flight = self.max_in_flight = 0
+        self.kind_in_flight = Counter()
+        self.kind_max_in_flight = Counter()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def delay(self, entry):
+        base = entry.get("elapsed", 0.0) if self.latency == "recorded" else float(self.latency) / 1000
+        return base + random.uniform(0, self.jitter / 1000)
+
+    def begin(self, kind):
+        with self.lock:
+            self.in_flight += 1
+            self.kind_in_flight[kind] += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.kind_max_in_flight[kind] = max(self.kind_max_in_flight[kind], self.kind_in_flight[kind])
+        return time.perf_counter()
+
+    def end(self, kind, label, started, miss=False, limited=False):
+        with self.lock:
+            self.in_flight -= 1
+            self.kind_in_flight[kind] -= 1
+            self.calls[label] += 1
+            self.seconds[label] += time.perf_counter() - started
+            if miss:
+                self.misses[label] += 1
+            if limited:
+                self.limited[label] += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "calls": sum(self.calls.values()),
+                "misses": sum(self.misses.values()),
+                "rate_limited": sum(self.limited.values()),
+                "max_in_flight": self.max_in_flight,
+                "max_in_flight_by_kind": dict(self.kind_max_in_flight),
+                "endpoints": {label: {"calls": n, "seconds": round(self.seconds[label], 3),
+                                      "misses": self.misses[label], "rate_limited": self.limited[label]}
+                              for label, n in sorted(self.calls.items())},
+            }
+
+    # --- gh ---
+
+    def run_gh(self, args, stdin):
+        """Recorded or live `gh <args>` → cassette-style entry {code, stdout, stderr, elapsed}."""
+        key = gh_key(args, stdin)
+        if not self.record:
+            return self.cassette.get("gh", key)
+        if not self.real_gh:
+            return {"code": 127, "stdout": "", "stderr": "gh: command not found\n", "elapsed": 0.0}
+        started = time.perf_counter()
+        proc = subprocess.run([self.real_gh, *args], input=stdin.encode() if stdin is not None else None,
+                              capture_output=True)
+        entry = {"args": args, "stdin": stdin, "code": proc.returncode,
+                 "stdout": proc.stdout.decode("utf-8", "replace"), "stderr": proc.stderr.decode("utf-8", "replace"),
+                 "elapsed": round(time.perf_counter() - started, 4)}
+        self.cassette.put("gh", key, entry)
+        return entry
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, headers, body):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload, headers=None):
+        self.send(status, {"Content-Type": "application/json", **(headers or {})}, json.dumps(payload).encode())
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        if self.path == STATS_ENDPOINT:
+            return self.send_json(200, self.server.stats())
+        self.handle_jira("GET")
+
+    def do_POST(self):
+        if self.path == GH_ENDPOINT:
+            return self.handle_gh()
+        self.handle_jira("POST")
+
+    def do_PUT(self):
+        self.handle_jira("PUT")
+
+    def handle_jira(self, method):
+        server = self.server
+        body = self.read_body()
+        label = http_label(method, self.path)
+        started = server.begin("jira")
+        allowed, remaining, reset = server.jira_limit.take()
+        limit_headers = {}
+        if server.jira_limit.limit:
+            limit_headers = {"X-RateLimit-Limit": str(server.jira_limit.limit),
+                             "X-RateLimit-Remaining": str(remaining),
+                             "X-RateLimit-Reset": str(int(time.time() + reset))}
+        if not allowed:
+            server.end("jira", label, started, limited=True)
+            return self.send_json(429, {"errorMessages": ["Rate limit exceeded (replay)"]},
+                                  {**limit_headers, "Retry-After": str(max(1, round(reset)))})
+
+        key = http_key(method, self.path, body)
+        entry = server.cassette.get("http", key)
+        if server.record:
+            try:
+                entry = self.forward(method, body)
+            except HttpError as e:
+                server.end("jira", label, started, miss=True)
+                return self.send_json(502, {"errorMessages": [f"Upstream failed (replay record): {e}"]})
+            server.cassette.put("http", key, entry)
+        elif entry is None:
+            server.end("jira", label, started, miss=True)
+            return self.send_json(404, {"errorMessages": [f"Not in cassette: {method} {self.path}"]})
+        else:
+            time.sleep(server.delay(entry))
+        server.end("jira", label, started)
+        self.send(entry["status"], {**entry.get("headers", {}), **limit_headers}, decode_body(entry))
+
+    def forward(self, method, body):
+        """Send the request upstream → cassette entry (status, kept headers, body, elapsed)."""
+        headers = {name: value for name, value in self.headers.items() if name.lower() in FORWARD_HEADERS}
+        started = time.perf_counter()
+        upstream = self.server.upstream
+        resp = upstream.request(method, self.path, headers=headers, ok=range(100, 600),
+                                json_body=json.loads(body) if body else None)
+        return {"method": method, "path": self.path, "request_body": body.decode("utf-8", "replace"),
+                "status": resp.status, "headers": {k: v for k, v in resp.headers.items() if k in KEEP_HEADERS},
+                **encode_body(resp.body), "elapsed": round(time.perf_counter() - started, 4)}
+
+    def handle_gh(self):
+        server = self.server
+        request = json.loads(self.read_body() or b"{}")
+        args, stdin = request.get("args", []), request.get("stdin")
+        label = gh_label(args)
+        started = server.begin("gh")
+        allowed, _, _ = server.gh_limit.take()
+        if not allowed:
+            server.end("gh", label, started, limited=True)
+            return self.send_json(200, {"code": 1, "stdout": "", "stderr": GH_RATE_LIMIT_MESSAGE})
+        entry = server.run_gh(args, stdin)
+        if entry is None:
+            server.end("gh", label, started, miss=True)
+            return self.send_json(200, {"code": 1, "stdout": "",
+                                        "stderr": f"replay: no recording for gh {' '.join(args)}\n"})
+        if not server.record:
+            time.sleep(server.delay(entry))
+        server.end("gh", label, started)
+        self.send_json(200, {k: entry[k] for k in ("code", "stdout", "stderr")})
+
+
+# --- gh shim client ---
+
+def gh_shim(args):
+    """Body of replay-bin/gh: forward argv (and stdin when gh would read it) to the replay server."""
+    url = os.environ.get("HUMAND_REPLAY_URL")
+    if not url:
+        print("replay gh shim: HUMAND_REPLAY_URL is not set", file=sys.stderr)
+        return 127
+    reads_stdin = any(a == "-" or a.endswith("@-") for a in args)
+    stdin = sys.stdin.read() if reads_stdin else None
+    with HttpClient(url, max_retries=0, timeout=600) as client:
+        result = client.request("POST", GH_ENDPOINT, json_body={"args": args, "stdin": stdin}).json()
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+    return result["code"]
+
+
+# --- CLI ---
+
+def start_server(args, port=0):
+    upstream = args.upstream or jira_settings()[0]
+    server = ReplayServer(("127.0.0.1", port), Cassette(args.cassette), record=args.record, upstream=upstream,
+                          latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                          gh_rate_limit=args.gh_rate_limit, rate_window=args.rate_window)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def child_env(server, record):
+    env = dict(os.environ)
+    env["JIRA_BASE_URL"] = server.url
+    env["HUMAND_REPLAY_URL"] = server.url
+    env["PATH"] = SHIM_DIR + os.pathsep + env.get("PATH", "")
+    if not record:
+        env.setdefault("JIRA_EMAIL", "replay@example.com")
+        env.setdefault("JIRA_API_TOKEN", "replay")
+    return env
+
+
+def print_stats(stats, wall=None, out=sys.stderr):
+    if wall is not None:
+        print(f"Wall time: {wall:.2f}s", file=out)
+    by_kind = ", ".join(f"{kind} {n}" for kind, n in sorted(stats["max_in_flight_by_kind"].items()))
+    print(f"Calls: {stats['calls']} (misses {stats['misses']}, rate-limited {stats['rate_limited']}); "
+          f"max in flight: {stats['max_in_flight']}" + (f" ({by_kind})" if by_kind else ""), file=out)
+    for label, row in stats["endpoints"].items():
+        extra = "".join(f", {row[k]} {k.replace('_', '-')}" for k in ("misses", "rate_limited") if row[k])
+        print(f"  {row['calls']:>6}  {row['seconds']:>8.2f}s  {label}{extra}", file=out)
+
+
+def cassette_stats(path):
+    cassette = Cassette(path)
+    groups = defaultdict(list)
+    for entry in cassette.entries("http"):
+        groups[http_label(entry["method"], entry["path"])].append(entry["elapsed"])
+    for entry in cassette.entries("gh"):
+        groups[gh_label(entry["args"])].append(entry["elapsed"])
+    print(f"{'recorded':>8}  {'median ms':>9}  {'max ms':>8}  endpoint")
+    for label, elapsed in sorted(groups.items()):
+        print(f"{len(elapsed):>8}  {statistics.median(elapsed) * 1000:>9.0f}  {max(elapsed) * 1000:>8.0f}  {label}")
+
+
+def add_server_args(p):
+    p.add_argument("--cassette", required=True, help="Cassette directory")
+    p.add_argument("--record", action="store_true", help="Forward to the real Jira/gh and store the responses")
+    p.add_argument("--upstream", default=None, help="Jira site to record from (default: $JIRA_BASE_URL)")
+    p.add_argument("--latency", default="recorded",
+                   help="Replay delay per call in ms, or `recorded` for the upstream timing (default)")
+    p.add_argument("--jitter", type=float, default=0.0, help="Extra random delay per call, 0..MS")
+    p.add_argument("--rate-limit", type=int, default=0, help="Jira calls allowed per window (default: unlimited)")
+    p.add_argument("--gh-rate-limit", type=int, default=0, help="gh calls allowed per window (default: unlimited)")
+    p.add_argument("--rate-window", type=float, default=60.0, help="Rate-limit window in seconds (default: 60)")
+
+
+def main(argv):
+    trace.disable()  # HUMAND_TRACE is meant for the command under test, not for the stand-in
+    if argv[:1] == ["gh"]:
+        return gh_shim(argv[1:])
+
+    parser = argparse.ArgumentParser(prog="python3 -m hulib.replay", description="Record/replay Jira and gh")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="Run a command against the replay server and report its calls")
+    add_server_args(p)
+    p.add_argument("--stats-json", default=None, help="Also write the call stats to this file")
+    p.add_argument("cmd", nargs=argparse.REMAINDER, help="-- command [args...]")
+    p = sub.add_parser("serve", help="Serve until interrupted; prints the env to point scripts at it")
+    add_server_args(p)
+    p.add_argument("--port", type=int, default=8765)
+    p = sub.add_parser("stats", help="Summarize a cassette's recorded calls and timings")
+    p.add_argument("cassette")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        cassette_stats(args.cassette)
+        return 0
+
+    if args.command == "serve":
+        server = start_server(args, args.port)
+        print(f"export JIRA_BASE_URL={server.url} HUMAND_REPLAY_URL={server.url} PATH={SHIM_DIR}:$PATH")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            print_stats(server.stats())
+        return 0
+
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not cmd:
+        parser.error("run requires a command after --")
+    server = start_server(args)
+    started = time.perf_counter()
+    code = subprocess.run(cmd, env=child_env(server, args.record)).returncode
+    wall = time.perf_counter() - started
+    stats = server.stats()
+    server.shutdown()
+    print_stats(stats, wall)
+    if args.stats_json:
+        with open(args.stats_json, "w") as f:
+            json.dump({"wall_seconds": round(wall, 3), "exit_code": code, **stats}, f, indent=2)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
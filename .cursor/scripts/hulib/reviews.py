@@ -0,0 +1,130 @@
+"""Review decision and CI status for open PRs, batched into aliased GraphQL requests.
+
+Produces the reviews.json that generate-sprint-report.py reads for its
+"En Revisión" section, without one `gh pr view` per PR. Targets are either
+
+    <repo>#<number>   a PR known from the fallback search or a Jira PR link
+    <repo>@<branch>   a Jira Dev Branch: its open PR is looked up by head ref
+
+and each result is stored under the target it was asked for:
+
+    {"review": "APPROVED"|"CHANGES_REQUESTED"|"REVIEW_REQUIRED"|null,
+     "checks": ["SUCCESS"|"FAILURE"|"ERROR"|"PENDING"|"EXPECTED"],   # rollup state, [] if no checks
+     "number": 123, "url": "...", "isDraft": false}
+
+Branch targets with no open PR are left out. Requests go through `gh api graphql`
+(hulib/github.py), so HUMAND_CACHE=1 and HUMAND_TRACE apply.
+
+CLI:
+    python3 -m hulib.reviews <repo>#<number>|<repo>@<branch>...   # JSON on stdout
+"""
+
+import json
+import re
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from . import trace
+from .cache import cache_from_env
+from .github import CONCURRENCY, ORG, RATE_LIMIT_FIELDS, GitHubError, graphql
+
+TARGETS_PER_REQUEST = 50
+
+TARGET = re.compile(r"^([A-Za-z0-9_.-]+)([#@])(.+)$")
+
+PR_REVIEW_FIELDS = ("number url isDraft reviewDecision "
+                    "commits(last: 1) { nodes { commit { statusCheckRollup { state } } } }")
+
+
+def parse_target(target):
+    """"humand-web#12" → ("humand-web", "#", 12); "humand-web@sqsh-1-x" → ("humand-web", "@", "sqsh-1-x")."""
+    m = TARGET.match(target)
+    if not m or (m.group(2) == "#" and not m.group(3).isdigit()):
+        raise ValueError(f"not a <repo>#<number> or <repo>@<branch> target: {target!r}")
+    repo, kind, ref = m.groups()
+    return repo, kind, int(ref) if kind == "#" else ref
+
+
+def build_request(targets, org=ORG):
+    """One GraphQL document: a `repository` alias per repo, a PR alias per target → (query, {alias path: target})."""
+    by_repo = defaultdict(list)
+    for target in targets:
+        repo, kind, ref = parse_target(target)
+        by_repo[repo].append((kind, ref, target))
+
+    parts, aliases = [], {}
+    for r, (repo, items) in enumerate(by_repo.items()):
+        fields = []
+        for i, (kind, ref, target) in enumerate(items):
+            if kind == "#":
+                fields.append(f"    p{i}: pullRequest(number: {ref}) {{ {PR_REVIEW_FIELDS} }}")
+            else:
+                fields.append(f"    p{i}: pullRequests(headRefName: {json.dumps(ref)}, states: OPEN, first: 1, "
+                              f"orderBy: {{field: UPDATED_AT, direction: DESC}}) {{ nodes {{ {PR_REVIEW_FIELDS} }} }}")
+            aliases[(f"r{r}", f"p{i}")] = target
+        parts.append(f"  r{r}: repository(owner: {json.dumps(org)}, name: {json.dumps(repo)}) {{\n"
+                     + "\n".join(fields) + "\n  }")
+    parts.append(f"  {RATE_LIMIT_FIELDS}")
+    return "query {\n" + "\n".join(parts) + "\n}", aliases
+
+
+def review_entry(node):
+    commits = (node.get("commits") or {}).get("nodes") or []
+    rollup = (commits[0].get("commit") or {}).get("statusCheckRollup") if commits else None
+    return {
+        "review": node.get("reviewDecision"),
+        "checks": [rollup["state"]] if rollup and rollup.get("state") else [],
+        "number": node.get("number"),
+        "url": node.get("url"),
+        "isDraft": node.get("isDraft", False),
+    }
+
+
+def fetch_reviews(targets, cache=None, concurrency=CONCURRENCY):
+    """Review status for each target → {target: entry}; see the module docstring for the entry shape."""
+    targets = sorted(set(targets))
+    batches = [targets[i:i + TARGETS_PER_REQUEST] for i in range(0, len(targets), TARGETS_PER_REQUEST)]
+
+    def fetch(batch):
+        query, aliases = build_request(batch)
+        return aliases, graphql(query, cache, name="graphql reviews")
+
+    reviews = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for aliases, data in pool.map(fetch, batches):
+            for (repo_alias, pr_alias), target in aliases.items():
+                node = (data.get(repo_alias) or {}).get(pr_alias)
+                if node and "nodes" in node:
+                    node = (node["nodes"] or [None])[0]
+                if node:
+                    reviews[target] = review_entry(node)
+    return reviews
+
+
+def main(argv):
+    if not argv or any(a.startswith("-") for a in argv):
+        print("Usage: python3 -m hulib.reviews <repo>#<number>|<repo>@<branch>...", file=sys.stderr)
+        return 1
+    try:
+        for target in argv:
+            parse_target(target)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    cache = cache_from_env()
+    try:
+        with trace.span("fetch PR reviews", prs=len(argv)):
+            reviews = fetch_reviews(argv, cache=cache)
+    except GitHubError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 3
+    finally:
+        if cache is not None:
+            cache.close()
+    json.dump(reviews, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,156 @@
+"""Per-project/sprint snapshot for incremental sprint refreshes.
+
+A snapshot stores the last fetched issues (in JQL order), the PRs found by the
+GitHub fallback search, and sync watermarks. A refresh then only pulls:
+
+  - the sprint's current membership in JQL order, with the fields Jira can
+    change without bumping `updated` (sprint, Development summary);
+  - full issues with `updated >= -<N>m` since the last sync;
+  - full issues for members the snapshot has never seen;
+  - PRs updated since the last PR sync (search-prs-for-keys.sh --updated-since).
+
+The merged result is what a full refresh would have fetched, in the same order.
+
+File: $HUMAND_CACHE_DIR/snapshots/<PROJECT>-<sprint-slug>.json (see hulib/cache.py).
+
+CLI:
+    python3 -m hulib.snapshot path <PROJECT> [<SPRINT>]
+    python3 -m hulib.snapshot searched <snapshot>     # keys already searched on GitHub
+    python3 -m hulib.snapshot prs-since <snapshot>    # YYYY-MM-DD watermark for --updated-since
+"""
+
+import json
+import math
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+from .cache import cache_dir
+from .jira import KEY_CHUNK, chunked
+from .keys import extract_ticket_keys
+
+# Fields Jira can change without touching `updated`: sprint dates/state and the
+# Development panel summary maintained by the GitHub integration.
+VOLATILE_FIELDS = ("sprint", "customfield_10000")
+
+# Overlap added to the `updated >=` window to absorb clock skew between runs.
+SAFETY_MINUTES = 5
+
+
+def now_utc():
+    return datetime.now(timezone.utc)
+
+
+def snapshot_path(project, sprint=None, env=None):
+    slug = re.sub(r"[^a-z0-9]+", "-", (sprint or "active").lower()).strip("-") or "active"
+    return os.path.join(cache_dir(env), "snapshots", f"{project}-{slug}.json")
+
+
+def load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save(path, snap):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snap, f)
+    os.replace(tmp, path)
+
+
+def refresh_issues(jira, jql_filter, order_by, fields, snap):
+    """Bring snap["issues"] up to date and return the issue list in JQL order."""
+    started = now_utc()
+    jql = f"{jql_filter} ORDER BY {order_by}"
+    issues = snap.get("issues") or {}
+    synced_at = snap.get("issues_synced_at")
+
+    if not issues or not synced_at:
+        fetched = list(jira.search_parallel(jql, fields))
+        issues = {i["key"]: i for i in fetched}
+        order = [i["key"] for i in fetched]
+    else:
+        light_fields = ",".join(("key",) + VOLATILE_FIELDS)
+        members = list(jira.search_parallel(jql, light_fields))
+        order = [m["key"] for m in members]
+
+        elapsed = started - datetime.fromisoformat(synced_at)
+        minutes = math.ceil(elapsed.total_seconds() / 60) + SAFETY_MINUTES
+        for issue in jira.search_parallel(f"({jql_filter}) AND updated >= -{minutes}m", fields):
+            issues[issue["key"]] = issue
+
+        unseen = [k for k in order if k not in issues]
+        for chunk in chunked(unseen, KEY_CHUNK):
+            for issue in jira.search(f"key in ({','.join(chunk)})", fields):
+                issues[issue["key"]] = issue
+
+        for m in members:
+            stored = issues.get(m["key"])
+            if stored is None:
+                continue
+            for name in VOLATILE_FIELDS:
+                if name in m.get("fields", {}):
+                    stored.setdefault("fields", {})[name] = m["fields"][name]
+
+        issues = {k: issues[k] for k in order if k in issues}
+
+    snap["issues"] = issues
+    snap["order"] = order
+    snap["issues_synced_at"] = started.isoformat()
+    return [issues[k] for k in order if k in issues]
+
+
+def merge_prs(snap, new_prs, search_keys):
+    """Upsert new_prs into the snapshot and return the PRs relevant to search_keys.
+
+    Only PRs whose title/branch mention a key that still needs the GitHub fallback
+    are returned, which is exactly what a full search for those keys yields.
+    Returned PRs are ordered by (repo, number), like search-prs-for-keys.sh output.
+    new_prs must be complete for search_keys (a full search, or a delta every repo
+    answered): prs_synced_at moves to now and the next delta starts from there.
+    """
+    stored = snap.get("prs") or {}
+    for pr in new_prs:
+        stored[f"{pr['repo']}#{pr['number']}"] = pr
+    snap["prs"] = stored
+
+    search_keys = set(search_keys)
+    snap["searched"] = sorted(set(snap.get("searched") or []) | search_keys)
+    snap["prs_synced_at"] = now_utc().isoformat()
+
+    relevant = [
+        pr for pr in stored.values()
+        if extract_ticket_keys(pr.get("title", ""), pr.get("headRefName", "")) & search_keys
+    ]
+    relevant.sort(key=lambda p: (p["repo"], p["number"]))
+    return relevant
+
+
+def prs_since(snap):
+    """GitHub `updated:>=` date for the next PR delta (one day of overlap for timezones)."""
+    synced_at = snap.get("prs_synced_at")
+    if not synced_at:
+        return ""
+    return (datetime.fromisoformat(synced_at) - timedelta(days=1)).date().isoformat()
+
+
+def main(argv):
+    if len(argv) >= 2 and argv[0] == "path":
+        print(snapshot_path(argv[1], argv[2] if len(argv) > 2 else None))
+    elif len(argv) == 2 and argv[0] == "searched":
+        print("\n".join(load(argv[1]).get("searched") or []))
+    elif len(argv) == 2 and argv[0] == "prs-since":
+        print(prs_since(load(argv[1])))
+    else:
+        print(__doc__.split("CLI:")[1], file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
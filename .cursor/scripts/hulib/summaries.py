@@ -0,0 +1,140 @@
+"""Jira issue summaries by key: batched `key in (...)` searches plus an on-disk cache.
+
+team-staging-status.sh used to fetch each ticket title with its own curl (API v3,
+then v2) and parse it with its own python3, and its in-memory cache lived in a
+`$(...)` subshell, so every commit cost a round-trip. Here every key of a run is
+resolved at once with KEY_CHUNK keys per search, and summaries are kept in a
+SQLite table under the cache dir: a repeat run within the TTL makes no Jira calls.
+Keys Jira does not return (deleted, moved, not visible) are cached as "" too.
+
+Environment:
+    HUMAND_CACHE_SUMMARY_TTL  seconds a cached summary is reused (default: 86400; 0 disables)
+    HUMAND_CACHE=0            refetch every key (results are still stored)
+    HUMAND_CACHE_DIR          see hulib/cache.py
+
+CLI:
+    python3 -m hulib.summaries KEY...    # KEY<TAB>summary per key, in input order
+"""
+
+import os
+import sqlite3
+import sys
+import time
+
+from . import trace
+from .cache import cache_dir
+from .client import HttpError
+from .jira import KEY_CHUNK, JiraClient, chunked, jira_settings
+
+DEFAULT_TTL = 86400
+
+# The CLI prints one KEY<TAB>summary line per key.
+LINE_SAFE = str.maketrans("\t\r\n", "   ")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    site       TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    summary    TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (site, key)
+);
+"""
+
+
+class SummaryCache:
+    """Summaries per (Jira site, key), reused while younger than ttl seconds."""
+
+    def __init__(self, path, site, ttl=DEFAULT_TTL):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.site = site
+        self.ttl = ttl
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def get(self, keys):
+        """→ {key: summary} for the keys with a fresh entry."""
+        found = {}
+        since = time.time() - self.ttl
+        for chunk in chunked(keys, 500):
+            marks = ",".join("?" * len(chunk))
+            rows = self._db.execute(
+                f"SELECT key, summary FROM summaries WHERE site = ? AND fetched_at >= ? AND key IN ({marks})",
+                (self.site, since, *chunk),
+            )
+            found.update(rows)
+        return found
+
+    def put(self, summaries):
+        now = time.time()
+        with self._db:
+            self._db.execute("BEGIN")
+            self._db.executemany("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)",
+                                 [(self.site, k, s, now) for k, s in summaries.items()])
+            self._db.execute("DELETE FROM summaries WHERE fetched_at < ?", (now - self.ttl,))
+
+
+def summary_cache_from_env(env=None):
+    """The on-disk SummaryCache, or None when HUMAND_CACHE_SUMMARY_TTL=0."""
+    env = os.environ if env is None else env
+    ttl = float(env.get("HUMAND_CACHE_SUMMARY_TTL", DEFAULT_TTL))
+    if ttl <= 0:
+        return None
+    site = jira_settings(env)[0]
+    return SummaryCache(os.path.join(cache_dir(env), "jira-summaries.sqlite3"), site, ttl)
+
+
+def fetch_summaries(jira, keys):
+    """Resolve keys → {key: summary} with chunked `key in (...)` searches."""
+    found = {}
+    for chunk in chunked(sorted(set(keys)), KEY_CHUNK):
+        for issue in jira.search(f"key in ({','.join(chunk)})", "summary"):
+            found[issue["key"]] = (issue.get("fields") or {}).get("summary") or ""
+    return found
+
+
+def summaries(keys, cache=None, refresh=False):
+    """→ {key: summary} for every key, from cache where fresh and one batch of searches for the rest.
+
+    Keys Jira returns no issue for map to "". HttpError propagates; nothing is cached then.
+    """
+    keys = list(dict.fromkeys(keys))
+    result = {} if cache is None or refresh else cache.get(keys)
+    missing = [k for k in keys if k not in result]
+    with trace.span("Jira summaries", keys=len(keys), cached=len(result)):
+        if missing:
+            with JiraClient.from_env(cache=None) as jira:
+                found = fetch_summaries(jira, missing)
+            fetched = {k: found.get(k, "") for k in missing}
+            if cache is not None:
+                cache.put(fetched)
+            result.update(fetched)
+    return result
+
+
+def main(argv):
+    if not argv or any(a.startswith("-") for a in argv):
+        print("Usage: python3 -m hulib.summaries KEY...", file=sys.stderr)
+        return 1
+    cache = summary_cache_from_env()
+    try:
+        result = summaries(argv, cache, refresh=os.environ.get("HUMAND_CACHE") == "0")
+    except HttpError as e:
+        print(f"Warning: Jira summary search failed ({e}); using cached titles only", file=sys.stderr)
+        result = cache.get(argv) if cache is not None else {}
+    finally:
+        if cache is not None:
+            cache.close()
+    for key in dict.fromkeys(argv):
+        if key in result:
+            print(f"{key}\t{result[key].translate(LINE_SAFE)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,41 @@
+"""teams.json lookups: team alias/key → Jira project key."""
+
+import json
+import os
+
+TEAMS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "teams.json")
+
+
+def load_teams(path=TEAMS_FILE):
+    with open(path) as f:
+        return json.load(f)
+
+
+def squads(teams):
+    """Entries with a project_key (skips `_non_squad` and other groupings)."""
+    return {name: entry for name, entry in teams.items() if isinstance(entry, dict) and "project_key" in entry}
+
+
+def resolve_project(team, teams):
+    """Resolve a team key, alias (case-insensitive) or bare Jira key → project key, or None."""
+    team = team.strip()
+    if team in teams and "project_key" in teams[team]:
+        return teams[team]["project_key"]
+    team_lower = team.lower()
+    for entry in teams.values():
+        if not isinstance(entry, dict) or "aliases" not in entry:
+            continue
+        if team_lower in [a.lower() for a in entry.get("aliases", [])]:
+            return entry["project_key"]
+    if team.isupper() and 2 <= len(team) <= 6 and team.isalpha():
+        return team
+    return None
+
+
+def project_keys(teams):
+    return sorted(entry["project_key"] for entry in squads(teams).values())
+
+
+def team_names(teams):
+    """project key → display name."""
+    return {entry["project_key"]: entry.get("name", name) for name, entry in squads(teams).items()}
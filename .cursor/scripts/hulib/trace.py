@@ -0,0 +1,214 @@
+"""Opt-in tracing: a span per pipeline stage and per outbound request.
+
+Disabled unless HUMAND_TRACE=<file>. Spans are buffered per process and
+appended to <file>.events when the process exits; the first traced process of
+a run (the root, e.g. sprint-report.py) then writes <file> in Chrome trace
+format (chrome://tracing, https://ui.perfetto.dev) and prints a summary table
+to stderr. Child processes inherit HUMAND_TRACE_ROOT and only append.
+
+Span categories:
+    stage   pipeline steps (fetch, search, render, ...)
+    http    every HttpClient request: endpoint, status, bytes, retries,
+            X-RateLimit-Remaining
+    gh      every `gh` invocation through hulib/gh.py: exit code, bytes, cache hit
+    github  GraphQL searches with the query cost and remaining points
+    wait    time a request waited for a rate-limit slot (hulib/ratelimit.py)
+
+Shell scripts that run several processes mark themselves as root with
+`python3 -m hulib.trace finish` in an EXIT trap (see search-prs-for-keys.sh).
+
+CLI:
+    python3 -m hulib.trace finish [<file>]    # write <file> from <file>.events
+    python3 -m hulib.trace summary <file>     # print the summary of a written trace
+"""
+
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+TRACE_PATH = os.environ.get("HUMAND_TRACE") or None
+
+# Issue keys and numeric ids in a path (API versions such as /3/ are single digits).
+ID_SEGMENT = re.compile(r"/(?:[A-Z][A-Z0-9]+-\d+|\d{2,})(?=/|$)")
+
+_lock = threading.Lock()
+_events = []
+_started = time.time()
+_is_root = False
+
+
+def enabled():
+    return TRACE_PATH is not None
+
+
+def disable():
+    """Stop tracing this process (tooling such as hulib/replay.py); children may still be traced."""
+    global TRACE_PATH, _is_root
+    if _is_root:
+        os.environ.pop("HUMAND_TRACE_ROOT", None)
+    TRACE_PATH, _is_root = None, False
+
+
+def endpoint_label(method, target):
+    """GET /rest/api/3/issue/SQSH-12?fields=summary → GET /rest/api/3/issue/{id}."""
+    path = target.split("?", 1)[0]
+    return f"{method} {ID_SEGMENT.sub('/{id}', path)}"
+
+
+def gh_label(args):
+    """gh api repos/HumandDev/humand-web/compare/a...b → gh api repos/{repo}/compare."""
+    words = [a for a in args if not a.startswith("-")][:2]
+    if len(words) == 2 and words[0] == "api" and words[1].startswith("repos/"):
+        parts = words[1].split("?", 1)[0].split("/")
+        words[1] = "/".join(["repos", "{repo}"] + parts[3:4])
+    return "gh " + " ".join(words)
+
+
+def record(name, cat, start, duration, args=None):
+    event = {"name": name, "cat": cat, "ph": "X", "ts": round(start * 1e6), "dur": round(duration * 1e6),
+             "pid": os.getpid(), "tid": threading.get_ident() % 100000, "args": args or {}}
+    with _lock:
+        _events.append(event)
+
+
+@contextmanager
+def span(name, cat="stage", **args):
+    """Time the block as one span. Yields the span's args dict so results can be added to it."""
+    if TRACE_PATH is None:
+        yield args
+        return
+    start = time.time()
+    try:
+        yield args
+    finally:
+        record(name, cat, start, time.time() - start, args)
+
+
+def process_name():
+    script = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] not in ("", "-", "-c") else "python"
+    return f"{script} [{os.getpid()}]"
+
+
+def _flush():
+    if TRACE_PATH is None:
+        return
+    with _lock:
+        events, _events[:] = list(_events), []
+    events.append({"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": process_name()}})
+    events.append({"name": process_name(), "cat": "process", "ph": "X", "ts": round(_started * 1e6),
+                   "dur": round((time.time() - _started) * 1e6), "pid": os.getpid(), "tid": 0, "args": {}})
+    with open(f"{TRACE_PATH}.events", "a") as f:
+        f.write("".join(json.dumps(e) + "\n" for e in events))
+    if _is_root:
+        finish(TRACE_PATH)
+
+
+def finish(path, out=sys.stderr):
+    """Merge <path>.events into the Chrome trace file <path> and print its summary."""
+    events = []
+    try:
+        with open(f"{path}.events") as f:
+            events = [json.loads(line) for line in f if line.strip()]
+        os.remove(f"{path}.events")
+    except FileNotFoundError:
+        pass
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    print_summary(events, path, out)
+
+
+def print_summary(events, path, out=sys.stderr):
+    spans = [e for e in events if e.get("ph") == "X"]
+    pids = {e["pid"] for e in spans}
+    print(f"Trace: {path} ({len(spans)} spans, {len(pids)} processes)", file=out)
+
+    def table(title, rows, columns):
+        """columns: (header, row key, format spec); rows sorted by total time, slowest first."""
+        if not rows:
+            return
+        print(f"  {title:<40} " + " ".join(f"{header:>9}" for header, _, _ in columns), file=out)
+        for label, row in sorted(rows.items(), key=lambda kv: -kv[1]["seconds"]):
+            cells = " ".join(f"{'—' if row[key] is None else format(row[key], spec):>9}"
+                             for _, key, spec in columns)
+            print(f"    {label[:38]:<38} {cells}", file=out)
+
+    stages = defaultdict(lambda: {"calls": 0, "seconds": 0.0})
+    for e in spans:
+        if e["cat"] in ("stage", "process"):
+            label = e["name"] if e["cat"] == "stage" else "process " + e["name"].rsplit(" [", 1)[0]
+            stages[label]["calls"] += 1
+            stages[label]["seconds"] += e["dur"] / 1e6
+    table("Stages", stages, [("calls", "calls", "d"), ("total s", "seconds", ".2f")])
+
+    requests = defaultdict(lambda: {"calls": 0, "errors": 0, "retries": 0, "bytes": 0, "seconds": 0.0,
+                                    "max_ms": 0.0, "remaining": None})
+    for e in spans:
+        if e["cat"] not in ("http", "gh"):
+            continue
+        args, row = e["args"], requests[e["name"]]
+        row["calls"] += 1
+        row["errors"] += bool((args.get("status") or 0) >= 400 or args.get("code") or args.get("error"))
+        row["retries"] += args.get("retries") or 0
+        row["bytes"] += args.get("bytes") or 0
+        row["seconds"] += e["dur"] / 1e6
+        row["max_ms"] = max(row["max_ms"], e["dur"] / 1e3)
+        remaining = args.get("rate_limit_remaining")
+        if remaining is not None:
+            row["remaining"] = min(int(remaining), row["remaining"] if row["remaining"] is not None else 1 << 62)
+    for row in requests.values():
+        row["kib"] = row["bytes"] / 1024
+    table("Requests", requests, [("calls", "calls", "d"), ("errors", "errors", "d"), ("retries", "retries", "d"),
+                                 ("KiB", "kib", ".1f"), ("total s", "seconds", ".2f"), ("max ms", "max_ms", ".0f"),
+                                 ("remaining", "remaining", "d")])
+
+    graphql = [e["args"] for e in spans if e["cat"] == "github" and e["args"].get("cost") is not None]
+    if graphql:
+        remaining = [a["remaining"] for a in graphql if a.get("remaining") is not None]
+        print(f"  GitHub GraphQL: {len(graphql)} requests, {sum(a['cost'] for a in graphql)} points"
+              + (f", {min(remaining)} remaining" if remaining else ""), file=out)
+
+
+def _init():
+    global TRACE_PATH, _is_root
+    if TRACE_PATH is None:
+        return
+    TRACE_PATH = os.environ["HUMAND_TRACE"] = os.path.abspath(TRACE_PATH)
+    if not os.environ.get("HUMAND_TRACE_ROOT"):
+        _is_root = True
+        os.environ["HUMAND_TRACE_ROOT"] = str(os.getpid())
+        try:
+            os.remove(f"{TRACE_PATH}.events")
+        except FileNotFoundError:
+            pass
+    atexit.register(_flush)
+
+
+_init()
+
+
+def main(argv):
+    global TRACE_PATH
+    if argv[:1] == ["finish"]:
+        path = argv[1] if len(argv) > 1 else os.environ.get("HUMAND_TRACE")
+        if not path:
+            print("Usage: python3 -m hulib.trace finish [<file>] (or set HUMAND_TRACE)", file=sys.stderr)
+            return 1
+        TRACE_PATH = None  # this process only merges; it adds no spans of its own
+        finish(path)
+        return 0
+    if argv[:1] == ["summary"] and len(argv) == 2:
+        with open(argv[1]) as f:
+            print_summary(json.load(f)["traceEvents"], argv[1], sys.stdout)
+        return 0
+    print("Usage: python3 -m hulib.trace finish [<file>] | summary <file>", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
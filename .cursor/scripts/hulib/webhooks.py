@@ -0,0 +1,193 @@
+"""Jira and GitHub webhook payloads → the shapes the sprint report keeps.
+
+The report daemon (hulib/daemon.py) applies these events to its in-memory
+sprint state instead of refetching the sprint:
+
+    jira_event(payload)            → ("upsert" | "delete", issue) or None
+    github_event(event, payload)   → {"type": "pull_request" | "push" | "checks", "repo": ..., ...} or None
+
+A Jira issue is returned raw (generate-sprint-report.py compacts it). Webhooks
+carry the Sprint custom field (SPRINT_CUSTOM_FIELD, a list of sprints) rather
+than the `sprint` field the REST search returns; the active sprint found there
+is copied to `sprint` so both look the same. Only an active sprint counts, as
+in the sprint search (`sprint in openSprints()`): an issue moved to a future
+sprint leaves the report. A GitHub pull request becomes a PR in
+the PR_KEYS shape search-prs-for-keys.sh prints (state OPEN / CLOSED / MERGED).
+Reviews, check suites, check runs and commit statuses all become "checks": they
+only mark review status (hulib/reviews.py) for a refresh.
+
+Both senders can sign the body with a shared secret (`X-Hub-Signature-256` from
+GitHub, `X-Hub-Signature` from Jira, both `sha256=<hmac>`); see verify().
+
+Environment:
+    HUMAND_WEBHOOK_SECRET  shared secret: the daemon rejects unsigned payloads, `post` signs them;
+                           required to serve on a non-loopback address
+
+CLI:
+    python3 -m hulib.webhooks post <daemon-url> [--event <github-event>] <payload.json>...
+        # replay recorded payloads (a JSON object, array or NDJSON per file);
+        # each goes to /webhooks/jira or /webhooks/github by its shape
+"""
+
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+from .jsonio import iter_json
+
+SPRINT_CUSTOM_FIELD = "customfield_10020"
+
+JIRA_UPSERT_EVENTS = {"jira:issue_created", "jira:issue_updated"}
+JIRA_DELETE_EVENTS = {"jira:issue_deleted"}
+
+CHECK_EVENTS = {"pull_request_review", "check_suite", "check_run", "status"}
+
+DEFAULT_PORT = 8765
+
+
+def sign(secret, body):
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify(secret, body, headers):
+    """True when no secret is configured or the body carries a matching signature."""
+    if not secret:
+        return True
+    signature = headers.get("X-Hub-Signature-256") or headers.get("X-Hub-Signature") or ""
+    return hmac.compare_digest(signature, sign(secret, body))
+
+
+def is_loopback(host):
+    """Whether host (a --host value) only accepts local connections."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def issue_sprints(fields):
+    """Sprints an issue belongs to: the `sprint` field, else the Sprint custom field."""
+    sprint = fields.get("sprint")
+    if isinstance(sprint, dict):
+        return [sprint]
+    return [s for s in fields.get(SPRINT_CUSTOM_FIELD) or [] if isinstance(s, dict)]
+
+
+def jira_event(payload):
+    """Jira webhook payload → ("upsert" | "delete", issue), or None for other events."""
+    event = payload.get("webhookEvent")
+    issue = payload.get("issue")
+    if not issue or not issue.get("key") or event not in JIRA_UPSERT_EVENTS | JIRA_DELETE_EVENTS:
+        return None
+    if event in JIRA_DELETE_EVENTS:
+        return "delete", issue
+    fields = dict(issue.get("fields") or {})
+    active = [s for s in issue_sprints(fields) if s.get("state", "active") == "active"]
+    fields["sprint"] = active[-1] if active else None
+    return "upsert", {**issue, "fields": fields}
+
+
+def in_sprint(fields, sprint=None):
+    """Whether a jira_event() issue is in the named sprint, or in an active sprint when sprint is None."""
+    if sprint is None:
+        return bool(fields.get("sprint"))
+    return sprint in {s.get("name") for s in issue_sprints(fields) + (fields.get(SPRINT_CUSTOM_FIELD) or [])
+                      if isinstance(s, dict)}
+
+
+def github_pr(repo, pr):
+    """REST pull_request object → PR_KEYS dict (the GraphQL states the search returns)."""
+    state = "MERGED" if pr.get("merged_at") else (pr.get("state") or "").upper()
+    return {"repo": repo, "number": pr["number"], "title": pr.get("title") or "", "url": pr.get("html_url") or "",
+            "headRefName": (pr.get("head") or {}).get("ref") or "", "state": state,
+            "isDraft": bool(pr.get("draft")), "mergedAt": pr.get("merged_at")}
+
+
+def guess_event(payload):
+    """GitHub event name from the payload shape, for recordings without the X-GitHub-Event header."""
+    if "webhookEvent" in payload:
+        return None
+    if "review" in payload and "pull_request" in payload:
+        return "pull_request_review"
+    for event in ("pull_request", "check_suite", "check_run"):
+        if event in payload:
+            return event
+    if "ref" in payload and "before" in payload:
+        return "push"
+    if "sha" in payload and "branches" in payload:
+        return "status"
+    return None
+
+
+def github_event(event, payload):
+    """GitHub webhook (event name, payload) → normalized event dict, or None if irrelevant."""
+    event = event or guess_event(payload)
+    repo = (payload.get("repository") or {}).get("name")
+    if not repo:
+        return None
+    if event == "pull_request" and payload.get("pull_request"):
+        return {"type": "pull_request", "repo": repo, "action": payload.get("action"),
+                "pr": github_pr(repo, payload["pull_request"])}
+    if event == "push":
+        ref = payload.get("ref") or ""
+        if not ref.startswith("refs/heads/"):
+            return None
+        return {"type": "push", "repo": repo, "branch": ref[len("refs/heads/"):],
+                "created": bool(payload.get("created")), "deleted": bool(payload.get("deleted"))}
+    if event in CHECK_EVENTS:
+        body = payload.get(event) or {}
+        pulls = body.get("pull_requests") or []
+        if payload.get("pull_request"):
+            pulls = [payload["pull_request"]]
+        branches = [body.get("head_branch")] if body.get("head_branch") else []
+        branches += [b.get("name") for b in payload.get("branches") or [] if b.get("name")]
+        return {"type": "checks", "repo": repo, "numbers": sorted({p["number"] for p in pulls if p.get("number")}),
+                "branches": sorted(set(branches))}
+    return None
+
+
+def post(url, payload, event=None, secret=None):
+    """Send one payload to the daemon at url → (HTTP status, response body)."""
+    body = json.dumps(payload).encode()
+    source = "jira" if "webhookEvent" in payload else "github"
+    headers = {"Content-Type": "application/json"}
+    if source == "github":
+        headers["X-GitHub-Event"] = event or guess_event(payload) or ""
+    if secret:
+        headers["X-Hub-Signature-256" if source == "github" else "X-Hub-Signature"] = sign(secret, body)
+    request = urllib.request.Request(f"{url.rstrip('/')}/webhooks/{source}", body, headers, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=30) as resp:
+            return resp.status, resp.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode()
+
+
+def main(argv):
+    if len(argv) < 3 or argv[0] != "post":
+        print(__doc__.split("CLI:")[1], file=sys.stderr)
+        return 1
+    url, args = argv[1], argv[2:]
+    event = None
+    if args[:1] == ["--event"] and len(args) > 2:
+        event, args = args[1], args[2:]
+    secret = os.environ.get("HUMAND_WEBHOOK_SECRET")
+    failed = 0
+    for path in args:
+        with open(path) as f:
+            for payload in iter_json(f):
+                status, body = post(url, payload, event, secret)
+                print(f"{path}: {status} {body.strip()}", file=sys.stderr)
+                failed += status >= 300
+    return 3 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
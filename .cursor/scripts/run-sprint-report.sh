@@ -2,13 +2,50 @@
 # run-sprint-report.sh — End-to-end sprint report generator.
 #
 # Resolves team → project key, fetches live Jira data, searches GitHub PRs
-# for tickets missing dev info, and calls generate-sprint-report.py.
+# for tickets missing dev info (while scanning for WIP branches without a PR;
+# --no-branches skips it), fetches review decision + CI status of the open PRs
+# (--no-reviews skips it), and renders with generate-sprint-report.py.
+# All stages run in a single Python process (sprint-report.py run), which keeps
+# the issues in memory between stages instead of re-reading tickets.json.
 #
-# Always queries live data. Never reads from reports/ or any cache.
+# Always queries live data. Never reads from reports/.
+#
+# --cache (or HUMAND_CACHE=1) turns on the shared on-disk response cache
+# (hulib/cache.py): Jira responses are revalidated with conditional requests and
+# only reused on a 304; `gh` results are reused for HUMAND_CACHE_GH_MAX_AGE
+# seconds. --fresh bypasses the cache entirely, even when HUMAND_CACHE=1.
 #
 # Usage:
 #   ./run-sprint-report.sh shark
 #   ./run-sprint-report.sh --team SQSH --sprint "Shark 60" -o reports/SQSH-2026-02-20.md
+#   ./run-sprint-report.sh shark --cache
+#   ./run-sprint-report.sh shark --snapshot
+#   ./run-sprint-report.sh shark --pr-index
+#   ./run-sprint-report.sh --all-teams -o reports/2026-02-20/
+#   ./run-sprint-report.sh shark --post-jira --post-confluence ENG --parent 12345 --dry-run
+#   ./run-sprint-report.sh shark --changelog
+#
+# --snapshot keeps a per-project/sprint snapshot (hulib/snapshot.py) of issues and
+# fallback PRs. Reruns only fetch issues updated since the last run (plus the
+# sprint's key list) and PRs updated since then, merge them into the snapshot and
+# render exactly what a full refresh would. --fresh rebuilds the snapshot from scratch.
+#
+# --pr-index answers the fallback from the local PR ↔ ticket index (hulib/prindex.py)
+# instead of a GitHub search: it is synced with the PRs updated since its watermark
+# (usually one GraphQL request), then queried locally.
+#
+# --all-teams covers every squad in teams.json with one combined Jira query
+# (`project in (...)`, each project's open sprint) and one shared GitHub PR search,
+# then renders one report per project in parallel plus an org roll-up (ORG.md)
+# into the -o directory.
+#
+# --changelog adds the Burndown and Tiempos de Ciclo sections, from the tickets'
+# Jira changelogs (fetched in bulk, only what changed since the last run; see
+# hulib/changelog.py).
+#
+# --post-jira / --post-confluence SPACE [--parent ID] publish after the render: only
+# the ticket comments and report sections whose content changed since the last
+# publish are sent (hulib/publish.py); --dry-run prints the planned calls instead.
 #
 # Requires:
 #   JIRA_EMAIL + JIRA_API_TOKEN  (for Jira REST)
@@ -16,179 +53,26 @@
 #
 # Optional:
 #   JIRA_BASE_URL (default: https://humand.atlassian.net)
+#   HUMAND_TRACE=<file>  trace every stage, Jira request and `gh` call (this run and
+#                        its helper scripts) into a Chrome trace file and print a
+#                        per-stage / per-endpoint summary table (hulib/trace.py)
+#   HUMAND_METRICS=0     do not record the sprint in the metrics store queried by
+#                        `python3 -m hulib.metrics velocity|carry-over|throughput`
+#   HUMAND_RATE_LIMITS   per-host request budgets shared by every Jira/GitHub call of
+#                        all running scripts (default: api.github.com=10/20,
+#                        *.atlassian.net=10/20 per second/burst; hulib/ratelimit.py);
+#                        HUMAND_RATE_LIMIT=0 turns the scheduler off
 
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
-TEAMS_FILE="$(cd "$SCRIPT_DIR/.." && pwd)/teams.json"
-
-TEAM=""
-SPRINT=""
-OUT=""
-
-while [[ $# -gt 0 ]]; do
-  case "$1" in
-    --team)   TEAM="$2";   shift 2 ;;
-    --sprint) SPRINT="$2"; shift 2 ;;
-    -o|--output) OUT="$2"; shift 2 ;;
-    -h|--help)
-      echo "Usage: $0 [--team] <alias|KEY> [--sprint '<NAME>'] [-o out.md]"
-      exit 0
-      ;;
-    -*) echo "Unknown flag: $1" >&2; exit 1 ;;
-    *)  TEAM="${TEAM:-$1}"; shift ;;
-  esac
-done
-
-[[ -z "$TEAM" ]] && { echo "Error: team is required. Usage: $0 <team> [--sprint '<NAME>'] [-o out.md]" >&2; exit 1; }
-
-# --- Resolve team → project key ---
-if [[ ! -f "$TEAMS_FILE" ]]; then
-  echo "Error: teams.json not found at $TEAMS_FILE" >&2
-  exit 2
-fi
-
-PROJECT=$(python3 -c "
-import json, sys
-team = sys.argv[1].strip()
-with open(sys.argv[2]) as f:
-    data = json.load(f)
-# Direct key match
-if team in data and 'project_key' in data[team]:
-    print(data[team]['project_key']); sys.exit(0)
-# Alias match (case-insensitive)
-team_lower = team.lower()
-for entry in data.values():
-    if not isinstance(entry, dict) or 'aliases' not in entry:
-        continue
-    if team_lower in [a.lower() for a in entry.get('aliases', [])]:
-        print(entry['project_key']); sys.exit(0)
-# Looks like a Jira key?
-if team.isupper() and 2 <= len(team) <= 6 and team.isalpha():
-    print(team); sys.exit(0)
-print(''); sys.exit(1)
-" "$TEAM" "$TEAMS_FILE" 2>/dev/null) || true
-
-if [[ -z "$PROJECT" ]]; then
-  echo "Error: Unknown team '$TEAM'. Not in teams.json and doesn't look like a Jira key." >&2
-  exit 2
-fi
-
-echo "==> Team: $TEAM → Project: $PROJECT" >&2
-
-# --- Preflight checks ---
-if ! command -v gh &>/dev/null; then
-  echo "Error: gh CLI not found. Install from https://cli.github.com/" >&2
-  exit 3
-fi
-if ! gh auth status &>/dev/null; then
-  echo "Error: gh not authenticated. Run: gh auth login" >&2
-  exit 3
-fi
-
-EMAIL="${JIRA_EMAIL:-${ATLASSIAN_EMAIL:-${JIRA_USERNAME:-${JIRA_USER:-}}}}"
-TOKEN="${JIRA_API_TOKEN:-${ATLASSIAN_API_TOKEN:-${JIRA_TOKEN:-}}}"
-if [[ -z "$EMAIL" || -z "$TOKEN" ]]; then
-  echo "Error: Jira credentials missing. Set JIRA_EMAIL + JIRA_API_TOKEN." >&2
-  exit 3
-fi
-
-# --- Fetch tickets ---
-tmpdir=$(mktemp -d)
-trap 'rm -rf "$tmpdir"' EXIT
-
-tickets_json="$tmpdir/tickets.json"
-prs_json="$tmpdir/prs.json"
-
-echo "==> Fetching sprint tickets from Jira..." >&2
-"$SCRIPT_DIR/fetch-jira-sprint-issues.sh" \
-  --project "$PROJECT" \
-  ${SPRINT:+--sprint "$SPRINT"} \
-  > "$tickets_json"
-
-ticket_count=$(python3 -c "import json; print(len(json.load(open('$tickets_json'))))")
-echo "==> Found $ticket_count tickets" >&2
-
-if [[ "$ticket_count" -eq 0 ]]; then
-  echo "No tickets found in the active sprint for $PROJECT." >&2
-  echo "Verify the project key and that a sprint is active in Jira." >&2
-  exit 4
-fi
-
-# --- Extract keys missing dev info (for GitHub fallback search) ---
-keys_needing_search=$(python3 -c "
-import json, sys, re
-with open('$tickets_json') as f:
-    issues = json.load(f)
-for issue in issues:
-    fields = issue.get('fields', {})
-    dev = fields.get('customfield_10000', '') or ''
-    branch = fields.get('customfield_10097') or ''
-    has_pr = bool(re.search(r'\"count\":\s*[1-9]', str(dev)))
-    has_branch = bool(branch)
-    if not has_pr and not has_branch:
-        print(issue['key'])
-")
-
-if [[ -n "$keys_needing_search" ]]; then
-  count=$(echo "$keys_needing_search" | wc -l | tr -d ' ')
-  echo "==> Searching GitHub PRs for $count tickets missing dev info..." >&2
-  echo "$keys_needing_search" | tr '\n' ' ' | "$SCRIPT_DIR/search-prs-for-keys.sh" - > "$prs_json" 2>/dev/null
-else
-  echo "==> All tickets have Jira dev info, skipping GitHub fallback search" >&2
-  echo "[]" > "$prs_json"
-fi
-
-# --- Extract sprint metadata ---
-SPRINT_NAME="${SPRINT:-$(python3 -c "
-import json
-with open('$tickets_json') as f:
-    issues = json.load(f)
-for i in issues:
-    sprint = i.get('fields', {}).get('sprint') or {}
-    if sprint.get('name'):
-        print(sprint['name']); break
-else:
-    print('')
-")}"
-
-START_DATE="$(python3 -c "
-import json
-with open('$tickets_json') as f:
-    issues = json.load(f)
-for i in issues:
-    sprint = i.get('fields', {}).get('sprint') or {}
-    if sprint.get('startDate'):
-        print(sprint['startDate'][:10]); break
-else:
-    print('unknown')
-")"
-
-END_DATE="$(python3 -c "
-import json
-with open('$tickets_json') as f:
-    issues = json.load(f)
-for i in issues:
-    sprint = i.get('fields', {}).get('sprint') or {}
-    if sprint.get('endDate'):
-        print(sprint['endDate'][:10]); break
-else:
-    print('unknown')
-")"
-
-echo "==> Sprint: $SPRINT_NAME ($START_DATE — $END_DATE)" >&2
 
-# --- Generate report ---
-echo "==> Generating report..." >&2
-python3 "$SCRIPT_DIR/generate-sprint-report.py" \
-  --tickets "$tickets_json" \
-  --prs "$prs_json" \
-  --sprint "${SPRINT_NAME:-${PROJECT} Sprint}" \
-  --start "${START_DATE:-unknown}" \
-  --end "${END_DATE:-unknown}" \
-  --project "$PROJECT" \
-  ${OUT:+--output "$OUT"}
+case "${1:-}" in
+  -h|--help)
+    echo "Usage: $0 [--team] <alias|KEY> [--sprint '<NAME>'] [-o out.md] [--cache|--fresh] [--snapshot] [--pr-index] [--no-reviews] [--no-branches] [--changelog] [--post-jira] [--post-confluence SPACE [--parent ID]] [--dry-run]"
+    echo "       $0 --all-teams -o <dir> [--cache|--fresh] [--snapshot] [--pr-index] [--no-reviews] [--no-branches] [--changelog]"
+    exit 0
+    ;;
+esac
 
-if [[ -n "$OUT" ]]; then
-  echo "==> Report written to $OUT" >&2
-fi
+exec python3 "$SCRIPT_DIR/sprint-report.py" run "$@"
@@ -4,17 +4,43 @@
 # Usage:
 #   ./search-prs-for-keys.sh <keys-file> [output-file]
 #   echo "SQSH-3288 SQSH-3491" | ./search-prs-for-keys.sh - [output-file]
+#   echo "SQSH-3288 SQSH-3491" | ./search-prs-for-keys.sh --updated-since 2026-02-19 -
+#   echo "SQSH-3288 SQSH-3491" | ./search-prs-for-keys.sh --index -
+#
+# --updated-since DATE  Delta mode for snapshot refreshes: instead of searching per key
+#                       batch, list PRs updated on/after DATE once per repo and keep the
+#                       ones whose title/branch mention one of the keys. Exits 1 if any
+#                       repo's listing fails, is not valid JSON or reaches the listing
+#                       limit (no partial delta: the caller runs a full search instead).
+# --index               Answer from the local PR ↔ ticket index (hulib/prindex.py): sync it
+#                       with the PRs updated since its watermark (one GraphQL request once
+#                       built), then look the keys up locally. The first run builds it.
 #
 # <keys-file>  File with ticket keys (whitespace/newline-separated), or "-" for stdin.
 # [output-file] Optional. Writes consolidated JSON array to this file. Defaults to stdout.
 #
-# Output: JSON array of objects:
+# Output: JSON array of objects, ordered by (repo, number):
 #   { repo, number, title, url, headRefName, state, isDraft, mergedAt }
 #
+# Key search (hulib/github.py): keys are packed into GitHub search queries up to
+# the search limits (5 operators / 256 chars; each key searches title text and
+# head: branch), every query covers all repos, up to 20 queries go out as aliases
+# of one `gh api graphql` request, and results are paged with cursors until
+# exhausted. Queries matching more than GitHub's 1000-result search cap are
+# reported on stderr.
+#
 # Requires: gh CLI authenticated against HumandDev org.
+#
+# Every `gh` call goes through hulib/gh.py: it takes a slot from the shared
+# GitHub rate-limit budget first (hulib/ratelimit.py; HUMAND_RATE_LIMIT=0 skips
+# it), and with HUMAND_CACHE=1 its result is reused for HUMAND_CACHE_GH_MAX_AGE
+# seconds.
+# With HUMAND_TRACE=<file>, every `gh` call is traced (hulib/trace.py).
 
 set -euo pipefail
 
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+
 REPOS=(
   humand-main-api
   humand-web
@@ -24,9 +50,32 @@ REPOS=(
   hu-translations
 )
 
-BATCH_SIZE=10
+gh_scheduled() {
+  if [[ "${HUMAND_RATE_LIMIT:-}" == "0" && "${HUMAND_CACHE:-}" != "1" && -z "${HUMAND_TRACE:-}" ]]; then
+    gh "$@"
+  else
+    PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}" python3 -m hulib.gh "$@"
+  fi
+}
+
+UPDATED_SINCE=""
+USE_INDEX=""
+while [[ $# -gt 0 ]]; do
+  case "$1" in
+    --updated-since)
+      UPDATED_SINCE="${2:?--updated-since requires a YYYY-MM-DD date}"
+      shift 2
+      ;;
+    --index)
+      USE_INDEX=1
+      shift
+      ;;
+    *) break ;;
+  esac
+done
+DELTA_LIMIT=1000
 
-keys_file="${1:?Usage: search-prs-for-keys.sh <keys-file> [output-file]}"
+keys_file="${1:?Usage: search-prs-for-keys.sh [--updated-since DATE | --index] <keys-file> [output-file]}"
 output_file="${2:-}"
 
 if [[ "$keys_file" == "-" ]]; then
@@ -35,6 +84,8 @@ else
   keys=$(cat "$keys_file")
 fi
 
+[[ -n "$output_file" ]] && exec > "$output_file"
+
 mapfile -t KEY_ARRAY < <(echo "$keys" | tr ',' ' ' | xargs -n1 | sort -u)
 
 if [[ ${#KEY_ARRAY[@]} -eq 0 ]]; then
@@ -42,45 +93,64 @@ if [[ ${#KEY_ARRAY[@]} -eq 0 ]]; then
   exit 0
 fi
 
+if [[ -n "$USE_INDEX" ]]; then
+  PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}" \
+    exec python3 -m hulib.prindex lookup "${REPOS[@]}" -- "${KEY_ARRAY[@]}"
+fi
+
+if [[ -z "$UPDATED_SINCE" ]]; then
+  PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}" \
+    exec python3 -m hulib.github search-prs "${REPOS[@]}" -- "${KEY_ARRAY[@]}"
+fi
+
 tmpdir=$(mktemp -d)
-trap 'rm -rf "$tmpdir"' EXIT
-
-batch_idx=0
-for (( i=0; i<${#KEY_ARRAY[@]}; i+=BATCH_SIZE )); do
-  batch=("${KEY_ARRAY[@]:i:BATCH_SIZE}")
-
-  # Build two queries: one for title text, one for branch names (head: qualifier)
-  title_query=$(printf " OR %s" "${batch[@]}")
-  title_query="${title_query:4}"
-
-  head_parts=()
-  for k in "${batch[@]}"; do
-    lower_k=$(echo "$k" | tr '[:upper:]' '[:lower:]')
-    head_parts+=("head:${lower_k}")
-  done
-  head_query=$(printf " OR %s" "${head_parts[@]}")
-  head_query="${head_query:4}"
-
-  combined_query="${title_query} OR ${head_query}"
-
-  for repo in "${REPOS[@]}"; do
-    outfile="$tmpdir/batch_${batch_idx}_${repo}.json"
-    gh pr list --repo "HumandDev/$repo" \
-      --search "$combined_query" \
-      --state all \
-      --limit 100 \
-      --json number,title,state,url,isDraft,headRefName,mergedAt \
-      > "$outfile" 2>/dev/null &
-  done
-  wait
-  batch_idx=$((batch_idx + 1))
+trace_root=""
+if [[ -n "${HUMAND_TRACE:-}" && -z "${HUMAND_TRACE_ROOT:-}" ]]; then
+  # No traced parent: this script owns the trace file, its python children only append spans.
+  export HUMAND_TRACE_ROOT=$$
+  trace_root=1
+  rm -f "$HUMAND_TRACE.events"
+fi
+finish() {
+  rm -rf "$tmpdir"
+  if [[ -n "$trace_root" ]]; then
+    PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}" python3 -m hulib.trace finish "$HUMAND_TRACE"
+  fi
+}
+trap finish EXIT
+
+# A repo whose listing fails must fail the whole delta: a partial delta would be merged
+# into the snapshot as if it were complete and its PRs skipped by every later window.
+pids=()
+for repo in "${REPOS[@]}"; do
+  gh_scheduled pr list --repo "HumandDev/$repo" \
+    --search "updated:>=${UPDATED_SINCE}" \
+    --state all \
+    --limit "$DELTA_LIMIT" \
+    --json number,title,state,url,isDraft,headRefName,mergedAt \
+    > "$tmpdir/delta_${repo}.json" &
+  pids+=("$!")
+done
+failed=0
+for i in "${!pids[@]}"; do
+  if ! wait "${pids[$i]}"; then
+    echo "Error: listing PRs of ${REPOS[$i]} updated since ${UPDATED_SINCE} failed" >&2
+    failed=1
+  fi
 done
+[[ $failed -eq 0 ]] || exit 1
 
-# Merge all JSON arrays, injecting repo name into each object
-python3 - "$tmpdir" <<'PYEOF'
+# Merge the per-repo deltas, keeping PRs that mention a key and injecting the repo name
+PYTHONPATH="$SCRIPT_DIR${PYTHONPATH:+:$PYTHONPATH}" \
+  python3 - "$tmpdir" "$UPDATED_SINCE" "$DELTA_LIMIT" "${KEY_ARRAY[@]}" <<'PYEOF'
 import json, sys, os, re
 
+from hulib.keys import extract_ticket_keys
+
 tmpdir = sys.argv[1]
+updated_since = sys.argv[2]
+delta_limit = int(sys.argv[3])
+wanted = set(sys.argv[4:])
 all_prs = []
 seen = set()
 
@@ -93,8 +163,16 @@ for fname in sorted(os.listdir(tmpdir)):
     with open(fpath) as f:
         try:
             prs = json.load(f)
-        except json.JSONDecodeError:
-            continue
+        except json.JSONDecodeError as e:
+            sys.exit(f"Error: PR listing of {repo} is not valid JSON ({e})")
+    if not isinstance(prs, list):
+        sys.exit(f"Error: PR listing of {repo} is not a JSON array")
+    if len(prs) >= delta_limit:
+        # Truncated: the PRs past the limit were never listed, so this delta is partial too.
+        sys.exit(f"Error: {repo} has {len(prs)}+ PRs updated since {updated_since}; "
+                 f"older ones were not listed. Run a full search instead.")
+    prs = [pr for pr in prs
+           if extract_ticket_keys(pr.get("title", ""), pr.get("headRefName", "")) & wanted]
     for pr in prs:
         uid = f"{repo}#{pr['number']}"
         if uid not in seen:
@@ -102,6 +180,7 @@ for fname in sorted(os.listdir(tmpdir)):
             pr['repo'] = repo
             all_prs.append(pr)
 
+all_prs.sort(key=lambda p: (p["repo"], p["number"]))
 json.dump(all_prs, sys.stdout, indent=2)
 PYEOF
 
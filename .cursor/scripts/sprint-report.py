@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+"""sprint-report.py — End-to-end sprint report in one process.
+
+Usage:
+    python3 sprint-report.py run shark
+    python3 sprint-report.py run --team SQSH --sprint "Shark 60" -o reports/SQSH-2026-02-20.md
+    python3 sprint-report.py run shark --cache
+    python3 sprint-report.py run shark --snapshot
+    python3 sprint-report.py run shark --pr-index
+    python3 sprint-report.py run --all-teams -o reports/2026-02-20/
+    python3 sprint-report.py run shark --post-jira --post-confluence ENG --parent 12345 [--dry-run]
+    python3 sprint-report.py run shark --changelog
+    python3 sprint-report.py reviews --tickets tickets.json [--prs prs.json] -o reviews.json
+    python3 sprint-report.py branches --tickets tickets.json -o branches.json
+    python3 sprint-report.py changelog --tickets tickets.json -o changelog.json
+    python3 sprint-report.py serve [team...] [--port 8765]
+
+run-sprint-report.sh is a thin wrapper around `run`; see it for the flag reference.
+
+Pipeline: resolve team → fetch sprint issues (Jira REST, pooled + paged
+concurrently) → GitHub fallback search for tickets without Jira dev info
+(search-prs-for-keys.sh, or the local PR index with --pr-index) → review decision and CI status of the open PRs
+(hulib/reviews.py, a few aliased GraphQL requests) → render with
+generate-sprint-report.py. The WIP branch scan (hulib/branches.py) runs alongside
+the PR search. Issues, PRs, reviews and branches are kept in memory between stages, and the rendered
+sprint is recorded in the historical metrics store (hulib/metrics.py). Independent work runs concurrently: the
+`gh auth status` preflight overlaps the Jira fetch, and in snapshot mode the
+full search for new keys overlaps the updated-since delta for known ones.
+
+--changelog syncs the tickets' Jira changelogs (hulib/changelog.py, fetched in
+bulk and stored by history id) alongside the review lookup and adds the
+Burndown and Tiempos de Ciclo sections.
+
+--post-jira / --post-confluence add an export stage after the render: only
+the ticket comments and report sections that changed since the last publish
+are sent (hulib/publish.py).
+
+`serve` keeps the teams' sprints in memory, applies Jira and GitHub webhooks
+to them and serves reports and staging status from a local HTTP endpoint
+(hulib/daemon.py); recorded payloads can be replayed with
+`python3 -m hulib.webhooks post`.
+
+With HUMAND_TRACE=<file>, every stage, Jira request and `gh` call (including
+those of the helper scripts) is traced; see hulib/trace.py.
+
+Exit codes: 2 usage error, unknown team or teams.json missing; 3 missing tool,
+credentials or Jira error, 4 no tickets in the sprint.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+from hulib import ratelimit, snapshot, trace  # noqa: E402
+from hulib.branches import branch_cache_from_env, scan_branches  # noqa: E402
+from hulib.cache import cache_from_env  # noqa: E402
+from hulib.changelog import fetch_changelogs  # noqa: E402
+from hulib.client import HttpError  # noqa: E402
+from hulib.daemon import DEFAULT_SWEEP, Daemon  # noqa: E402
+from hulib.github import GitHubError  # noqa: E402
+from hulib.prindex import lookup_prs  # noqa: E402
+from hulib.publish import DEFAULT_CONCURRENCY, PublishStore, execute, plan_comments, plan_page, publish_path  # noqa: E402
+from hulib.jsonio import iter_json  # noqa: E402
+from hulib.metrics import metrics_db_from_env  # noqa: E402
+from hulib.reviews import fetch_reviews  # noqa: E402
+from hulib.jira import SPRINT_FIELDS, SPRINT_ORDER, JiraClient, jira_settings, sprint_jql  # noqa: E402
+from hulib.teams import TEAMS_FILE, load_teams, project_keys, resolve_project, team_names  # noqa: E402
+from hulib.webhooks import is_loopback  # noqa: E402
+from hulib.webhooks import DEFAULT_PORT  # noqa: E402
+
+SEARCH_PRS = os.path.join(SCRIPT_DIR, "search-prs-for-keys.sh")
+STAGING_STATUS = os.path.join(os.path.dirname(SCRIPT_DIR), "skills", "hu-team-staging-status",
+                              "team-staging-status.sh")
+
+
+class Abort(Exception):
+    """Stop the pipeline with a message and exit code."""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+def log(message):
+    print(f"==> {message}", file=sys.stderr)
+
+
+def load_generator():
+    """Import generate-sprint-report.py as `generate_sprint_report`.
+
+    Registered in sys.modules so its functions pickle by reference for the
+    --all-teams worker processes. This runs at import time, so spawn-started
+    workers (macOS) register it again when they re-import this script.
+    """
+    spec = importlib.util.spec_from_file_location(
+        "generate_sprint_report", os.path.join(SCRIPT_DIR, "generate-sprint-report.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+gen = load_generator()
+
+
+def gh_authenticated():
+    with trace.span("gh auth status"):
+        return subprocess.run(["gh", "auth", "status"], stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL).returncode == 0
+
+
+def search_prs(keys, updated_since=None):
+    """Run search-prs-for-keys.sh for keys → list of PR dicts (its warnings go to stderr)."""
+    if not keys:
+        return []
+    cmd = [SEARCH_PRS] + (["--updated-since", updated_since] if updated_since else []) + ["-"]
+    with trace.span("search PRs (delta)" if updated_since else "search PRs", keys=len(keys)) as info:
+        result = subprocess.run(cmd, input=" ".join(keys), stdout=subprocess.PIPE, text=True, check=True)
+        prs = json.loads(result.stdout or "[]")
+        info["prs"] = len(prs)
+    return prs
+
+
+def resolve(args):
+    """→ (project, team names) for the CLI arguments."""
+    if not os.path.isfile(args.teams_file):
+        raise Abort(f"Error: teams.json not found at {args.teams_file}", 2)
+    teams = load_teams(args.teams_file)
+    if args.all_teams:
+        projects = ",".join(project_keys(teams))
+        log(f"All teams → Projects: {projects}")
+        return projects, team_names(teams)
+    project = resolve_project(args.team, teams)
+    if not project:
+        raise Abort(f"Error: Unknown team '{args.team}'. Not in teams.json and doesn't look like a Jira key.", 2)
+    log(f"Team: {args.team} → Project: {project}")
+    return project, team_names(teams)
+
+
+def fetch_issues(project, sprint, snap, concurrency):
+    jql_filter = sprint_jql(project, sprint)
+    with trace.span("fetch Jira issues", snapshot=snap is not None), \
+            JiraClient.from_env(concurrency=concurrency) as jira:
+        if snap is not None:
+            return snapshot.refresh_issues(jira, jql_filter, SPRINT_ORDER, SPRINT_FIELDS, snap)
+        # Reduce each page's issues as they arrive; the snapshot above keeps its raw copies.
+        issues = jira.search_parallel(f"{jql_filter} ORDER BY {SPRINT_ORDER}", SPRINT_FIELDS)
+        return [gen.compact_issue(i) for i in issues]
+
+
+def fallback_prs(search_keys, snap, pool, use_index=False):
+    """GitHub fallback search; with a snapshot, only new keys get a full search.
+
+    With use_index, the local PR index is synced and queried instead; the search
+    only runs if the index was never built and cannot be synced.
+    """
+    if not search_keys:
+        log("All tickets have Jira dev info, skipping GitHub fallback search")
+        return []
+    if use_index:
+        log(f"Looking up PRs for {len(search_keys)} tickets missing dev info in the local PR index...")
+        try:
+            return lookup_prs(search_keys)
+        except GitHubError as e:
+            print(f"Warning: {e}; PR index unavailable, searching GitHub instead", file=sys.stderr)
+    since = snapshot.prs_since(snap) if snap is not None else ""
+    if not since:
+        log(f"Searching GitHub PRs for {len(search_keys)} tickets missing dev info...")
+        return search_prs(search_keys)
+
+    searched = set(snap.get("searched") or [])
+    new_keys = sorted(k for k in search_keys if k not in searched)
+    old_keys = sorted(k for k in search_keys if k in searched)
+    log(f"Searching GitHub PRs: {len(new_keys)} new keys, PRs updated since {since} for the rest...")
+    full = pool.submit(search_prs, new_keys)
+    delta = pool.submit(search_prs, old_keys, since)
+    try:
+        delta_prs = delta.result()
+    except subprocess.CalledProcessError:
+        # A partial delta must not reach merge_prs: it would move prs_synced_at past the PRs it missed.
+        print(f"Warning: PR delta since {since} failed; searching the {len(old_keys)} known keys in full",
+              file=sys.stderr)
+        delta_prs = search_prs(old_keys)
+    return full.result() + delta_prs
+
+
+def open_pr_reviews(tickets, prs):
+    """Review status of every open PR the report shows → reviews dict ({} if GitHub fails)."""
+    targets = gen.review_targets(tickets, prs)
+    if not targets:
+        return {}
+    log(f"Fetching review status for {len(targets)} open PRs...")
+    return review_status(targets)
+
+
+def review_status(targets):
+    """Review status of review targets → reviews dict ({} if GitHub fails)."""
+    cache = cache_from_env()
+    try:
+        with trace.span("fetch PR reviews", prs=len(targets)):
+            return fetch_reviews(targets, cache=cache)
+    except GitHubError as e:
+        print(f"Warning: {e}; review status left empty", file=sys.stderr)
+        return {}
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def wip_branches(tickets):
+    """Branches without a PR for the sprint's tickets → branches dict ({} if GitHub fails)."""
+    cache, max_age = branch_cache_from_env()
+    try:
+        with trace.span("scan branches", keys=len(tickets)) as info:
+            branches = scan_branches([i["key"] for i in tickets], cache=cache, max_age=max_age)
+            info["tickets"] = len(branches)
+        return branches
+    except GitHubError as e:
+        print(f"Warning: {e}; WIP branches left empty", file=sys.stderr)
+        return {}
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def sprint_changelogs(tickets, concurrency):
+    """Changelogs of the tickets, synced with Jira → changelog.json dict (None if Jira fails)."""
+    log(f"Syncing changelogs of {len(tickets)} tickets...")
+    try:
+        return fetch_changelogs([i["key"] for i in tickets], concurrency=concurrency)
+    except HttpError as e:
+        print(f"Warning: Jira API returned HTTP {e.status or 'error'} ({e}); burndown and cycle times left out",
+              file=sys.stderr)
+        return None
+
+
+def render(args, project, names, tickets, prs, reviews, branches, history=None):
+    """Write the report → (sprint_name, start, end, data, markdown), reused by export; None with --all-teams.
+
+    markdown is None unless --format markdown.
+    """
+    if args.all_teams:
+        log("Generating per-team reports...")
+        with trace.span("render all teams", tickets=len(tickets)):
+            projects, rollup_path = gen.render_all_projects(tickets, prs, reviews, branches, args.format,
+                                                            args.output, names, metrics_db=metrics_db_from_env(),
+                                                            history=history)
+        log(f"Reports written to {args.output} ({len(projects)} teams + {os.path.basename(rollup_path)})")
+        return None
+
+    sprint_name, start, end = gen.sprint_metadata(tickets)
+    sprint_name = args.sprint or sprint_name or f"{project} Sprint"
+    log(f"Sprint: {sprint_name} ({start} — {end})")
+    log("Generating report...")
+    markdown = None
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        with trace.span("build ticket data", tickets=len(tickets), prs=len(prs)):
+            data = gen.build_ticket_data(tickets, prs, reviews, branches)
+        gen.record_metrics(metrics_db_from_env(), project, sprint_name, start, end, data)
+        with trace.span(f"render {args.format}"):
+            if args.format == "markdown":
+                markdown = gen.build_report(tickets, prs, reviews, branches, sprint_name, start, end, project,
+                                            data=data, history=history)
+                out.write(markdown)
+            else:
+                gen.write_rows(data, args.format, sprint_name, start, end, project, out, history)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.output:
+        log(f"Report written to {args.output}")
+    return sprint_name, start, end, data, markdown
+
+
+def check_tools():
+    if not shutil.which("gh"):
+        raise Abort("Error: gh CLI not found. Install from https://cli.github.com/", 3)
+    _, email, token = jira_settings()
+    if not email or not token:
+        raise Abort("Error: Jira credentials missing. Set JIRA_EMAIL + JIRA_API_TOKEN.", 3)
+
+
+def collect(args, project, snap, pool, gh_ok=None):
+    """Sprint issues, fallback PRs and WIP branches → (tickets, prs, branches, search_keys).
+
+    gh_ok is the pending `gh auth status` preflight, checked once the Jira fetch is done.
+    """
+    log("Fetching sprint tickets from Jira...")
+    try:
+        tickets = fetch_issues(project, args.sprint, snap, args.concurrency)
+    except HttpError as e:
+        raise Abort(f"Error: Jira API returned HTTP {e.status or 'error'}\n{e}", 3) from e
+    if gh_ok is not None and not gh_ok.result():
+        raise Abort("Error: gh not authenticated. Run: gh auth login", 3)
+
+    log(f"Found {len(tickets)} tickets")
+    if not tickets:
+        raise Abort(f"No tickets found in the active sprint for {project}.\n"
+                    "Verify the project key and that a sprint is active in Jira.", 4)
+
+    branches = None if args.no_branches else pool.submit(wip_branches, tickets)
+    search_keys = [i["key"] for i in tickets if gen.needs_pr_search(i)]
+    prs = fallback_prs(search_keys, snap, pool, args.pr_index)
+    branches = branches.result() if branches is not None else {}
+    return tickets, prs, branches, search_keys
+
+
+def run(args):
+    # --fresh wins over --cache / HUMAND_CACHE=1; set in os.environ so `gh` wrappers see it too.
+    if args.cache:
+        os.environ["HUMAND_CACHE"] = "1"
+    if args.fresh:
+        os.environ["HUMAND_CACHE"] = "0"
+
+    project, names = resolve(args)
+    check_tools()
+
+    snap = snapshot_file = None
+    if args.snapshot:
+        snapshot_file = snapshot.snapshot_path("ALL" if args.all_teams else project, args.sprint)
+        if args.fresh and os.path.exists(snapshot_file):
+            os.remove(snapshot_file)
+        snap = snapshot.load(snapshot_file)
+        log(f"Snapshot: {snapshot_file}")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        gh_ok = pool.submit(gh_authenticated)
+        tickets, prs, branches, search_keys = collect(args, project, snap, pool, gh_ok)
+
+    if snap is not None:
+        with trace.span("snapshot merge + save"):
+            prs = snapshot.merge_prs(snap, prs, search_keys)
+            snapshot.save(snapshot_file, snap)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        history = pool.submit(sprint_changelogs, tickets, args.concurrency) if args.changelog else None
+        reviews = {} if args.no_reviews else open_pr_reviews(tickets, prs)
+        history = history.result() if history is not None else None
+    rendered = render(args, project, names, tickets, prs, reviews, branches, history)
+    if args.post_jira or args.post_confluence:
+        export(args, project, tickets, prs, reviews, branches, rendered, history)
+
+
+def export(args, project, tickets, prs, reviews, branches, rendered, history=None):
+    """Post what changed since the last publish as Jira comments and/or the Confluence page.
+
+    rendered is render()'s result: the ticket data (and markdown) of the report just written.
+    """
+    sprint_name, start, end, data, markdown = rendered
+    with PublishStore(publish_path()) as store:
+        calls = []
+        if args.post_jira:
+            rows = gen.build_flat_rows(data.ticket_map, data.categories)
+            calls += plan_comments(store, f"{project}/{sprint_name}", sprint_name, rows)
+        if args.post_confluence:
+            if markdown is None:
+                markdown = gen.build_report(tickets, prs, reviews, branches, sprint_name, start, end, project,
+                                            data=data, history=history)
+            calls += plan_page(store, args.post_confluence, args.parent,
+                               f"Sprint Report: {sprint_name} — {project}", markdown)
+        log(f"{'Planned' if args.dry_run else 'Publishing'} {len(calls)} changed items...")
+        with trace.span("publish", calls=len(calls), dry_run=args.dry_run), \
+                JiraClient.from_env(concurrency=args.publish_concurrency, cache=None) as jira:
+            failed = execute(jira, store, calls, dry_run=args.dry_run)
+    if failed:
+        raise Abort(f"Error: {failed} of {len(calls)} publish calls failed; they are retried on the next publish", 3)
+
+
+def load_sprint(args, project):
+    """Daemon loader: one team's sprint, refreshed through its snapshot → (tickets, prs, reviews, branches)."""
+    snapshot_file = snapshot.snapshot_path(project, args.sprint)
+    snap = snapshot.load(snapshot_file)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        try:
+            tickets, prs, branches, search_keys = collect(args, project, snap, pool)
+        except Abort as e:
+            if e.code != 4:
+                raise
+            log(f"No tickets in the sprint of {project} yet")
+            return [], [], {}, {}
+    with trace.span("snapshot merge + save"):
+        prs = snapshot.merge_prs(snap, prs, search_keys)
+        snapshot.save(snapshot_file, snap)
+    reviews = {} if args.no_reviews else open_pr_reviews(tickets, prs)
+    return tickets, prs, reviews, branches
+
+
+def staging_status(project, name):
+    """team-staging-status.sh output for one team (TEAM_STATUS_* settings come from the environment)."""
+    env = {**os.environ, "TEAM_NAME": name, "TEAM_TICKET_PREFIX": project}
+    return subprocess.run([STAGING_STATUS], env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                          text=True, check=True).stdout
+
+
+def serve(args):
+    """`serve`: load the teams' sprints, then keep them current from webhooks (hulib/daemon.py)."""
+    # Set before the first request: the daemon's fetches, and its helper scripts', yield to interactive runs.
+    os.environ.setdefault("HUMAND_PRIORITY", ratelimit.BACKGROUND)
+    secret = os.environ.get("HUMAND_WEBHOOK_SECRET")
+    # Reachable from the network, an unsigned /webhooks endpoint lets anyone rewrite the served reports.
+    if not secret and not is_loopback(args.host):
+        raise Abort(f"Error: serving on {args.host} requires HUMAND_WEBHOOK_SECRET (unsigned webhooks are only "
+                    "accepted on a loopback address)", 2)
+    if not os.path.isfile(args.teams_file):
+        raise Abort(f"Error: teams.json not found at {args.teams_file}", 2)
+    teams = load_teams(args.teams_file)
+    projects = []
+    for team in args.teams or project_keys(teams):
+        project = resolve_project(team, teams)
+        if not project:
+            raise Abort(f"Error: Unknown team '{team}'. Not in teams.json and doesn't look like a Jira key.", 2)
+        projects.append(project)
+    check_tools()
+    if not gh_authenticated():
+        raise Abort("Error: gh not authenticated. Run: gh auth login", 3)
+
+    app = Daemon(gen, teams, sorted(set(projects)), team_names(teams),
+                 load=lambda project: load_sprint(args, project),
+                 search=lambda keys: fallback_prs(keys, None, None, args.pr_index),
+                 reviews=None if args.no_reviews else review_status,
+                 staging=None if args.no_staging else staging_status,
+                 sprint=args.sprint, sweep_every=args.sweep)
+    log(f"Loading {len(app.states)} teams...")
+    try:
+        app.load_all()
+    except HttpError as e:
+        raise Abort(f"Error: Jira API returned HTTP {e.status or 'error'}\n{e}", 3) from e
+    app.serve(args.host, args.port, secret)
+
+
+def write_json(obj, path):
+    out = open(path, "w") if path else sys.stdout
+    try:
+        json.dump(obj, out, indent=2)
+        out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def data_command(args):
+    """`reviews` / `branches` / `changelog`: write reviews.json, branches.json or changelog.json for tickets.json."""
+    with open(args.tickets) as f:
+        tickets = [gen.compact_issue(i) for i in iter_json(f)]
+    prs = []
+    if getattr(args, "prs", None):
+        with open(args.prs) as f:
+            prs = [gen.compact_pr(p) for p in iter_json(f)]
+    if args.command == "changelog":
+        _, email, token = jira_settings()
+        if not email or not token:
+            raise Abort("Error: Jira credentials missing. Set JIRA_EMAIL + JIRA_API_TOKEN.", 3)
+        try:
+            history = fetch_changelogs([i["key"] for i in tickets], concurrency=args.concurrency)
+        except HttpError as e:
+            raise Abort(f"Error: Jira API returned HTTP {e.status or 'error'}\n{e}", 3) from e
+        write_json(history, args.output)
+        if args.output:
+            log(f"Changelogs of {len(history['issues'])} tickets written to {args.output}")
+        return
+    if not shutil.which("gh"):
+        raise Abort("Error: gh CLI not found. Install from https://cli.github.com/", 3)
+    if args.command == "reviews":
+        result, what = open_pr_reviews(tickets, prs), "PRs"
+    else:
+        result, what = wip_branches(tickets), "tickets"
+    write_json(result, args.output)
+    if args.output:
+        log(f"{args.command.capitalize()} for {len(result)} {what} written to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end sprint report")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="Fetch live data and render the sprint report")
+    p.add_argument("team_arg", nargs="?", metavar="team", help="Team alias or Jira project key")
+    p.add_argument("--team", default=None, help="Team alias or Jira project key")
+    p.add_argument("--sprint", default=None, help="Sprint name (default: the open sprint)")
+    p.add_argument("-o", "--output", default=None, help="Output file (directory with --all-teams)")
+    p.add_argument("--format", default="markdown", choices=["markdown", "csv", "json"])
+    p.add_argument("--cache", action="store_true", help="Use the revalidating response cache (HUMAND_CACHE=1)")
+    p.add_argument("--fresh", action="store_true", help="Bypass the cache and rebuild the snapshot")
+    p.add_argument("--snapshot", action="store_true", help="Incremental refresh from the per-sprint snapshot")
+    p.add_argument("--all-teams", action="store_true", help="Every squad in teams.json; -o is a directory")
+    p.add_argument("--concurrency", type=int, default=int(os.environ.get("JIRA_CONCURRENCY", 6)),
+                   help="Jira pages in flight (default: $JIRA_CONCURRENCY or 6)")
+    p.add_argument("--pr-index", action="store_true",
+                   help="Fallback PRs from the local PR index (synced incrementally) instead of a GitHub search")
+    p.add_argument("--no-reviews", action="store_true", help="Skip the review/CI status lookup of open PRs")
+    p.add_argument("--no-branches", action="store_true", help="Skip the WIP branch scan")
+    p.add_argument("--changelog", action="store_true",
+                   help="Add the burndown and cycle-time sections from the tickets' Jira changelogs")
+    p.add_argument("--post-jira", action="store_true",
+                   help="Add/edit the report comment of tickets whose code activity changed since the last publish")
+    p.add_argument("--post-confluence", metavar="SPACE", default=None,
+                   help="Create the report page in SPACE, or update it if a section changed")
+    p.add_argument("--parent", default=None, help="Confluence parent page id (with --post-confluence)")
+    p.add_argument("--dry-run", action="store_true", help="Print the planned publish calls without sending them")
+    p.add_argument("--publish-concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                   help=f"Publish calls in flight (default: {DEFAULT_CONCURRENCY})")
+    p.add_argument("--teams-file", default=TEAMS_FILE, help=argparse.SUPPRESS)
+    r = sub.add_parser("reviews", help="Write reviews.json (review decision + CI status of open PRs)")
+    r.add_argument("--tickets", required=True, help="Jira issues (JSON array or NDJSON)")
+    r.add_argument("--prs", default=None, help="PRs from search-prs-for-keys.sh (optional)")
+    r.add_argument("-o", "--output", default=None, help="Output file (default: stdout)")
+    b = sub.add_parser("branches", help="Write branches.json (branches without a PR per ticket)")
+    b.add_argument("--tickets", required=True, help="Jira issues (JSON array or NDJSON)")
+    b.add_argument("-o", "--output", default=None, help="Output file (default: stdout)")
+    c = sub.add_parser("changelog", help="Write changelog.json (status, flag and sprint changes per ticket)")
+    c.add_argument("--tickets", required=True, help="Jira issues (JSON array or NDJSON)")
+    c.add_argument("--concurrency", type=int, default=int(os.environ.get("JIRA_CONCURRENCY", 6)),
+                   help="Jira requests in flight (default: $JIRA_CONCURRENCY or 6)")
+    c.add_argument("-o", "--output", default=None, help="Output file (default: stdout)")
+    d = sub.add_parser("serve", help="Keep sprints in memory, apply webhooks and serve reports over HTTP")
+    d.add_argument("teams", nargs="*", metavar="team", help="Team aliases or Jira project keys (default: every squad)")
+    d.add_argument("--sprint", default=None, help="Sprint name (default: the open sprint)")
+    d.add_argument("--host", default="127.0.0.1",
+                   help="Address to listen on (default: 127.0.0.1; any other needs HUMAND_WEBHOOK_SECRET)")
+    d.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    d.add_argument("--sweep", type=float, default=float(os.environ.get("HUMAND_DAEMON_SWEEP", DEFAULT_SWEEP)),
+                   help=f"Seconds between reconciliation sweeps, 0 for none "
+                        f"(default: $HUMAND_DAEMON_SWEEP or {DEFAULT_SWEEP})")
+    d.add_argument("--concurrency", type=int, default=int(os.environ.get("JIRA_CONCURRENCY", 6)),
+                   help="Jira pages in flight (default: $JIRA_CONCURRENCY or 6)")
+    d.add_argument("--pr-index", action="store_true", help="Fallback PRs from the local PR index")
+    d.add_argument("--no-reviews", action="store_true", help="Skip the review/CI status of open PRs")
+    d.add_argument("--no-branches", action="store_true", help="Skip the WIP branch scan")
+    d.add_argument("--no-staging", action="store_true", help="Do not serve /staging/<team>")
+    d.add_argument("--teams-file", default=TEAMS_FILE, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    commands = {"reviews": data_command, "branches": data_command, "changelog": data_command, "serve": serve}
+    if args.command in commands:
+        try:
+            commands[args.command](args)
+        except Abort as e:
+            print(e, file=sys.stderr)
+            sys.exit(e.code)
+        except subprocess.CalledProcessError as e:
+            print(f"Error: {os.path.basename(e.cmd[0])} exited with {e.returncode}", file=sys.stderr)
+            sys.exit(3)
+        return
+
+    args.team = args.team or args.team_arg
+    if args.all_teams:
+        if args.team:
+            parser.error("--all-teams does not take a team")
+        if args.sprint:
+            parser.error("--all-teams uses each team's open sprint; --sprint is not supported")
+        if not args.output:
+            parser.error("--all-teams requires -o <dir>")
+        if args.post_jira or args.post_confluence:
+            parser.error("--post-jira / --post-confluence publish one team at a time")
+    elif not args.team:
+        parser.error("team is required")
+
+    try:
+        run(args)
+    except Abort as e:
+        print(e, file=sys.stderr)
+        sys.exit(e.code)
+    except subprocess.CalledProcessError as e:
+        print(f"Error: {os.path.basename(e.cmd[0])} exited with {e.returncode}", file=sys.stderr)
+        sys.exit(3)
+
+
+if __name__ == "__main__":
+    main()
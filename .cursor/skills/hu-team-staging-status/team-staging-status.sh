@@ -12,12 +12,27 @@
 #   # Or interactive prompts:
 #   bash .cursor/skills/hu-team-staging-status/team-staging-status.sh
 #
+#   # Read branches and commit ranges from local git mirrors (see SKILL.md):
+#   TEAM_STATUS_MIRRORS=1 TEAM_NAME="Orca" TEAM_TICKET_PREFIX="SQOR" \
+#     bash .cursor/skills/hu-team-staging-status/team-staging-status.sh
+#
 set -euo pipefail
 
 ORG="${HUMAND_GH_ORG:-HumandDev}"
 RELEASE_REPOS="${RELEASE_REPOS:-humand-web humand-backoffice humand-main-api}"
 VERSION_REPOS="${VERSION_REPOS:-humand-mobile}"
 
+# Optional local bare mirrors (TEAM_STATUS_MIRRORS=1): branches and commit ranges
+# come from `git for-each-ref` / `git log` instead of the GitHub API.
+MIRRORS_ENABLED="${TEAM_STATUS_MIRRORS:-0}"
+MIRROR_DIR="${TEAM_STATUS_MIRROR_DIR:-${HUMAND_CACHE_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/humand-product-workflow}/mirrors}"
+MIRROR_URL="${TEAM_STATUS_MIRROR_URL:-}"
+[[ -z "$MIRROR_URL" ]] && MIRROR_URL='https://github.com/{org}/{repo}.git'
+
+# Repos and compare ranges are processed in parallel, at most this many at a time.
+MAX_JOBS="${TEAM_STATUS_CONCURRENCY:-4}"
+WORK_DIR=""
+
 # Resolve Jira credentials from multiple possible env var names
 JIRA_BASE_URL_EFF="${JIRA_BASE_URL:-${ATLASSIAN_BASE_URL:-https://humand.atlassian.net/browse/}}"
 JIRA_EMAIL_EFF="${JIRA_EMAIL:-${ATLASSIAN_EMAIL:-${JIRA_USERNAME:-${JIRA_USER:-}}}}"
@@ -31,8 +46,22 @@ TEAM_MEMBERS_EFF=""
 TEAM_AUTHORS_PATTERN_EFF=""
 TEAM_FILTER_MODE_EFF=""
 
+SCRIPTS_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/../../scripts" && pwd)"
+
 declare -A JIRA_SUMMARY_CACHE
 declare -A JIRA_TITLE_FALLBACK_CACHE
+declare -A MIRROR_READY
+
+# `gh api` through hulib/gh.py, which takes a slot from the GitHub rate-limit
+# budget shared with the other scripts first and waits out rate-limit errors
+# (hulib/ratelimit.py). HUMAND_RATE_LIMIT=0 calls gh directly.
+gh_api() {
+  if [[ "${HUMAND_RATE_LIMIT:-}" == "0" ]]; then
+    gh api "$@"
+  else
+    PYTHONPATH="$SCRIPTS_DIR${PYTHONPATH:+:$PYTHONPATH}" python3 -m hulib.gh api "$@"
+  fi
+}
 
 debug_log() {
   if [[ "${TEAM_STATUS_DEBUG:-}" == "1" ]]; then
@@ -240,44 +269,21 @@ jira_issue_title() {
     echo ""
     return 0
   fi
+  echo "${JIRA_SUMMARY_CACHE[$key]:-}"
+}
 
-  if [[ -n "${JIRA_SUMMARY_CACHE[$key]:-}" ]]; then
-    echo "${JIRA_SUMMARY_CACHE[$key]}"
-    return 0
-  fi
-
-  # Try Jira API v3 first, then v2 for compatibility.
-  local root resp status body summary parsed api_ver
-  root="$(jira_site_root)"
-  summary=""
-  for api_ver in 3 2; do
-    resp=$(curl -sS -u "${JIRA_EMAIL_EFF}:${JIRA_TOKEN_EFF}" \
-      -H "Accept: application/json" \
-      -w "\n%{http_code}" \
-      "${root%/}/rest/api/${api_ver}/issue/${key}?fields=summary" 2>/dev/null || true)
-
-    status="$(printf '%s\n' "$resp" | tail -n1)"
-    body="$(printf '%s\n' "$resp" | sed -e '$d')"
-    if [[ "$status" != "200" ]]; then
-      debug_log "jira fetch ${key} api=v${api_ver} http=${status}"
-      continue
-    fi
-
-    parsed="$(printf '%s' "$body" | python3 -c 'import json, sys
-try:
-    data = json.load(sys.stdin)
-    print(data.get("fields", {}).get("summary", ""))
-except Exception:
-    pass
-' 2>/dev/null || true)"
-    if [[ -n "$parsed" ]]; then
-      summary="$parsed"
-      break
-    fi
-  done
-
-  JIRA_SUMMARY_CACHE[$key]="${summary}"
-  echo "${summary}"
+# Resolve every ticket key of the run in one go (chunked `key in (...)` searches,
+# cached on disk for HUMAND_CACHE_SUMMARY_TTL seconds; see hulib/summaries.py).
+load_jira_summaries() {
+  jira_enabled || return 0
+  [[ $# -eq 0 ]] && return 0
+
+  local key summary
+  while IFS=$'\t' read -r key summary; do
+    [[ -n "$key" ]] && JIRA_SUMMARY_CACHE[$key]="$summary"
+  done < <(JIRA_BASE_URL="$(jira_site_root)" JIRA_EMAIL="$JIRA_EMAIL_EFF" JIRA_API_TOKEN="$JIRA_TOKEN_EFF" \
+    PYTHONPATH="$SCRIPTS_DIR${PYTHONPATH:+:$PYTHONPATH}" python3 -m hulib.summaries "$@" || true)
+  debug_log "jira summaries: ${#JIRA_SUMMARY_CACHE[@]} of $# keys resolved"
 }
 
 jira_issue_title_from_pr_ref() {
@@ -291,7 +297,7 @@ jira_issue_title_from_pr_ref() {
   fi
 
   local ref normalized slug
-  ref=$(gh api "repos/${ORG}/${repo}/pulls/${pr_num}" --jq '.head.ref' 2>/dev/null || true)
+  ref=$(gh_api "repos/${ORG}/${repo}/pulls/${pr_num}" --jq '.head.ref' 2>/dev/null || true)
   [[ -z "$ref" || "$ref" = "null" ]] && { echo ""; return 0; }
 
   normalized=$(echo "$ref" | tr '/_' '-')
@@ -411,11 +417,77 @@ clean_subject() {
   echo "$s" | sed 's/^ *//;s/ *$//'
 }
 
-get_team_commits() {
+mirror_path() {
+  echo "${MIRROR_DIR}/${ORG}/${1}.git"
+}
+
+mirror_git() {
+  local repo="$1"
+  shift
+  git --git-dir="$(mirror_path "$repo")" "$@"
+}
+
+# Clone (blobless: only commits and trees are read) or incrementally fetch the
+# repo's mirror. GitHub URLs authenticate through `gh auth git-credential`.
+mirror_sync() {
+  local repo="$1" dir url
+  dir="$(mirror_path "$repo")"
+  url="${MIRROR_URL//\{org\}/$ORG}"
+  url="${url//\{repo\}/$repo}"
+  local -a auth=()
+  [[ "$url" == https://github.com/* ]] && auth=(-c "credential.helper=!gh auth git-credential")
+
+  if [[ ! -d "$dir" ]]; then
+    debug_log "mirror clone ${url} -> ${dir}"
+    mkdir -p "$(dirname "$dir")"
+    if ! GIT_TERMINAL_PROMPT=0 git "${auth[@]}" clone --quiet --bare --filter=blob:none "$url" "$dir" 2>/dev/null; then
+      rm -rf "$dir"
+      return 1
+    fi
+    return 0
+  fi
+  debug_log "mirror fetch ${repo}"
+  GIT_TERMINAL_PROMPT=0 git "${auth[@]}" --git-dir="$dir" fetch --quiet --prune --no-tags origin \
+    '+refs/heads/*:refs/heads/*' 2>/dev/null
+}
+
+# Turn mirrors off up front when git is missing.
+check_mirrors() {
+  [[ "$MIRRORS_ENABLED" == "1" ]] || return 0
+  if ! command -v git >/dev/null 2>&1; then
+    echo "Warning: git not found; TEAM_STATUS_MIRRORS ignored" 1>&2
+    MIRRORS_ENABLED=0
+  fi
+}
+
+mirror_ready() {
+  [[ -n "${MIRROR_READY[$1]:-}" ]]
+}
+
+# "author|subject" per commit in base...head, oldest first (as the compare API
+# lists them). The compare API stops at 250 commits; a mirror has no cap.
+compare_commits() {
   local repo="$1" base="$2" head="$3"
-  local raw
-  raw=$(gh api "repos/${ORG}/${repo}/compare/${base}...${head}" \
-    --jq '.commits[] | "\(.commit.author.name)|\(.commit.message | split("\n")[0])"' 2>/dev/null || true)
+  if mirror_ready "$repo"; then
+    # Records split on RS (\036) so only the first line of each message is kept.
+    mirror_git "$repo" log --reverse --format='%x1e%an|%B' "${base}..${head}" -- 2>/dev/null \
+      | awk 'BEGIN { RS = "\036" } NR > 1 { sub(/\n.*/, ""); print }' || true
+    return 0
+  fi
+  gh_api "repos/${ORG}/${repo}/compare/${base}...${head}" \
+    --jq '.commits[] | "\(.commit.author.name)|\(.commit.message | split("\n")[0])"' 2>/dev/null || true
+}
+
+# First ticket key of each commit subject (a superset of the keys get_team_commits shows).
+commit_tickets() {
+  printf '%s\n' "$1" | TICKET_RE="$TEAM_TICKET_REGEX_EFF" awk '{
+    subject = substr($0, index($0, "|") + 1)
+    if (match(subject, ENVIRON["TICKET_RE"])) print substr(subject, RSTART, RLENGTH)
+  }'
+}
+
+get_team_commits() {
+  local repo="$1" raw="$2"
   [[ -z "$raw" ]] && return
 
   declare -A seen=()
@@ -474,7 +546,11 @@ latest_release_pair() {
   local repo_name="$1"
   local staging="" prod="" branches all_releases all_branch_names
 
-  all_branch_names=$(gh api "repos/${ORG}/${repo_name}/branches" --paginate --jq '.[].name' 2>/dev/null || true)
+  if mirror_ready "$repo_name"; then
+    all_branch_names=$(mirror_git "$repo_name" for-each-ref --format='%(refname:strip=2)' refs/heads/ 2>/dev/null || true)
+  else
+    all_branch_names=$(gh_api "repos/${ORG}/${repo_name}/branches" --paginate --jq '.[].name' 2>/dev/null || true)
+  fi
 
   if echo "$VERSION_REPOS" | grep -qw "$repo_name"; then
     branches=$(echo "$all_branch_names" \
@@ -494,7 +570,11 @@ latest_release_pair() {
   if echo "$all_branch_names" | grep -qxF "develop"; then
     dev_branch="develop"
   else
-    dev_branch=$(gh api "repos/${ORG}/${repo_name}" --jq '.default_branch' 2>/dev/null || echo "main")
+    if mirror_ready "$repo_name"; then
+      dev_branch=$(mirror_git "$repo_name" symbolic-ref --short HEAD 2>/dev/null || echo "main")
+    else
+      dev_branch=$(gh_api "repos/${ORG}/${repo_name}" --jq '.default_branch' 2>/dev/null || echo "main")
+    fi
   fi
 
   echo "${staging}|${prod}|${dev_branch}"
@@ -509,25 +589,98 @@ line_count() {
   printf '%s\n' "$input" | sed '/^$/d' | wc -l | tr -d ' '
 }
 
+# Run "$@" in the background with stdout in file $1, once fewer than MAX_JOBS
+# jobs are running. A failing job is reported on stderr and leaves $1 empty.
+spawn() {
+  local out="$1"
+  shift
+  while [[ "$(jobs -rp | wc -l)" -ge "$MAX_JOBS" ]]; do
+    wait -n || true
+  done
+  {
+    if ! "$@" > "$out"; then
+      echo "Warning: ${1} ${2:-} failed; its section may be incomplete" 1>&2
+      : > "$out"
+    fi
+  } &
+}
+
+# "<mirror 0|1>|staging|prod|dev" for one repo (syncs its mirror first when enabled).
+discover_repo() {
+  local repo_name="$1" mirror=0
+  if [[ "$MIRRORS_ENABLED" == "1" ]]; then
+    if mirror_sync "$repo_name"; then
+      mirror=1
+      MIRROR_READY[$repo_name]=1
+    else
+      echo "Warning: could not sync mirror of ${repo_name}; using the GitHub API" 1>&2
+    fi
+  fi
+  echo "${mirror}|$(latest_release_pair "$repo_name")"
+}
+
 main() {
   resolve_team_inputs
+  check_mirrors
+
+  WORK_DIR="$(mktemp -d)"
+  trap 'rm -rf "$WORK_DIR"' EXIT
+
+  # 1. Branch discovery, one job per repo.
+  local repo_name line staging prod dev_branch
+  local -a all_repos=() repos=()
+  # shellcheck disable=SC2206
+  all_repos=($RELEASE_REPOS $VERSION_REPOS)
+  for repo_name in "${all_repos[@]}"; do
+    spawn "${WORK_DIR}/${repo_name}.pair" discover_repo "$repo_name"
+  done
+  wait
+
+  local -A triples=()
+  for repo_name in "${all_repos[@]}"; do
+    line="$(<"${WORK_DIR}/${repo_name}.pair")"
+    [[ "${line%%|*}" == "1" ]] && MIRROR_READY[$repo_name]=1
+    triples[$repo_name]="${line#*|}"
+    [[ -z "$(echo "${triples[$repo_name]}" | cut -d'|' -f1)" ]] && continue
+    repos+=("$repo_name")
+  done
 
-  local repo_name triple staging prod dev_branch stg_output dev_output stg_count dev_count summary header
-  for repo_name in $RELEASE_REPOS $VERSION_REPOS; do
-    triple="$(latest_release_pair "$repo_name")"
-    staging="$(echo "$triple" | cut -d'|' -f1)"
-    prod="$(echo "$triple" | cut -d'|' -f2)"
-    dev_branch="$(echo "$triple" | cut -d'|' -f3)"
-    [[ -z "${staging:-}" ]] && continue
-
-    stg_output=""
+  # 2. Compare ranges, two jobs per repo. Fetched before rendering so all
+  #    ticket titles resolve in one batch.
+  for repo_name in "${repos[@]}"; do
+    IFS='|' read -r staging prod dev_branch <<< "${triples[$repo_name]}"
+    : > "${WORK_DIR}/${repo_name}.stg.raw"
+    : > "${WORK_DIR}/${repo_name}.dev.raw"
     if [[ -n "${prod:-}" ]]; then
-      stg_output="$(get_team_commits "$repo_name" "$prod" "$staging")"
+      spawn "${WORK_DIR}/${repo_name}.stg.raw" compare_commits "$repo_name" "$prod" "$staging"
     fi
-    dev_output=""
     if [[ -n "${dev_branch:-}" ]]; then
-      dev_output="$(get_team_commits "$repo_name" "$staging" "$dev_branch")"
+      spawn "${WORK_DIR}/${repo_name}.dev.raw" compare_commits "$repo_name" "$staging" "$dev_branch"
     fi
+  done
+  wait
+
+  local tickets
+  tickets="$(for repo_name in "${repos[@]}"; do
+    commit_tickets "$(<"${WORK_DIR}/${repo_name}.stg.raw")"
+    commit_tickets "$(<"${WORK_DIR}/${repo_name}.dev.raw")"
+  done | sort -u)"
+  # shellcheck disable=SC2086  # ticket keys contain no whitespace
+  load_jira_summaries $tickets
+
+  # 3. Filter and format each range in parallel; print in repo order.
+  for repo_name in "${repos[@]}"; do
+    spawn "${WORK_DIR}/${repo_name}.stg.out" get_team_commits "$repo_name" "$(<"${WORK_DIR}/${repo_name}.stg.raw")"
+    spawn "${WORK_DIR}/${repo_name}.dev.out" get_team_commits "$repo_name" "$(<"${WORK_DIR}/${repo_name}.dev.raw")"
+  done
+  wait
+
+  local stg_output dev_output stg_count dev_count summary header
+  for repo_name in "${repos[@]}"; do
+    IFS='|' read -r staging prod dev_branch <<< "${triples[$repo_name]}"
+
+    stg_output="$(<"${WORK_DIR}/${repo_name}.stg.out")"
+    dev_output="$(<"${WORK_DIR}/${repo_name}.dev.out")"
 
     [[ -z "$stg_output" && -z "$dev_output" ]] && continue
 